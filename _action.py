@@ -19,7 +19,7 @@ from typing import Optional, List
 import click
 
 from pip_rating.dependencies import Dependencies
-from pip_rating.management import common_options
+from pip_rating.management import common_options, configure_cache, finish_cache
 from pip_rating.req_files import get_req_file_cls, REQ_FILE_CLASSES, find_in_directory
 from pip_rating.results import Results
 
@@ -44,7 +44,16 @@ def action(
     format_name: str,
     to_file: Optional[str],
     ignore_packages: List[str],
+    refresh_resolution: bool,
+    incremental: bool,
+    cache_policy: str,
+    max_staleness: int,
+    offline: bool,
+    show_stats: bool,
+    stats_format: str,
+    sourcerank_backend: str,
 ):
+    configure_cache(cache_policy, max_staleness, offline)
     if not file:
         file = str(find_in_directory(Path.cwd()).path)
     results = Results(to_file)
@@ -62,11 +71,17 @@ def action(
         index_url,
         extra_index_url,
         ignore_packages=ignore_packages,
+        full_pypi_package=format_name == "json",
+        sourcerank_backend=sourcerank_backend,
+        refresh_resolution=refresh_resolution,
+        incremental=incremental,
     )
     results.show_results(dependencies, format_name)
+    dependencies.save_previous_resolution()
     if badge_path:
         results = Results(badge_path)
         results.show_badge_results(dependencies)
+    finish_cache(show_stats, stats_format)
 
 
 if __name__ == "__main__":
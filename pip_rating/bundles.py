@@ -0,0 +1,146 @@
+"""Export and import the cache entries as a single compressed archive."""
+import datetime
+import hashlib
+import io
+import json
+import os
+import tarfile
+import tempfile
+from pathlib import Path
+from typing import Iterable, List, Optional, Dict, Tuple, TypedDict
+
+from pip_rating import __version__
+from pip_rating.cache import CacheBackendBase, CacheItem, CacheKey
+from pip_rating.exceptions import RequirementsRatingInvalidBundle
+
+
+BUNDLE_FORMAT_VERSION = 1
+INDEX_NAME = "index.json"
+ENTRIES_NAME = "entries.jsonl"
+
+
+class BundleIndex(TypedDict):
+    format_version: int
+    pip_rating_version: str
+    created_at: str
+    entries: int
+    sources: Dict[str, int]
+    sha256: str
+
+
+def get_items(
+    backend: CacheBackendBase, cache_keys: Optional[Iterable[CacheKey]] = None
+) -> List[CacheItem]:
+    """Get the items of the given cache keys, or all the items of the backend."""
+    if cache_keys is None:
+        items = map(backend.get_item, backend.get_entries())
+    else:
+        items = []
+        for key in dict.fromkeys(cache_keys):
+            updated_at = backend.get_updated_at(*key)
+            data = backend.get(*key)
+            if updated_at is not None and data is not None:
+                items.append(CacheItem(key, updated_at, data))
+    return [item for item in items if item is not None]
+
+
+def export_bundle(path: Path, items: Iterable[CacheItem]) -> BundleIndex:
+    """Write the items to a gzip-compressed tar archive. The archive contains an
+    index with the number of entries per source and the checksum of the entries
+    file, which has an item per line. The archive is written to a temporary file
+    and then renamed, so an existing archive is never left half-written.
+    """
+    entries = io.BytesIO()
+    sources: Dict[str, int] = {}
+    for item in items:
+        entries.write(
+            json.dumps(
+                {
+                    "key": list(item.key),
+                    "updated_at": item.updated_at.timestamp(),
+                    "data": item.data,
+                }
+            ).encode("utf-8")
+            + b"\n"
+        )
+        sources[item.key[0]] = sources.get(item.key[0], 0) + 1
+    index: BundleIndex = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "pip_rating_version": __version__,
+        "created_at": datetime.datetime.now().isoformat(),
+        "entries": sum(sources.values()),
+        "sources": sources,
+        "sha256": hashlib.sha256(entries.getvalue()).hexdigest(),
+    }
+    index_content = json.dumps(index, indent=2).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file, tarfile.open(
+            fileobj=file, mode="w:gz"
+        ) as archive:
+            for name, content in [
+                (INDEX_NAME, index_content),
+                (ENTRIES_NAME, entries.getvalue()),
+            ]:
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                info.mtime = int(datetime.datetime.now().timestamp())
+                archive.addfile(info, io.BytesIO(content))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return index
+
+
+def read_bundle(path: Path) -> Tuple[BundleIndex, List[CacheItem]]:
+    """Read and validate the archive. All the items are read before returning, so
+    an invalid archive is detected before importing anything.
+    """
+    try:
+        with tarfile.open(str(path), mode="r:gz") as archive:
+            index: BundleIndex = json.load(archive.extractfile(INDEX_NAME))
+            entries = archive.extractfile(ENTRIES_NAME).read()
+    except (tarfile.TarError, KeyError, ValueError, OSError) as e:
+        raise RequirementsRatingInvalidBundle(f"Cannot read {path}: {e}")
+    if index.get("format_version") != BUNDLE_FORMAT_VERSION:
+        raise RequirementsRatingInvalidBundle(
+            f"Unsupported bundle format version: {index.get('format_version')}"
+        )
+    if hashlib.sha256(entries).hexdigest() != index["sha256"]:
+        raise RequirementsRatingInvalidBundle(f"Checksum mismatch in {path}")
+    items = []
+    for line in entries.splitlines():
+        entry = json.loads(line)
+        items.append(
+            CacheItem(
+                tuple(entry["key"]),
+                datetime.datetime.fromtimestamp(entry["updated_at"]),
+                entry["data"],
+            )
+        )
+    if len(items) != index["entries"]:
+        raise RequirementsRatingInvalidBundle(
+            f"Expected {index['entries']} entries in {path}, found {len(items)}"
+        )
+    return index, items
+
+
+def import_bundle(
+    path: Path, backend: CacheBackendBase, overwrite: bool = False
+) -> List[CacheItem]:
+    """Import the items of the archive into the backend. The entries already in
+    the backend are only replaced if they are older than the imported ones, unless
+    overwrite is True. Returns the imported items.
+    """
+    _, items = read_bundle(path)
+    if not overwrite:
+        items = [
+            item
+            for item in items
+            if (backend.get_updated_at(*item.key) or datetime.datetime.min)
+            < item.updated_at
+        ]
+    backend.set_items(items)
+    return items
@@ -0,0 +1,953 @@
+"""Cache backends for the sources data and the ratings."""
+import datetime
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from contextlib import contextmanager
+from hashlib import sha1
+from pathlib import Path
+from urllib.parse import quote
+from typing import (
+    Optional,
+    Dict,
+    Tuple,
+    Type,
+    Callable,
+    Iterable,
+    List,
+    NamedTuple,
+    Hashable,
+    Iterator,
+    IO,
+)
+
+import requests
+from platformdirs import user_cache_dir
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from pip_rating.sessions import SessionPool, session_pool
+from pip_rating.stats import run_stats
+
+
+CACHE_DIR = Path(user_cache_dir()) / "pip-rating"
+DEFAULT_CACHE_BACKEND = os.environ.get("PIP_RATING_CACHE_BACKEND", "sqlite")
+CACHE_POLICIES = ("default", "stale-while-revalidate")
+DEFAULT_CACHE_POLICY = os.environ.get("PIP_RATING_CACHE_POLICY", "default")
+MAX_STALENESS_DAYS = int(os.environ.get("PIP_RATING_CACHE_MAX_STALENESS", 30))
+REFRESH_THREADS = int(os.environ.get("PIP_RATING_REFRESH_THREADS", 4))
+REMOTE_CACHE_URL = os.environ.get("PIP_RATING_REMOTE_CACHE_URL", "")
+REMOTE_CACHE_TOKEN = os.environ.get("PIP_RATING_REMOTE_CACHE_TOKEN", "")
+REMOTE_CACHE_READ_ONLY = bool(os.environ.get("PIP_RATING_REMOTE_CACHE_READ_ONLY"))
+MAX_CACHE_SIZE = os.environ.get("PIP_RATING_CACHE_MAX_SIZE", "512MB")
+MAX_CACHE_AGE_DAYS = int(os.environ.get("PIP_RATING_CACHE_MAX_AGE", 90))
+LOCK_TIMEOUT = float(os.environ.get("PIP_RATING_CACHE_LOCK_TIMEOUT", 300))
+LOCK_MAX_AGE = datetime.timedelta(days=1)
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+CacheKey = Tuple[str, str, str]
+
+
+def parse_size(value: str) -> int:
+    """Parse a size in bytes with an optional unit. For example: 1024, 500K, 200MB
+    or 1.5GB. The units are powers of 1024.
+    """
+    number = value.strip().upper().rstrip("B").rstrip("I")
+    unit = number[-1:] if number[-1:] in SIZE_UNITS else ""
+    try:
+        size = float(number[: len(number) - len(unit)]) * SIZE_UNITS[unit]
+    except ValueError:
+        raise ValueError(f"Invalid size: {value}")
+    if size < 0:
+        raise ValueError(f"Invalid size: {value}")
+    return int(size)
+
+
+def try_lock_file(file: IO) -> bool:
+    """Try to get an exclusive lock of the file without blocking."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def unlock_file(file: IO):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class CacheEntry(NamedTuple):
+    """An entry of the cache backend, used for the maintenance tasks. The id is
+    the backend identifier of the entry.
+    """
+
+    source: str
+    id: Hashable
+    size: int
+    updated_at: datetime.datetime
+    accessed_at: datetime.datetime
+
+
+class CacheItem(NamedTuple):
+    """The key, the update time and the data of an entry, used to copy the entries
+    between backends.
+    """
+
+    key: CacheKey
+    updated_at: datetime.datetime
+    data: dict
+
+
+class CacheBackendBase:
+    """Base class for the cache backends. The entries are identified by the source
+    name, the normalized package name and the package version. The version is an
+    empty string for the sources that do not depend on the version.
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def get_updated_at(
+        self, source: str, name: str, version: str = ""
+    ) -> Optional[datetime.datetime]:
+        """Get the last update datetime of the entry, or None if it does not exist."""
+        raise NotImplementedError
+
+    def is_expired(
+        self, source: str, name: str, version: str, max_age: datetime.timedelta
+    ) -> bool:
+        """Check if the entry does not exist or it is older than max_age."""
+        updated_at = self.get_updated_at(source, name, version)
+        return updated_at is None or updated_at < datetime.datetime.now() - max_age
+
+    def get(self, source: str, name: str, version: str = "") -> Optional[dict]:
+        """Get the entry data, or None if it does not exist."""
+        raise NotImplementedError
+
+    def set(
+        self,
+        source: str,
+        name: str,
+        version: str,
+        data: dict,
+        updated_at: Optional[datetime.datetime] = None,
+    ):
+        """Create or replace the entry data. By default, the update time is now."""
+        raise NotImplementedError
+
+    def touch(self, source: str, name: str, version: str = ""):
+        """Set the entry update time to now without changing its data."""
+        raise NotImplementedError
+
+    def delete(self, source: str, name: str, version: str = ""):
+        """Delete the entry if it exists."""
+        raise NotImplementedError
+
+    def get_entries(self) -> List[CacheEntry]:
+        """Get all the entries stored in the backend."""
+        raise NotImplementedError
+
+    def delete_entries(self, entries: Iterable[CacheEntry]):
+        """Delete the given entries."""
+        raise NotImplementedError
+
+    def get_item(self, entry: CacheEntry) -> Optional[CacheItem]:
+        """Get the key and the data of the entry, or None if it does not exist or
+        its key cannot be known.
+        """
+        raise NotImplementedError
+
+    def set_items(self, items: Iterable[CacheItem]):
+        """Create or replace the entries keeping their update times."""
+        for item in items:
+            self.set(*item.key, item.data, item.updated_at)
+
+    def prune(
+        self,
+        max_size: Optional[int] = None,
+        older_than: Optional[datetime.timedelta] = None,
+    ) -> List[CacheEntry]:
+        """Delete the entries not accessed in the older_than period, and then the
+        least recently accessed entries until the total size is at most max_size.
+        Return the deleted entries.
+        """
+        entries = sorted(self.get_entries(), key=lambda entry: entry.accessed_at)
+        deleted = []
+        if older_than is not None:
+            min_accessed_at = datetime.datetime.now() - older_than
+            while entries and entries[0].accessed_at < min_accessed_at:
+                deleted.append(entries.pop(0))
+        if max_size is not None:
+            total_size = sum(entry.size for entry in entries)
+            while entries and total_size > max_size:
+                entry = entries.pop(0)
+                total_size -= entry.size
+                deleted.append(entry)
+        if deleted:
+            self.delete_entries(deleted)
+        self.prune_locks(LOCK_MAX_AGE)
+        return deleted
+
+    def reload(self, source: str, name: str, version: str = ""):
+        """Discard the state of the entry kept in memory, so the changes made by
+        other processes are seen.
+        """
+
+    def get_lock_path(self, source: str, name: str, version: str = "") -> Path:
+        """Get the lock file of the entry."""
+        if version:
+            version_hash = sha1(version.encode("utf-8")).hexdigest()
+            return self.cache_dir / "locks" / source / f"{name}_{version_hash}.lock"
+        return self.cache_dir / "locks" / source / f"{name}.lock"
+
+    def prune_locks(self, older_than: datetime.timedelta):
+        """Delete the lock files not used in the older_than period."""
+        min_mtime = (datetime.datetime.now() - older_than).timestamp()
+        for path in (self.cache_dir / "locks").glob("*/*.lock"):
+            try:
+                if path.stat().st_mtime < min_mtime:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @contextmanager
+    def lock(
+        self, source: str, name: str, version: str = "", timeout: float = LOCK_TIMEOUT
+    ) -> Iterator[bool]:
+        """Hold an exclusive lock of the entry, shared between the processes and
+        the threads. If the lock cannot be acquired before the timeout, the context
+        is entered without it. Returns whether the lock was acquired.
+        """
+        path = self.get_lock_path(source, name, version)
+        os.makedirs(str(path.parent), exist_ok=True)
+        with open(path, "a") as file:
+            deadline = time.monotonic() + timeout
+            locked = try_lock_file(file)
+            while not locked and time.monotonic() < deadline:
+                time.sleep(0.05)
+                locked = try_lock_file(file)
+            if locked:
+                os.utime(path)
+            try:
+                yield locked
+            finally:
+                if locked:
+                    unlock_file(file)
+
+    def close(self):
+        """Release the resources used by the backend."""
+
+
+class FileCacheBackend(CacheBackendBase):
+    """Store each entry in a JSON file, in a directory per source. The file
+    modification time is the entry update time, and the file access time is set
+    explicitly on each read because most filesystems do not update it. The files
+    contain the entry key next to the data, because the versions are hashed in the
+    file names. The files written by older versions only contain the data.
+    """
+
+    versioned_path_pattern = re.compile(r".+_[0-9a-f]{40}$")
+
+    def get_path(self, source: str, name: str, version: str = "") -> Path:
+        if version:
+            return (
+                self.cache_dir
+                / source
+                / f"{name}_{sha1(version.encode('utf-8')).hexdigest()}.json"
+            )
+        return self.cache_dir / source / f"{name}.json"
+
+    def get_updated_at(
+        self, source: str, name: str, version: str = ""
+    ) -> Optional[datetime.datetime]:
+        try:
+            mtime = self.get_path(source, name, version).stat().st_mtime
+        except FileNotFoundError:
+            return None
+        return datetime.datetime.fromtimestamp(mtime)
+
+    def get(self, source: str, name: str, version: str = "") -> Optional[dict]:
+        path = self.get_path(source, name, version)
+        try:
+            with open(path) as file:
+                content = self.read(file)
+                os.utime(path, (time.time(), os.fstat(file.fileno()).st_mtime))
+        except FileNotFoundError:
+            return None
+        if content is None:
+            self.delete(source, name, version)
+            return None
+        return self.unwrap(content)[1]
+
+    @staticmethod
+    def read(file: IO) -> Optional[dict]:
+        """Read the file content, or None if it is corrupted."""
+        try:
+            content = json.load(file)
+        except (ValueError, UnicodeDecodeError):
+            return None
+        return content if isinstance(content, dict) else None
+
+    @staticmethod
+    def unwrap(content: dict) -> Tuple[Optional[CacheKey], dict]:
+        """Get the key and the data of the file content."""
+        if set(content) == {"cache_key", "data"}:
+            return tuple(content["cache_key"]), content["data"]
+        return None, content
+
+    def set(
+        self,
+        source: str,
+        name: str,
+        version: str,
+        data: dict,
+        updated_at: Optional[datetime.datetime] = None,
+    ):
+        path = self.get_path(source, name, version)
+        os.makedirs(str(path.parent), exist_ok=True)
+        # Write to a temporary file and rename it, so the readers never see a
+        # partially written entry
+        fd, temp_path = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump({"cache_key": [source, name, version], "data": data}, file)
+            if updated_at is not None:
+                timestamp = updated_at.timestamp()
+                os.utime(temp_path, (time.time(), timestamp))
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def touch(self, source: str, name: str, version: str = ""):
+        try:
+            os.utime(self.get_path(source, name, version))
+        except FileNotFoundError:
+            pass
+
+    def delete(self, source: str, name: str, version: str = ""):
+        try:
+            os.remove(self.get_path(source, name, version))
+        except FileNotFoundError:
+            pass
+
+    def get_entries(self) -> List[CacheEntry]:
+        if not self.cache_dir.is_dir():
+            return []
+        entries = []
+        for source_dir in self.cache_dir.iterdir():
+            if not source_dir.is_dir():
+                continue
+            for path in source_dir.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append(
+                    CacheEntry(
+                        source_dir.name,
+                        path,
+                        stat.st_size,
+                        datetime.datetime.fromtimestamp(stat.st_mtime),
+                        datetime.datetime.fromtimestamp(stat.st_atime),
+                    )
+                )
+        return entries
+
+    def delete_entries(self, entries: Iterable[CacheEntry]):
+        for entry in entries:
+            try:
+                os.remove(entry.id)
+            except FileNotFoundError:
+                pass
+
+    def get_item(self, entry: CacheEntry) -> Optional[CacheItem]:
+        try:
+            with open(entry.id) as file:
+                content = self.read(file)
+        except FileNotFoundError:
+            return None
+        if content is None:
+            return None
+        key, data = self.unwrap(content)
+        if key is None and self.versioned_path_pattern.match(entry.id.stem):
+            return None
+        elif key is None:
+            key = (entry.source, entry.id.stem, "")
+        return CacheItem(key, entry.updated_at, data)
+
+
+class SqliteCacheBackend(CacheBackendBase):
+    """Store all the entries in a single SQLite database in WAL mode. The update
+    times of all the entries are read using a single query the first time that they
+    are required, so the expiry checks do not require a query per entry. The access
+    times are kept in memory and written in a single transaction when the backend is
+    closed or its entries are listed.
+    """
+
+    database_name = "cache.sqlite3"
+
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        super().__init__(cache_dir)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._updated_at: Optional[Dict[CacheKey, float]] = None
+        self._accessed_at: Dict[CacheKey, float] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def database_path(self) -> Path:
+        return self.cache_dir / self.database_name
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._connection is None:
+                os.makedirs(str(self.cache_dir), exist_ok=True)
+                connection = sqlite3.connect(
+                    str(self.database_path), timeout=30, check_same_thread=False
+                )
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    "source TEXT NOT NULL, "
+                    "name TEXT NOT NULL, "
+                    "version TEXT NOT NULL, "
+                    "updated_at REAL NOT NULL, "
+                    "data TEXT NOT NULL, "
+                    "accessed_at REAL NOT NULL DEFAULT 0, "
+                    "PRIMARY KEY (source, name, version))"
+                )
+                columns = {
+                    row[1] for row in connection.execute("PRAGMA table_info(entries)")
+                }
+                if "accessed_at" not in columns:
+                    connection.execute(
+                        "ALTER TABLE entries "
+                        "ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0"
+                    )
+                    connection.execute("UPDATE entries SET accessed_at = updated_at")
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS entries_updated_at "
+                    "ON entries (updated_at)"
+                )
+                connection.commit()
+                self._connection = connection
+            return self._connection
+
+    def get_all_updated_at(self) -> Dict[CacheKey, float]:
+        """Get the update timestamps of all the entries."""
+        with self._lock:
+            if self._updated_at is None:
+                cursor = self.connection.execute(
+                    "SELECT source, name, version, updated_at FROM entries"
+                )
+                self._updated_at = {
+                    (source, name, version): updated_at
+                    for source, name, version, updated_at in cursor
+                }
+            return self._updated_at
+
+    def get_updated_at(
+        self, source: str, name: str, version: str = ""
+    ) -> Optional[datetime.datetime]:
+        timestamp = self.get_all_updated_at().get((source, name, version))
+        if timestamp is None:
+            return None
+        return datetime.datetime.fromtimestamp(timestamp)
+
+    def get(self, source: str, name: str, version: str = "") -> Optional[dict]:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT data FROM entries WHERE source = ? AND name = ? AND version = ?",
+                (source, name, version),
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed_at[(source, name, version)] = time.time()
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            self.delete(source, name, version)
+            return None
+
+    def set(
+        self,
+        source: str,
+        name: str,
+        version: str,
+        data: dict,
+        updated_at: Optional[datetime.datetime] = None,
+    ):
+        self.set_items(
+            [
+                CacheItem(
+                    (source, name, version),
+                    updated_at or datetime.datetime.now(),
+                    data,
+                )
+            ]
+        )
+
+    def set_items(self, items: Iterable[CacheItem]):
+        """Create or replace the entries in a single transaction."""
+        accessed_at = time.time()
+        rows = [
+            (*item.key, item.updated_at.timestamp(), json.dumps(item.data), accessed_at)
+            for item in items
+        ]
+        with self._lock:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO entries "
+                    "(source, name, version, updated_at, data, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            all_updated_at = self.get_all_updated_at()
+            for source, name, version, updated_at, _, _ in rows:
+                all_updated_at[(source, name, version)] = updated_at
+
+    def touch(self, source: str, name: str, version: str = ""):
+        updated_at = datetime.datetime.now().timestamp()
+        with self._lock:
+            with self.connection:
+                cursor = self.connection.execute(
+                    "UPDATE entries SET updated_at = ? "
+                    "WHERE source = ? AND name = ? AND version = ?",
+                    (updated_at, source, name, version),
+                )
+            if cursor.rowcount:
+                self.get_all_updated_at()[(source, name, version)] = updated_at
+
+    def delete(self, source: str, name: str, version: str = ""):
+        with self._lock:
+            with self.connection:
+                self.connection.execute(
+                    "DELETE FROM entries WHERE source = ? AND name = ? AND version = ?",
+                    (source, name, version),
+                )
+            self.get_all_updated_at().pop((source, name, version), None)
+
+    def reload(self, source: str, name: str, version: str = ""):
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT updated_at FROM entries "
+                "WHERE source = ? AND name = ? AND version = ?",
+                (source, name, version),
+            ).fetchone()
+            if row is None:
+                self.get_all_updated_at().pop((source, name, version), None)
+            else:
+                self.get_all_updated_at()[(source, name, version)] = row[0]
+
+    def flush_accessed_at(self):
+        """Write the pending access times to the database."""
+        with self._lock:
+            if not self._accessed_at:
+                return
+            with self.connection:
+                self.connection.executemany(
+                    "UPDATE entries SET accessed_at = ? "
+                    "WHERE source = ? AND name = ? AND version = ?",
+                    [
+                        (accessed_at, *key)
+                        for key, accessed_at in self._accessed_at.items()
+                    ],
+                )
+            self._accessed_at = {}
+
+    def get_entries(self) -> List[CacheEntry]:
+        with self._lock:
+            self.flush_accessed_at()
+            cursor = self.connection.execute(
+                "SELECT source, name, version, length(CAST(data AS BLOB)), "
+                "updated_at, accessed_at FROM entries"
+            )
+            return [
+                CacheEntry(
+                    source,
+                    (source, name, version),
+                    size,
+                    datetime.datetime.fromtimestamp(updated_at),
+                    datetime.datetime.fromtimestamp(accessed_at),
+                )
+                for source, name, version, size, updated_at, accessed_at in cursor
+            ]
+
+    def delete_entries(self, entries: Iterable[CacheEntry]):
+        keys = [entry.id for entry in entries]
+        with self._lock:
+            with self.connection:
+                self.connection.executemany(
+                    "DELETE FROM entries WHERE source = ? AND name = ? AND version = ?",
+                    keys,
+                )
+            # Release the space of the deleted entries
+            self.connection.execute("VACUUM")
+            updated_at = self.get_all_updated_at()
+            for key in keys:
+                updated_at.pop(key, None)
+
+    def get_item(self, entry: CacheEntry) -> Optional[CacheItem]:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT data FROM entries WHERE source = ? AND name = ? AND version = ?",
+                entry.id,
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return CacheItem(entry.id, entry.updated_at, json.loads(row[0]))
+        except ValueError:
+            return None
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self.flush_accessed_at()
+                self._connection.close()
+            self._connection = None
+            self._updated_at = None
+
+
+class RemoteCacheBackend(CacheBackendBase):
+    """Share the entries between machines using a remote HTTP store in front of a
+    local backend. When a local entry is missing or expired, the remote entry is
+    downloaded (GET) and saved locally if it is newer. The new and revalidated
+    entries are uploaded (PUT) to the remote store. The remote entries are in the
+    ``<url>/<source>/<name>/<version>.json`` paths (``_`` when there is no
+    version), and contain the update timestamp and the data. Any server that
+    supports GET and PUT can be used. The remote errors are ignored, so the
+    local backend keeps working if the remote store is not available. The
+    maintenance tasks only affect the local backend.
+    """
+
+    def __init__(
+        self,
+        local: CacheBackendBase,
+        url: str = REMOTE_CACHE_URL,
+        token: str = REMOTE_CACHE_TOKEN,
+        read_only: bool = REMOTE_CACHE_READ_ONLY,
+        pool: SessionPool = session_pool,
+    ):
+        super().__init__(local.cache_dir)
+        self.local = local
+        self.url = url.rstrip("/")
+        self.token = token
+        self.read_only = read_only
+        self.pool = pool
+        self._pulled: Dict[CacheKey, bool] = {}
+        self._lock = threading.Lock()
+
+    def get_url(self, source: str, name: str, version: str = "") -> str:
+        return (
+            f"{self.url}/{quote(source, safe='')}/{quote(name, safe='')}/"
+            f"{quote(version or '_', safe='')}.json"
+        )
+
+    def get_headers(self) -> Dict[str, str]:
+        if self.token:
+            return {"Authorization": f"Bearer {self.token}"}
+        return {}
+
+    def get_remote(
+        self, source: str, name: str, version: str = ""
+    ) -> Optional[CacheItem]:
+        """Download the remote entry, or None if it does not exist or the remote
+        store is not available.
+        """
+        try:
+            with self.pool.get(
+                self.get_url(source, name, version), headers=self.get_headers()
+            ) as response:
+                if response.status_code == 404:
+                    run_stats.increment("remote", "misses")
+                    return None
+                response.raise_for_status()
+                content = response.json()
+            item = CacheItem(
+                (source, name, version),
+                datetime.datetime.fromtimestamp(content["updated_at"]),
+                content["data"],
+            )
+        except (requests.RequestException, ValueError, KeyError, TypeError):
+            run_stats.increment("remote", "errors")
+            return None
+        run_stats.increment("remote", "hits")
+        return item
+
+    def put_remote(self, item: CacheItem):
+        """Upload the entry to the remote store."""
+        if self.read_only:
+            return
+        try:
+            with self.pool.put(
+                self.get_url(*item.key),
+                json={"updated_at": item.updated_at.timestamp(), "data": item.data},
+                headers=self.get_headers(),
+            ) as response:
+                response.raise_for_status()
+        except requests.RequestException:
+            run_stats.increment("remote", "errors")
+
+    def pull(self, source: str, name: str, version: str = ""):
+        """Save the remote entry locally if it is newer than the local one. Each
+        entry is only downloaded once per run.
+        """
+        key = (source, name, version)
+        with self._lock:
+            if key in self._pulled or self.pool.offline:
+                return
+            self._pulled[key] = True
+        item = self.get_remote(source, name, version)
+        if item is None:
+            return
+        updated_at = self.local.get_updated_at(source, name, version)
+        if updated_at is None or updated_at < item.updated_at:
+            self.local.set(source, name, version, item.data, item.updated_at)
+
+    def get_updated_at(
+        self, source: str, name: str, version: str = ""
+    ) -> Optional[datetime.datetime]:
+        return self.local.get_updated_at(source, name, version)
+
+    def is_expired(
+        self, source: str, name: str, version: str, max_age: datetime.timedelta
+    ) -> bool:
+        if not self.local.is_expired(source, name, version, max_age):
+            return False
+        self.pull(source, name, version)
+        return self.local.is_expired(source, name, version, max_age)
+
+    def get(self, source: str, name: str, version: str = "") -> Optional[dict]:
+        data = self.local.get(source, name, version)
+        if data is None:
+            self.pull(source, name, version)
+            data = self.local.get(source, name, version)
+        return data
+
+    def set(
+        self,
+        source: str,
+        name: str,
+        version: str,
+        data: dict,
+        updated_at: Optional[datetime.datetime] = None,
+    ):
+        updated_at = updated_at or datetime.datetime.now()
+        self.local.set(source, name, version, data, updated_at)
+        self.put_remote(CacheItem((source, name, version), updated_at, data))
+
+    def touch(self, source: str, name: str, version: str = ""):
+        self.local.touch(source, name, version)
+        data = self.local.get(source, name, version)
+        updated_at = self.local.get_updated_at(source, name, version)
+        if data is not None and updated_at is not None:
+            self.put_remote(CacheItem((source, name, version), updated_at, data))
+
+    def delete(self, source: str, name: str, version: str = ""):
+        self.local.delete(source, name, version)
+
+    def reload(self, source: str, name: str, version: str = ""):
+        self.local.reload(source, name, version)
+
+    def get_entries(self) -> List[CacheEntry]:
+        return self.local.get_entries()
+
+    def delete_entries(self, entries: Iterable[CacheEntry]):
+        self.local.delete_entries(entries)
+
+    def get_item(self, entry: CacheEntry) -> Optional[CacheItem]:
+        return self.local.get_item(entry)
+
+    def set_items(self, items: Iterable[CacheItem]):
+        self.local.set_items(items)
+
+    def close(self):
+        self.local.close()
+        with self._lock:
+            self._pulled = {}
+
+
+CACHE_BACKENDS: Dict[str, Type[CacheBackendBase]] = {
+    "sqlite": SqliteCacheBackend,
+    "file": FileCacheBackend,
+}
+_cache_backend: Optional[CacheBackendBase] = None
+_cache_backend_lock = threading.Lock()
+
+
+def set_cache_backend(backend: CacheBackendBase):
+    """Set the cache backend used by the sources and the ratings."""
+    global _cache_backend
+    with _cache_backend_lock:
+        if _cache_backend is not None and _cache_backend is not backend:
+            _cache_backend.close()
+        _cache_backend = backend
+
+
+def get_cache_backend() -> CacheBackendBase:
+    """Get the cache backend used by the sources and the ratings. By default, the
+    backend is set using the PIP_RATING_CACHE_BACKEND environment variable, and
+    the PIP_RATING_REMOTE_CACHE_URL environment variable adds a remote store in
+    front of it.
+    """
+    global _cache_backend
+    with _cache_backend_lock:
+        if _cache_backend is None:
+            _cache_backend = CACHE_BACKENDS[DEFAULT_CACHE_BACKEND]()
+            if REMOTE_CACHE_URL:
+                _cache_backend = RemoteCacheBackend(_cache_backend)
+        return _cache_backend
+
+
+def prune_cache() -> List[CacheEntry]:
+    """Prune the cache at the end of a run, using the PIP_RATING_CACHE_MAX_SIZE and
+    PIP_RATING_CACHE_MAX_AGE (in days since the last access) environment variables.
+    A zero value disables the limit. Return the deleted entries.
+    """
+    max_size = parse_size(MAX_CACHE_SIZE) or None
+    older_than = (
+        datetime.timedelta(days=MAX_CACHE_AGE_DAYS) if MAX_CACHE_AGE_DAYS else None
+    )
+    if max_size is None and older_than is None:
+        return []
+    return get_cache_backend().prune(max_size, older_than)
+
+
+class CachePolicy:
+    """How the expired cache entries are handled. Using the default policy, the
+    expired entries are refreshed before using them. Using the stale-while-revalidate
+    policy, the expired entries are used immediately and refreshed in background,
+    unless they are older than max_staleness. In offline mode, the cached entries
+    are always used regardless of their age, and they are never refreshed.
+    """
+
+    def __init__(
+        self,
+        name: str = DEFAULT_CACHE_POLICY,
+        max_staleness: datetime.timedelta = datetime.timedelta(days=MAX_STALENESS_DAYS),
+        offline: bool = False,
+    ):
+        if name not in CACHE_POLICIES:
+            raise ValueError(f"Cache policy must be one of {', '.join(CACHE_POLICIES)}")
+        self.name = name
+        self.max_staleness = max_staleness
+        self.offline = offline
+
+    @property
+    def stale_while_revalidate(self) -> bool:
+        return self.name == "stale-while-revalidate"
+
+
+_cache_policy = CachePolicy()
+
+
+def set_cache_policy(policy: CachePolicy):
+    """Set the cache policy used by the sources."""
+    global _cache_policy
+    _cache_policy = policy
+
+
+def get_cache_policy() -> CachePolicy:
+    """Get the cache policy used by the sources. By default, the policy is set using
+    the PIP_RATING_CACHE_POLICY and PIP_RATING_CACHE_MAX_STALENESS environment
+    variables.
+    """
+    return _cache_policy
+
+
+class BackgroundRefresher:
+    """Refresh the stale cache entries in background threads. Each cache entry is
+    only refreshed once per run. The pending refreshes are completed before the
+    interpreter exits.
+    """
+
+    def __init__(self, max_workers: int = REFRESH_THREADS):
+        self.max_workers = max_workers
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.futures: Dict[CacheKey, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self, cache_keys: Iterable[CacheKey], function: Callable[[], object]
+    ) -> Optional[Future]:
+        """Call the function in background to refresh the given cache entries. If
+        all the entries are already being refreshed, the function is not called.
+        """
+        with self._lock:
+            cache_keys = [key for key in cache_keys if key not in self.futures]
+            if not cache_keys:
+                return None
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="pip-rating-refresh",
+                )
+            future = self.executor.submit(function)
+            for key in cache_keys:
+                self.futures[key] = future
+            return future
+
+    def wait(self):
+        """Wait until all the background refreshes are completed."""
+        with self._lock:
+            futures = list(self.futures.values())
+        wait(futures)
+
+
+background_refresher = BackgroundRefresher()
+
+
+class SingleFlight:
+    """Deduplicate the concurrent calls for the same key in this process. The first
+    caller runs the function, and the callers that arrive while it is running wait
+    for it and get the same result or exception. Nested calls for the same key in
+    the same thread run the function again instead of waiting for themselves.
+    """
+
+    def __init__(self):
+        self.calls: Dict[Hashable, Tuple[Future, int]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, function: Callable[[], object]):
+        """Call the function, or wait for the call in progress for the same key."""
+        thread_id = threading.get_ident()
+        with self._lock:
+            call = self.calls.get(key)
+            if call is None:
+                future = Future()
+                self.calls[key] = (future, thread_id)
+        if call is not None and call[1] == thread_id:
+            return function()
+        elif call is not None:
+            return call[0].result()
+        try:
+            result = function()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self.calls[key]
+
+
+in_flight = SingleFlight()
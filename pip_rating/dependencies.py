@@ -1,18 +1,54 @@
 import os.path
 import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from functools import cached_property
 from multiprocessing import cpu_count
-from typing import Optional, Union, Dict, TYPE_CHECKING, Hashable
+from typing import (
+    Optional,
+    Union,
+    Dict,
+    TYPE_CHECKING,
+    Hashable,
+    List,
+    Tuple,
+    FrozenSet,
+    Iterator,
+)
 
 from anytree import Node
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
 from pipgrip.cli import build_tree
+from pipgrip.libs.mixology.failure import SolverFailure
 from pipgrip.libs.mixology.package import Package as PipgripPackage
 from pipgrip.libs.mixology.partial_solution import PartialSolution
 from pipgrip.libs.mixology.result import SolverResult
 from pipgrip.libs.mixology.version_solver import VersionSolver
-from pipgrip.package_source import PackageSource
 
+from pip_rating.cache import CacheKey, get_cache_policy
+from pip_rating.fetcher import Fetcher
+from pip_rating.package_source import (
+    MetadataPackageSource,
+    discover_dependencies_and_versions,
+)
 from pip_rating.packages import Package
+from pip_rating.req_files.base import LockedPackage, LockedPackages
+from pip_rating.resolution import (
+    PreviousResolution,
+    ResolutionChange,
+    get_cached_tree,
+    get_previous_resolution,
+    get_previous_resolution_key,
+    get_resolution_changes,
+    get_resolution_key,
+    get_tree_versions,
+    normalize_requirement,
+    set_cached_tree,
+    set_previous_resolution,
+    tree_from_dict,
+)
+from pip_rating.sources.sourcerank import DEFAULT_SOURCERANK_BACKEND
 
 if TYPE_CHECKING:
     from pip_rating.req_files.base import ReqFileBase
@@ -26,7 +62,9 @@ version_resolver_threads = os.environ.get(
 
 
 class DependenciesVersionSolver(VersionSolver):
-    def __init__(self, results: "Results", source: "PackageSource", threads: int = 1):
+    def __init__(
+        self, results: "Results", source: "MetadataPackageSource", threads: int = 1
+    ):
         self.results = results
         super().__init__(source, threads=threads)
 
@@ -50,6 +88,10 @@ class Dependencies:
         extra_index_url: Optional[str] = None,
         pre: bool = False,
         ignore_packages: Optional[list] = None,
+        full_pypi_package: bool = False,
+        sourcerank_backend: str = DEFAULT_SOURCERANK_BACKEND,
+        refresh_resolution: bool = False,
+        incremental: bool = False,
     ):
         """Initialize the Dependencies class using the given req_file.
 
@@ -60,6 +102,13 @@ class Dependencies:
         :param extra_index_url: The extra index URL.
         :param pre: Whether to include pre-release and development versions. Defaults to False.
         :param ignore_packages: List of packages to ignore.
+        :param full_pypi_package: Keep the full PyPI documents of the packages. It is
+            only required by the JSON output.
+        :param sourcerank_backend: How the sourcerank of the packages is obtained.
+        :param refresh_resolution: Resolve the versions again instead of using the
+            cached resolution.
+        :param incremental: Resolve only the requirements changed since the previous
+            resolution of the requirements file.
         """
         self.results = results
         self.req_file = req_file
@@ -69,11 +118,38 @@ class Dependencies:
         self.pre = pre
         self.packages = {}  # type: Dict[str, Package]
         self.ignore_packages = ignore_packages or []
+        self.full_pypi_package = full_pypi_package
+        self.sourcerank_backend = sourcerank_backend
+        self.refresh_resolution = refresh_resolution
+        self.incremental = incremental
 
-    @cached_property
-    def package_source(self) -> PackageSource:
-        """Describe requirements, and discover dependencies on demand."""
-        return PackageSource(
+    @contextmanager
+    def configure_pip(self) -> Iterator[None]:
+        """In offline mode, pip only uses the wheels cached in the cache directory.
+        The environment variables of pip are restored when the context exits.
+        """
+        environ = {}
+        if get_cache_policy().offline:
+            environ["PIP_NO_INDEX"] = "1"
+            if self.cache_dir:
+                environ["PIP_FIND_LINKS"] = self.cache_dir
+        previous_environ = {name: os.environ.get(name) for name in environ}
+        os.environ.update(environ)
+        try:
+            yield
+        finally:
+            for name, value in previous_environ.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    def create_package_source(self) -> MetadataPackageSource:
+        """Describe requirements, and discover dependencies on demand. The
+        dependencies are read from the index metadata when it is available, so the
+        packages are not downloaded.
+        """
+        return MetadataPackageSource(
             cache_dir=self.cache_dir,
             index_url=self.index_url,
             extra_index_url=self.extra_index_url,
@@ -81,17 +157,23 @@ class Dependencies:
         )
 
     @cached_property
-    def version_solution(self) -> Union[SolverResult, PartialSolution]:
-        """Get the version solution for the packages. The version solver that finds a
-        set of package versions that satisfy the root package's dependencies.
+    def package_source(self) -> MetadataPackageSource:
+        return self.create_package_source()
+
+    def solve(
+        self, package_source: MetadataPackageSource
+    ) -> Union[SolverResult, PartialSolution]:
+        """Find a set of package versions that satisfy the requirements using the
+        given package source.
         """
         solver = DependenciesVersionSolver(
-            self.results, self.package_source, threads=version_resolver_threads
+            self.results, package_source, threads=version_resolver_threads
         )
         for root_dependency in self.req_file:
-            self.package_source.root_dep(root_dependency)
+            package_source.root_dep(root_dependency)
         try:
-            return solver.solve()
+            with self.configure_pip():
+                return solver.solve()
         except RuntimeError as e:
             if "Failed to download/build wheel" not in str(e):
                 # only continue handling expected RuntimeErrors
@@ -99,18 +181,231 @@ class Dependencies:
             return solver.solution
 
     @cached_property
-    def dependencies_tree(self) -> Node:
-        """Get the dependencies tree."""
+    def version_solution(self) -> Union[SolverResult, PartialSolution]:
+        """Get the version solution for the packages. The version solver that finds a
+        set of package versions that satisfy the root package's dependencies.
+        """
+        return self.solve(self.package_source)
+
+    def discover_dependencies(self, package: LockedPackage) -> List[str]:
+        """Get the canonical names of the dependencies of the locked version of the
+        package. Only this version is discovered, without resolving.
+        """
+        self.results.processing_package(package.name)
+        extras = f"[{','.join(sorted(package.extras))}]" if package.extras else ""
+        requires = discover_dependencies_and_versions(
+            f"{package.name}{extras}=={package.version}",
+            self.index_url,
+            self.extra_index_url,
+            self.cache_dir,
+            self.pre,
+        )["requires"]
+        return [canonicalize_name(Requirement(require).name) for require in requires]
+
+    def get_locked_packages(self) -> Optional[LockedPackages]:
+        """Get the locked packages of the requirements file with their dependencies.
+        If the file does not include the dependencies of the packages, they are
+        discovered concurrently. Returns None if the file has no lock data or a
+        dependency is not locked.
+        """
+        locked_packages = self.req_file.get_locked_packages()
+        if locked_packages is None:
+            return None
+        packages = [
+            package
+            for package in locked_packages.values()
+            if package.dependencies is None
+        ]
+        if not packages:
+            return locked_packages
+        with self.configure_pip(), ThreadPoolExecutor(
+            int(version_resolver_threads)
+        ) as executor:
+            try:
+                packages_dependencies = list(
+                    executor.map(self.discover_dependencies, packages)
+                )
+            except RuntimeError:
+                return None
+        for package, dependencies in zip(packages, packages_dependencies):
+            if any(name not in locked_packages for name in dependencies):
+                return None
+            locked_packages[canonicalize_name(package.name)] = package._replace(
+                dependencies=dependencies
+            )
+        return locked_packages
+
+    def add_locked_node(
+        self,
+        parent: Node,
+        locked_packages: LockedPackages,
+        name: str,
+        pip_string: str,
+        extras: FrozenSet[str] = frozenset(),
+    ):
+        """Add the node of a locked package and its dependencies to the tree. The
+        nodes have the same attributes as the pipgrip tree nodes.
+        """
+        package = locked_packages[name]
+        extras_name = package.name.lower()
+        if extras:
+            extras_name += f"[{','.join(sorted(extras))}]"
+        node = Node(
+            package.name.lower(),
+            version=package.version,
+            parent=parent,
+            pip_string=pip_string,
+            extras_name=extras_name,
+            extras=set(extras),
+        )
+        if any(ancestor.name == node.name for ancestor in node.ancestors):
+            node.cyclic = True
+            return
+        for dependency in package.dependencies:
+            dependency_package = locked_packages[dependency]
+            self.add_locked_node(
+                node,
+                locked_packages,
+                dependency,
+                f"{dependency_package.name}=={dependency_package.version}",
+            )
+
+    def get_locked_tree(self) -> Optional[Node]:
+        """Build the dependencies tree from the lock data of the requirements file,
+        without resolving the versions. Returns None if any package is not locked,
+        so the versions must be resolved.
+        """
+        locked_packages = self.get_locked_packages()
+        if locked_packages is None:
+            return None
+        root_requirements = []
+        for requirement in self.req_file:
+            try:
+                req = Requirement(requirement)
+            except InvalidRequirement:
+                return None
+            if req.marker is not None and not req.marker.evaluate({"extra": ""}):
+                continue
+            if canonicalize_name(req.name) not in locked_packages:
+                return None
+            root_requirements.append(req)
+        tree_root = Node("__root__")
+        for req in root_requirements:
+            self.add_locked_node(
+                tree_root,
+                locked_packages,
+                canonicalize_name(req.name),
+                str(req),
+                frozenset(req.extras),
+            )
+        return tree_root
+
+    @cached_property
+    def previous_resolution_key(self) -> Optional[CacheKey]:
+        """The previous resolution is only used in incremental mode, and only for the
+        requirements files.
+        """
+        path = getattr(self.req_file, "path", None)
+        if not self.incremental or path is None:
+            return None
+        return get_previous_resolution_key(
+            path, self.index_url, self.extra_index_url, self.pre
+        )
+
+    @cached_property
+    def previous_resolution(self) -> Optional[PreviousResolution]:
+        if self.previous_resolution_key is None:
+            return None
+        return get_previous_resolution(self.previous_resolution_key)
+
+    def get_solution_tree(
+        self,
+        package_source: MetadataPackageSource,
+        solution: Union[SolverResult, PartialSolution],
+    ) -> Node:
+        """Build the tree of the packages using the versions of the solution."""
         decision_packages = {}
-        for package, version in self.version_solution.decisions.items():
+        for package, version in solution.decisions.items():
             if package == PipgripPackage.root():
                 continue
             decision_packages[package] = version
-        tree_root, packages_tree_dict, packages_flat = build_tree(
-            self.package_source, decision_packages
+        with self.configure_pip():
+            tree_root, packages_tree_dict, packages_flat = build_tree(
+                package_source, decision_packages
+            )
+        return tree_root
+
+    def get_incremental_tree(self) -> Optional[Node]:
+        """Resolve only the requirements changed since the previous resolution. The
+        packages of the previous tree that are not dependencies of a changed or
+        removed requirement keep their versions and dependencies, so they are not
+        discovered again. The other packages prefer their previous versions. Returns
+        None if the kept versions are not compatible with the changes.
+        """
+        previous_tree = tree_from_dict(self.previous_resolution["tree"])
+        requirements = {normalize_requirement(req) for req in self.req_file}
+        affected = set()
+        for node in previous_tree.children:
+            if normalize_requirement(node.pip_string) not in requirements:
+                affected.update(item.name for item in (node, *node.descendants))
+        package_source = self.create_package_source()
+        package_source.preferred_versions = get_tree_versions(previous_tree)
+        seeded = set()
+        for node in previous_tree.descendants:
+            seed_key = (node.name, frozenset(node.extras), node.version)
+            if (
+                node.name in affected
+                or getattr(node, "cyclic", False)
+                or node.version == "undecided"
+                or seed_key in seeded
+            ):
+                continue
+            seeded.add(seed_key)
+            package_source.seed(
+                *seed_key, [child.pip_string for child in node.children]
+            )
+        try:
+            solution = self.solve(package_source)
+        except SolverFailure:
+            return None
+        if not isinstance(solution, SolverResult):
+            return None
+        return self.get_solution_tree(package_source, solution)
+
+    def get_resolved_tree(self) -> Node:
+        """Resolve the versions using pipgrip and build the tree. The tree is cached
+        using a hash of the requirements, so the same requirements are not resolved
+        again until the cached tree expires. The partial resolutions are not cached.
+        In incremental mode, only the changes since the previous resolution of the
+        requirements file are resolved if possible.
+        """
+        key = get_resolution_key(
+            self.req_file, self.index_url, self.extra_index_url, self.pre
         )
+        if not self.refresh_resolution:
+            tree_root = get_cached_tree(key)
+            if tree_root is not None:
+                return tree_root
+            if self.previous_resolution is not None:
+                tree_root = self.get_incremental_tree()
+                if tree_root is not None:
+                    set_cached_tree(key, tree_root)
+                    return tree_root
+        tree_root = self.get_solution_tree(self.package_source, self.version_solution)
+        if isinstance(self.version_solution, SolverResult):
+            set_cached_tree(key, tree_root)
         return tree_root
 
+    @cached_property
+    def dependencies_tree(self) -> Node:
+        """Get the dependencies tree. If all the packages are locked, the tree is
+        built from the lock data. Otherwise, the versions are resolved using pipgrip.
+        """
+        locked_tree = self.get_locked_tree()
+        if locked_tree is not None:
+            return locked_tree
+        return self.get_resolved_tree()
+
     def add_node_package(self, node: Node) -> Optional[Package]:
         """Add the package as a node to the packages' dict."""
         if node.name in self.ignore_packages:
@@ -125,6 +420,34 @@ class Dependencies:
             self.add_node_package(dependency_node)
         return self.packages
 
+    def fetch_sources(self):
+        """Fetch concurrently the sources data of all the packages, so the rating
+        pass does not have to wait for the requests one after another.
+        """
+        Fetcher(self).fetch(self.results.fetched_package)
+
+    def warm_cache(self) -> List[Tuple[Package, Exception]]:
+        """Fill the caches of the sources and the ratings of all the packages in the
+        dependencies tree, without rating the dependencies. Returns the packages
+        whose cache could not be filled with the error raised.
+        """
+        self.fetch_sources()
+        failed_packages = []
+        for package in Fetcher(self).get_packages():
+            try:
+                package.rating
+            except Exception as e:
+                failed_packages.append((package, e))
+        return failed_packages
+
+    def get_cache_keys(self) -> List[CacheKey]:
+        """Get the cache keys of all the packages in the dependencies tree."""
+        return [
+            key
+            for package in Fetcher(self).get_packages()
+            for key in package.get_cache_keys()
+        ]
+
     @cached_property
     def total_size(self):
         return sum(
@@ -132,10 +455,48 @@ class Dependencies:
             for package in self.packages.values()
         )
 
-    def get_global_rating_score(self):
+    def get_ratings(self) -> Dict[str, Optional[int]]:
+        """Get the global rating score of the rated packages, or None if unknown."""
+        return {
+            name: None
+            if package.rating.is_unknown
+            else package.rating.get_global_rating_score()
+            for name, package in self.packages.items()
+        }
+
+    def get_changes(self) -> List[ResolutionChange]:
+        """Get the packages whose version or rating changed since the previous
+        resolution of the requirements file.
+        """
+        if self.previous_resolution is None:
+            return []
+        return get_resolution_changes(
+            self.previous_resolution, self.dependencies_tree, self.get_ratings()
+        )
+
+    def save_previous_resolution(self):
+        """Save the tree and the ratings, so they are used by the next incremental
+        resolution of the requirements file.
+        """
+        if self.previous_resolution_key is None:
+            return
+        set_previous_resolution(
+            self.previous_resolution_key,
+            self.req_file,
+            self.dependencies_tree,
+            self.get_ratings(),
+        )
+
+    def get_global_rating_score(self) -> Optional[int]:
+        """Get the lowest global rating score of the packages. The packages with an
+        unknown rating are ignored, and if all of them are unknown, returns None.
+        """
         final_global_rating_score = None
         packages = dict(self.get_packages()).values()
+        self.fetch_sources()
         for package in packages:
+            if package.rating.is_unknown:
+                continue
             global_rating_score = package.rating.get_global_rating_score()
             if final_global_rating_score is None:
                 final_global_rating_score = global_rating_score
@@ -30,6 +30,16 @@ class RequirementsRatingInvalidFile(RequirementsRatingError):
     exit_code = 12
 
 
+class RequirementsRatingInvalidBundle(RequirementsRatingError):
+    body = "Invalid cache bundle"
+    exit_code = 14
+
+
+class RequirementsRatingInvalidEnvironment(RequirementsRatingError):
+    body = "Invalid Python environment"
+    exit_code = 15
+
+
 class RequirementsRatingMissingReqFile(RequirementsRatingError):
     exit_code = 13
 
@@ -0,0 +1,124 @@
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed, wait
+from typing import TYPE_CHECKING, Dict, List, Type, Callable
+
+from pip_rating.cache import background_refresher
+from pip_rating.sources.audit import Audit, AuditBatch
+from pip_rating.sources.base import SourceBase
+from pip_rating.sources.pypi import Pypi
+from pip_rating.sources.sourcecode_page import SourcecodePage, SourcecodePageBatch
+from pip_rating.sources.sourcerank import SourceRank
+
+if TYPE_CHECKING:
+    from pip_rating.dependencies import Dependencies
+    from pip_rating.packages import Package
+
+
+FETCH_SOURCES: List[Type[SourceBase]] = [Pypi, SourceRank, SourcecodePage, Audit]
+
+
+class Fetcher:
+    """Fetch the data of all the sources for all the packages in the dependencies
+    tree concurrently. Each source has its own thread pool, so the concurrency can be
+    configured per source using the ``PIP_RATING_<SOURCE>_FETCH_THREADS`` environment
+    variables.
+    """
+
+    def __init__(self, dependencies: "Dependencies"):
+        self.dependencies = dependencies
+        self.executors: Dict[str, ThreadPoolExecutor] = {}
+
+    def get_executor(self, source_cls: Type[SourceBase]) -> ThreadPoolExecutor:
+        """Get the thread pool for the given source class."""
+        if source_cls.source_name not in self.executors:
+            self.executors[source_cls.source_name] = ThreadPoolExecutor(
+                max_workers=source_cls.fetch_threads,
+                thread_name_prefix=f"pip-rating-{source_cls.source_name}",
+            )
+        return self.executors[source_cls.source_name]
+
+    def submit(self, source: SourceBase) -> Future:
+        """Submit the fetch of the source data to the source thread pool."""
+        return self.get_executor(type(source)).submit(source.fetch)
+
+    def get_packages(self) -> List["Package"]:
+        """Get all the packages that will be rated, in the same order as the rating
+        pass adds them to the dependencies' packages.
+        """
+        packages = list(self.dependencies.get_packages().values())
+        for package in list(packages):
+            for descendant_package in package.get_descendant_packages():
+                if descendant_package not in packages:
+                    packages.append(descendant_package)
+        return packages
+
+    def fetch_sourcecode_pages(self, sourcecode_pages: List[SourcecodePage]):
+        """Get the GitHub readmes of the pages using batch queries. The stale pages
+        are refreshed in background. Errors are ignored, so the pages are fetched
+        one by one later. The pages that cannot be batched are refreshed one by one
+        in background when they are fetched.
+        """
+        stale_batch = SourcecodePageBatch(
+            [page for page in sourcecode_pages if page.is_cache_stale],
+            SourcecodePage.session_pool,
+        )
+        stale_pages = stale_batch.get_sourcecode_pages()
+        if stale_pages:
+            background_refresher.submit(
+                [page.cache_key for page in stale_pages], stale_batch.fetch
+            )
+        sourcecode_batch = SourcecodePageBatch(
+            [page for page in sourcecode_pages if not page.is_cache_stale],
+            SourcecodePage.session_pool,
+        )
+        wait([self.get_executor(SourcecodePage).submit(sourcecode_batch.fetch)])
+
+    def fetch(self, on_fetched: Callable[["Package"], None] = lambda package: None):
+        """Fetch the sources data for all the packages. The Pypi source is fetched
+        first because the other package sources require the package real name and the
+        project urls. The vulnerabilities of all the packages versions, and the GitHub
+        readmes of all the packages, are fetched at the same time using batch queries,
+        or one by one if the batch queries fail. The stale entries are refreshed in
+        background using other batches.
+        Errors are ignored here: they are raised again when the data is requested in
+        the rating pass.
+
+        :param on_fetched: Callback called when the data of a package has been fetched.
+        """
+        packages = self.get_packages()
+        audits = [
+            package.get_audit(node)
+            for package in packages
+            for node in {node.version: node for node in package.nodes}.values()
+        ]
+        stale_audits = [audit for audit in audits if audit.is_cache_stale]
+        if stale_audits:
+            background_refresher.submit(
+                [audit.cache_key for audit in stale_audits],
+                AuditBatch(stale_audits, Audit.session_pool).fetch,
+            )
+        pypi_futures = {}
+        try:
+            audit_batch = AuditBatch(
+                [audit for audit in audits if not audit.is_cache_stale],
+                Audit.session_pool,
+            )
+            audit_future = self.get_executor(Audit).submit(audit_batch.fetch)
+            futures = []
+            sourcecode_pages = []
+            for package in packages:
+                pypi_futures[self.submit(package.pypi)] = package
+            for future in as_completed(pypi_futures):
+                package = pypi_futures[future]
+                if future.exception() is None:
+                    futures.append(self.submit(package.sourcerank))
+                    sourcecode_pages.append(package.sourcecode_page)
+                on_fetched(package)
+            self.fetch_sourcecode_pages(sourcecode_pages)
+            futures.extend(self.submit(page) for page in sourcecode_pages)
+            if audit_future.exception() is not None:
+                futures.extend(self.submit(audit) for audit in audits)
+            wait(futures)
+        finally:
+            for executor in self.executors.values():
+                executor.shutdown(wait=True)
+            self.executors = {}
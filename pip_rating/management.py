@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 """Console script for pip-rating."""
+import datetime
+import json
 import os
 import platform
 import sys
@@ -8,7 +10,6 @@ from pathlib import Path
 from typing import Optional, List
 
 import click
-import requests
 from requests import RequestException
 from rich.console import Console
 
@@ -19,16 +20,51 @@ with warnings.catch_warnings():
 import pip_rating
 from pip_rating import project_name, __version__
 from pip_rating._compat import USER_CACHE_DIR
+from pip_rating.bundles import export_bundle, get_items, import_bundle
+from pip_rating.cache import (
+    CACHE_POLICIES,
+    DEFAULT_CACHE_POLICY,
+    MAX_STALENESS_DAYS,
+    CachePolicy,
+    background_refresher,
+    get_cache_backend,
+    parse_size,
+    prune_cache,
+    set_cache_policy,
+)
 from pip_rating.dependencies import Dependencies
 from pip_rating.exceptions import catch
 from pip_rating.req_files import get_req_file_cls, REQ_FILE_CLASSES, find_in_directory
+from pip_rating.req_files.base import ReqFileBase
+from pip_rating.req_files.environment import EnvironmentReqFile
 from pip_rating.req_files.package_list import PackageList
 from pip_rating.results import Results, FORMATS
+from pip_rating.sessions import session_pool
+from pip_rating.sources.sourcerank import SOURCERANK_BACKENDS
+from pip_rating.stats import run_stats, get_cache_stats, print_cache_stats
+
+STATS_FORMATS = ("text", "json")
+
+
+def is_offline() -> bool:
+    """Check the PIP_RATING_OFFLINE environment variable, as the --offline option
+    does. The commands without the option use it too.
+    """
+    value = os.environ.get("PIP_RATING_OFFLINE", "")
+    try:
+        return bool(value) and click.BOOL.convert(value, None, None)
+    except click.BadParameter:
+        return False
 
 
 def is_last_version() -> Optional[bool]:
+    """Check if this is the latest version in PyPI. Returns None if it cannot be
+    checked, as in offline mode.
+    """
+    if session_pool.offline or is_offline():
+        return None
     try:
-        with requests.get(f"https://pypi.org/pypi/{project_name}/json") as response:
+        with session_pool.get(f"https://pypi.org/pypi/{project_name}/json") as response:
             response.raise_for_status()
             return parse_version(__version__) >= parse_version(
                 response.json()["info"]["version"]
@@ -55,11 +91,14 @@ def cli(ctx: click.Context, version: bool):
         console.print(
             f"[bold]{project_name}[/bold] [bold green]{__version__}[/bold green]"
         )
-        console.print(
-            "  :top_arrow: This is the latest version."
-            if latest_version
-            else f"  :boom: There is a newer version available. Update it using 'pip install -U {project_name}'"
-        )
+        if latest_version is None:
+            console.print("  :grey_question: Cannot check the latest version.")
+        else:
+            console.print(
+                "  :top_arrow: This is the latest version."
+                if latest_version
+                else f"  :boom: There is a newer version available. Update it using 'pip install -U {project_name}'"
+            )
         console.print(f"  :snake: Python version: {sys.version.split()[0]}")
         console.print(
             f"  :computer: Platform: [bold blue]{platform.platform()}[/bold blue]"
@@ -77,7 +116,7 @@ def cli(ctx: click.Context, version: bool):
         ctx.invoke(analyze_file, file=str(req_file.path))
 
 
-def common_options(function):
+def resolver_options(function):
     function = click.option(
         "--cache-dir",
         envvar="PIP_CACHE_DIR",
@@ -98,6 +137,71 @@ def common_options(function):
         # envvar="PIP_EXTRA_INDEX_URL",  # let pip discover
         help="Extra URLs of package indexes to use in addition to --index-url.",
     )(function)
+    function = click.option(
+        "--ignore-package",
+        "ignore_packages",
+        type=str,
+        multiple=True,
+        help="Ignore a package. You can use this option multiple times.",
+    )(function)
+    function = click.option(
+        "--refresh-resolution",
+        is_flag=True,
+        envvar="PIP_RATING_REFRESH_RESOLUTION",
+        help="Resolve the versions of the dependencies again, instead of using the "
+        "cached resolution of the same requirements.",
+    )(function)
+    return function
+
+
+def incremental_options(function):
+    function = click.option(
+        "--incremental",
+        is_flag=True,
+        envvar="PIP_RATING_INCREMENTAL",
+        help="Resolve only the requirements changed since the previous resolution "
+        "of the requirements file, and show the packages whose version or rating "
+        "changed.",
+    )(function)
+    return function
+
+
+def stats_options(function):
+    function = click.option(
+        "--stats",
+        "show_stats",
+        is_flag=True,
+        envvar="PIP_RATING_STATS",
+        help="Show the cache hits, misses, revalidations, bytes downloaded and "
+        "latencies per source on stderr at the end of the run.",
+    )(function)
+    function = click.option(
+        "--stats-format",
+        type=click.Choice(STATS_FORMATS),
+        default="text",
+        help="Format of the --stats output. By default it uses 'text'.",
+    )(function)
+    return function
+
+
+def sourcerank_options(function):
+    function = click.option(
+        "--sourcerank-backend",
+        type=click.Choice(SOURCERANK_BACKENDS),
+        default="api",
+        envvar="PIP_RATING_SOURCERANK_BACKEND",
+        help="How the sourcerank is obtained. Using 'api' the libraries.io API is "
+        "used if the LIBRARIES_IO_API_KEY environment variable is set, with the "
+        "'html' page scraper as fallback. By default it uses 'api'.",
+    )(function)
+    return function
+
+
+def common_options(function):
+    function = resolver_options(function)
+    function = incremental_options(function)
+    function = stats_options(function)
+    function = sourcerank_options(function)
     function = click.option(
         "--format",
         "-f",
@@ -113,15 +217,62 @@ def common_options(function):
         help="Output file. By default output to console.",
     )(function)
     function = click.option(
-        "--ignore-package",
-        "ignore_packages",
-        type=str,
-        multiple=True,
-        help="Ignore a package. You can use this option multiple times.",
+        "--cache-policy",
+        type=click.Choice(CACHE_POLICIES),
+        default=DEFAULT_CACHE_POLICY,
+        help="How the expired cache is handled. Using 'stale-while-revalidate' the "
+        "expired data is used while it is refreshed in background.",
+    )(function)
+    function = click.option(
+        "--max-staleness",
+        type=click.IntRange(min=0),
+        default=MAX_STALENESS_DAYS,
+        help="Maximum age in days of the expired data used by the "
+        f"'stale-while-revalidate' cache policy. By default {MAX_STALENESS_DAYS}.",
+    )(function)
+    function = click.option(
+        "--offline",
+        is_flag=True,
+        envvar="PIP_RATING_OFFLINE",
+        help="Do not use the network. Only the cached data is used, and the packages "
+        "without cached data are rated as unknown.",
     )(function)
     return function
 
 
+def configure_cache(cache_policy: str, max_staleness: int, offline: bool = False):
+    """Configure the cache using the command options."""
+    set_cache_policy(
+        CachePolicy(cache_policy, datetime.timedelta(days=max_staleness), offline)
+    )
+    session_pool.offline = offline
+
+
+def finish_cache(show_stats: bool = False, stats_format: str = "text"):
+    """Wait for the background refreshes and prune the cache at the end of a run.
+    Optionally, show the run stats on stderr.
+    """
+    background_refresher.wait()
+    prune_cache()
+    get_cache_backend().close()
+    if show_stats and stats_format == "json":
+        click.echo(json.dumps(run_stats.as_dict(), indent=2), err=True)
+    elif show_stats:
+        run_stats.print(Console(stderr=True))
+
+
+def size_callback(
+    ctx: click.Context, param: click.Parameter, value: Optional[str]
+) -> Optional[int]:
+    """Convert a size option to bytes."""
+    if value is None:
+        return None
+    try:
+        return parse_size(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
 @cli.command()
 @click.argument("file", type=click.Path(exists=True, dir_okay=False))
 @click.option(
@@ -137,11 +288,22 @@ def analyze_file(
     format_name: str,
     to_file: Optional[str],
     ignore_packages: List[str],
+    refresh_resolution: bool,
+    incremental: bool,
+    cache_policy: str,
+    max_staleness: int,
+    offline: bool,
+    show_stats: bool,
+    stats_format: str,
+    sourcerank_backend: str,
 ):
     """Analyze a requirements file. A requirements file is required as argument. By default, it tries to detect the
     type of the file, but you can force it using the ``--file-type`` option. The supported file types are:
-    *requirements.txt, requirements.in, setup.py, setup.cfg, Pipfile and pyproject.toml*.
+    *requirements.txt, requirements.in, setup.py, setup.cfg, Pipfile, pyproject.toml, poetry.lock and
+    Pipfile.lock*. If all the packages of the file are pinned, like in the lock files or the pip-compile output, the
+    versions are not resolved again.
     """
+    configure_cache(cache_policy, max_staleness, offline)
     results = Results(to_file)
     file = Path(file)
     if file_type is None:
@@ -156,8 +318,14 @@ def analyze_file(
         index_url,
         extra_index_url,
         ignore_packages=ignore_packages,
+        refresh_resolution=refresh_resolution,
+        incremental=incremental,
+        full_pypi_package=format_name == "json",
+        sourcerank_backend=sourcerank_backend,
     )
     results.show_results(dependencies, format_name)
+    dependencies.save_previous_resolution()
+    finish_cache(show_stats, stats_format)
 
 
 @cli.command()
@@ -171,10 +339,19 @@ def analyze_package(
     format_name: str,
     to_file: str,
     ignore_packages: List[str],
+    refresh_resolution: bool,
+    incremental: bool,
+    cache_policy: str,
+    max_staleness: int,
+    offline: bool,
+    show_stats: bool,
+    stats_format: str,
+    sourcerank_backend: str,
 ):
     """Analyze a package. A package name is required as argument. The syntax is the same as pip install. For example:
     ``Django==4.2.3``. If only one package is specified, it will show their dependencies in detail.
     """
+    configure_cache(cache_policy, max_staleness, offline)
     results = Results(to_file)
     req_file = PackageList(package_names)
     dependencies = Dependencies(
@@ -184,6 +361,10 @@ def analyze_package(
         index_url,
         extra_index_url,
         ignore_packages=ignore_packages,
+        refresh_resolution=refresh_resolution,
+        incremental=incremental,
+        full_pypi_package=format_name == "json",
+        sourcerank_backend=sourcerank_backend,
     )
     if len(package_names) == 1:
         nodes = dependencies.dependencies_tree.children[0].children
@@ -197,8 +378,309 @@ def analyze_package(
             index_url,
             extra_index_url,
             ignore_packages=ignore_packages,
+            refresh_resolution=refresh_resolution,
+            incremental=incremental,
+            full_pypi_package=format_name == "json",
+            sourcerank_backend=sourcerank_backend,
         )
     results.show_results(dependencies, format_name)
+    dependencies.save_previous_resolution()
+    finish_cache(show_stats, stats_format)
+
+
+@cli.command()
+@click.option(
+    "--path",
+    "paths",
+    type=click.Path(exists=True, file_okay=False),
+    multiple=True,
+    help="Site-packages directory with the installed packages. It can be used "
+    "multiple times. The markers are evaluated with the current interpreter.",
+)
+@click.option(
+    "--python",
+    "python",
+    type=str,
+    help="Python interpreter of the environment to analyze. By default, the "
+    "current interpreter.",
+)
+@common_options
+def analyze_env(
+    paths: List[str],
+    python: Optional[str],
+    cache_dir: str,
+    index_url: str,
+    extra_index_url: str,
+    format_name: str,
+    to_file: str,
+    ignore_packages: List[str],
+    refresh_resolution: bool,
+    incremental: bool,
+    cache_policy: str,
+    max_staleness: int,
+    offline: bool,
+    show_stats: bool,
+    stats_format: str,
+    sourcerank_backend: str,
+):
+    """Analyze the packages installed in a Python environment. The dependencies
+    tree is built from the metadata of the installed packages, without resolving
+    the dependencies.
+    """
+    if paths and python:
+        raise click.UsageError("--path and --python cannot be used together.")
+    configure_cache(cache_policy, max_staleness, offline)
+    results = Results(to_file)
+    results.status.update("Read installed packages")
+    if python:
+        req_file = EnvironmentReqFile.from_interpreter(python)
+    else:
+        req_file = EnvironmentReqFile(list(paths) or None)
+    dependencies = Dependencies(
+        results,
+        req_file,
+        cache_dir,
+        index_url,
+        extra_index_url,
+        ignore_packages=ignore_packages,
+        refresh_resolution=refresh_resolution,
+        incremental=incremental,
+        full_pypi_package=format_name == "json",
+        sourcerank_backend=sourcerank_backend,
+    )
+    results.show_results(dependencies, format_name)
+    dependencies.save_previous_resolution()
+    finish_cache(show_stats, stats_format)
+
+
+@cli.group()
+def cache():
+    """Manage the cache of the packages data and ratings."""
+
+
+def get_req_files(
+    files: List[str], package_names: List[str], file_type: Optional[str]
+) -> List[ReqFileBase]:
+    """Get the requirements files of the cache commands. The packages are added as
+    an additional requirements file.
+    """
+    req_files = []
+    for file in map(Path, files):
+        if file_type is None:
+            req_file_cls = get_req_file_cls(file)
+        else:
+            req_file_cls = REQ_FILE_CLASSES[file_type]
+        req_files.append(req_file_cls(file))
+    if package_names:
+        req_files.append(PackageList(package_names))
+    return req_files
+
+
+@cache.command()
+@click.argument("files", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--package",
+    "-p",
+    "package_names",
+    multiple=True,
+    help="Package to warm using the pip install syntax. You can use this option "
+    "multiple times.",
+)
+@click.option(
+    "--file-type", type=click.Choice(list(REQ_FILE_CLASSES.keys())), default=None
+)
+@resolver_options
+@stats_options
+@sourcerank_options
+def warm(
+    files: List[str],
+    package_names: List[str],
+    file_type: Optional[str],
+    cache_dir: str,
+    index_url: str,
+    extra_index_url: str,
+    ignore_packages: List[str],
+    refresh_resolution: bool,
+    show_stats: bool,
+    stats_format: str,
+    sourcerank_backend: str,
+):
+    """Fill the cache of the given requirements files and packages without analyzing
+    them. Each requirements file (and the packages list) is resolved once, and the
+    data of all the packages is fetched concurrently. Use this command periodically to
+    make the next analyses cache hits.
+    """
+    if not files and not package_names:
+        raise click.UsageError("At least one requirements file or package is required.")
+    results = Results()
+    req_files = get_req_files(files, package_names, file_type)
+    total_packages = 0
+    failed_packages = []
+    for req_file in req_files:
+        results.status.update(f"Resolving [bold green]{req_file}[/bold green]")
+        dependencies = Dependencies(
+            results,
+            req_file,
+            cache_dir,
+            index_url,
+            extra_index_url,
+            ignore_packages=ignore_packages,
+            refresh_resolution=refresh_resolution,
+            sourcerank_backend=sourcerank_backend,
+        )
+        failed_packages.extend(dependencies.warm_cache())
+        total_packages += len(dependencies.packages)
+    results.status.stop()
+    for package, error in failed_packages:
+        results.progress_console.print(
+            f":warning: Cannot warm the cache of [bold blue]{package.name}[/bold blue]: "
+            f"{error}"
+        )
+    results.progress_console.print(
+        f":fire: Warmed the cache of [bold green]{total_packages - len(failed_packages)}"
+        f"[/bold green] packages."
+    )
+    finish_cache(show_stats, stats_format)
+
+
+@cache.command()
+@click.option(
+    "--max-size",
+    callback=size_callback,
+    help="Maximum total size of the cache, for example 200MB. The least recently "
+    "used entries are deleted first.",
+)
+@click.option(
+    "--older-than",
+    type=click.IntRange(min=0),
+    help="Delete the entries not used in this number of days.",
+)
+def prune(max_size: Optional[int], older_than: Optional[int]):
+    """Delete cache entries. Using ``--older-than``, the entries not used in the
+    given number of days are deleted. Using ``--max-size``, the least recently used
+    entries are deleted until the cache size is under the limit. The cache is also
+    pruned automatically at the end of each run, using the
+    ``PIP_RATING_CACHE_MAX_SIZE`` and ``PIP_RATING_CACHE_MAX_AGE`` environment
+    variables.
+    """
+    if max_size is None and older_than is None:
+        raise click.UsageError("At least --max-size or --older-than is required.")
+    backend = get_cache_backend()
+    deleted = backend.prune(
+        max_size,
+        datetime.timedelta(days=older_than) if older_than is not None else None,
+    )
+    backend.close()
+    Console(stderr=True).print(
+        f":broom: Deleted [bold green]{len(deleted)}[/bold green] cache entries "
+        f"({sum(entry.size for entry in deleted)} bytes)."
+    )
+
+
+@cache.command()
+@click.option(
+    "--format",
+    "-f",
+    "format_name",
+    type=click.Choice(STATS_FORMATS),
+    default="text",
+    help="Output format. By default it uses 'text'.",
+)
+def stats(format_name: str):
+    """Show the number of entries, the size in bytes and the histogram of the ages
+    of the cache entries per source.
+    """
+    backend = get_cache_backend()
+    cache_stats = get_cache_stats(backend.get_entries())
+    backend.close()
+    if format_name == "json":
+        click.echo(json.dumps(cache_stats, indent=2))
+    else:
+        print_cache_stats(cache_stats, Console())
+
+
+@cache.command("export")
+@click.argument("output", type=click.Path(dir_okay=False, resolve_path=True))
+@click.option(
+    "--requirements",
+    "-r",
+    "files",
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Only export the entries of the packages of this requirements file. You "
+    "can use this option multiple times.",
+)
+@click.option(
+    "--package",
+    "-p",
+    "package_names",
+    multiple=True,
+    help="Only export the entries of this package and its dependencies, using the "
+    "pip install syntax. You can use this option multiple times.",
+)
+@click.option(
+    "--file-type", type=click.Choice(list(REQ_FILE_CLASSES.keys())), default=None
+)
+@resolver_options
+def export_cache(
+    output: str,
+    files: List[str],
+    package_names: List[str],
+    file_type: Optional[str],
+    cache_dir: str,
+    index_url: str,
+    extra_index_url: str,
+    ignore_packages: List[str],
+    refresh_resolution: bool,
+):
+    """Export the cache entries to a compressed archive. By default all the entries
+    are exported. Using ``--requirements`` or ``--package``, only the entries of the
+    resolved packages are exported.
+    """
+    backend = get_cache_backend()
+    cache_keys = None
+    if files or package_names:
+        results = Results()
+        cache_keys = []
+        for req_file in get_req_files(files, package_names, file_type):
+            results.status.update(f"Resolving [bold green]{req_file}[/bold green]")
+            dependencies = Dependencies(
+                results,
+                req_file,
+                cache_dir,
+                index_url,
+                extra_index_url,
+                ignore_packages=ignore_packages,
+                refresh_resolution=refresh_resolution,
+            )
+            cache_keys.extend(dependencies.get_cache_keys())
+        results.status.stop()
+    index = export_bundle(Path(output), get_items(backend, cache_keys))
+    backend.close()
+    Console(stderr=True).print(
+        f":package: Exported [bold green]{index['entries']}[/bold green] cache "
+        f"entries to [bold]{output}[/bold]."
+    )
+
+
+@cache.command("import")
+@click.argument("bundle", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--overwrite",
+    is_flag=True,
+    help="Replace the cached entries even if they are newer than the imported ones.",
+)
+def import_cache(bundle: str, overwrite: bool):
+    """Import the cache entries of an archive created using ``cache export``. The
+    archive is validated before importing any entry. By default, the cached entries
+    newer than the imported ones are kept.
+    """
+    backend = get_cache_backend()
+    items = import_bundle(Path(bundle), backend, overwrite)
+    backend.close()
+    Console(stderr=True).print(
+        f":inbox_tray: Imported [bold green]{len(items)}[/bold green] cache entries."
+    )
 
 
 def manage():
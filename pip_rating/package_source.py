@@ -0,0 +1,187 @@
+"""Discover the dependencies of the packages from the metadata of the index."""
+import platform
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, TypedDict
+
+import requests
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+from packaging.tags import Tag, sys_tags
+from packaging.utils import parse_wheel_filename
+from packaging.version import Version
+from pipgrip import pipper
+from pipgrip.package_source import PackageSource
+from pipgrip.pipper import _get_wheel_requirements, parse_req
+
+from pip_rating.sources.simple_index import (
+    CoreMetadata,
+    IndexFile,
+    SimpleIndex,
+)
+
+
+class DiscoveredPackage(TypedDict):
+    name: str
+    version: str
+    available: List[str]
+    requires: List[str]
+
+
+@lru_cache()
+def get_supported_tags() -> FrozenSet[Tag]:
+    return frozenset(sys_tags())
+
+
+def is_compatible(index_file: IndexFile) -> bool:
+    """Check if pip could install the file in the current interpreter."""
+    if index_file["requires_python"]:
+        try:
+            specifier = SpecifierSet(index_file["requires_python"])
+        except InvalidSpecifier:
+            pass
+        else:
+            if not specifier.contains(platform.python_version(), prereleases=True):
+                return False
+    if not index_file["filename"].endswith(".whl"):
+        return True
+    tags = parse_wheel_filename(index_file["filename"])[3]
+    return not tags.isdisjoint(get_supported_tags())
+
+
+def get_index_files(
+    name: str, index_url: Optional[str], extra_index_url: Optional[str]
+) -> Dict[Version, List[IndexFile]]:
+    """Get the files of the package compatible with the current interpreter in the
+    indexes, by version.
+    """
+    versions: Dict[Version, List[IndexFile]] = {}
+    for url in [index_url, extra_index_url] if extra_index_url else [index_url]:
+        for index_file in SimpleIndex(name, url).files:
+            if is_compatible(index_file):
+                versions.setdefault(Version(index_file["version"]), []).append(
+                    index_file
+                )
+    return versions
+
+
+def select_version(
+    versions: Dict[Version, List[IndexFile]], specifier: SpecifierSet, pre: bool
+) -> Optional[Version]:
+    """Select the latest version allowed by the specifier, like pip does. The
+    yanked versions are only selected if no other version is allowed (PEP 592).
+    """
+    not_yanked = [
+        version
+        for version, files in versions.items()
+        if any(not index_file["yanked"] for index_file in files)
+    ]
+    for candidates in (not_yanked, list(versions)):
+        allowed = list(specifier.filter(candidates, prereleases=pre or None))
+        if allowed:
+            return max(allowed)
+    return None
+
+
+def discover_from_metadata(
+    package: str, index_url: Optional[str], extra_index_url: Optional[str], pre: bool
+) -> Optional[DiscoveredPackage]:
+    """Discover the version and the dependencies of the package using the index
+    metadata, without downloading the package. Returns None if the index has no
+    metadata for the selected version.
+    """
+    try:
+        req = Requirement(package)
+    except InvalidRequirement:
+        return None
+    if req.url:
+        return None
+    versions = get_index_files(req.name, index_url, extra_index_url)
+    version = select_version(versions, req.specifier, pre)
+    if version is None:
+        return None
+    requires_dist = CoreMetadata(
+        req.name, str(version), versions[version], index_url
+    ).requires_dist
+    if requires_dist is None:
+        return None
+    available = [
+        str(available_version)
+        for available_version in sorted(versions)
+        if pre or not available_version.is_prerelease
+    ]
+    if str(version) not in available:
+        available.append(str(version))
+    return {
+        "name": req.name,
+        "version": str(version),
+        "available": available,
+        "requires": _get_wheel_requirements(
+            {"requires_dist": requires_dist}, sorted(req.extras)
+        ),
+    }
+
+
+def discover_dependencies_and_versions(
+    package: str,
+    index_url: Optional[str],
+    extra_index_url: Optional[str],
+    cache_dir: Optional[str],
+    pre: bool,
+) -> DiscoveredPackage:
+    """Get the version resolved by pip for the package, the available versions and
+    the dependencies. The index metadata is used if available, and otherwise pip
+    downloads or builds the package to read its metadata.
+    """
+    try:
+        discovered = discover_from_metadata(package, index_url, extra_index_url, pre)
+    except (requests.RequestException, ValueError):
+        discovered = None
+    if discovered is not None:
+        return discovered
+    return pipper.discover_dependencies_and_versions(
+        package, index_url, extra_index_url, cache_dir, pre
+    )
+
+
+class MetadataPackageSource(PackageSource):
+    """Package source that discovers the dependencies from the index metadata
+    instead of downloading the packages when possible. The preferred versions, if
+    allowed, are tried before the latest ones.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str],
+        index_url: Optional[str],
+        extra_index_url: Optional[str],
+        pre: bool,
+        preferred_versions: Optional[Dict[str, str]] = None,
+    ):
+        super().__init__(cache_dir, index_url, extra_index_url, pre)
+        self.preferred_versions = preferred_versions or {}
+
+    def seed(
+        self, name: str, extras: FrozenSet[str], version: str, requires: List[str]
+    ):
+        """Add a known version of the package with its dependencies. The package is
+        not discovered, so the other versions are not available.
+        """
+        self.add(name, frozenset(extras), version, deps=requires)
+
+    def discover_and_add(self, package: str):
+        req = parse_req(package)
+        to_create = discover_dependencies_and_versions(
+            package, self.index_url, self.extra_index_url, self.cache_dir, self.pre
+        )
+        for version in to_create["available"]:
+            self.add(req.key, req.extras, version)
+        self.add(req.key, req.extras, to_create["version"], deps=to_create["requires"])
+
+    def _versions_for(self, package, constraint=None) -> list:
+        versions = super()._versions_for(package, constraint)
+        preferred_version = self.preferred_versions.get(package.name)
+        for version in versions:
+            if str(version) == preferred_version:
+                versions.remove(version)
+                return [version, *versions]
+        return versions
@@ -1,9 +1,12 @@
 from functools import cached_property
-from typing import TYPE_CHECKING, Iterator, Set, Optional, TypedDict, List
+from typing import TYPE_CHECKING, Iterator, Set, Optional, TypedDict, List, Dict
 
 from anytree import Node
 
-from pip_rating.rating import PackageRating, PackageRatingJson
+from packaging.utils import canonicalize_name
+
+from pip_rating.cache import CacheKey
+from pip_rating.rating import PackageRating, PackageRatingJson, RATING_CACHE_SOURCE
 from pip_rating.sources.audit import Audit, Vulnerability
 from pip_rating.sources.pypi import Pypi
 from pip_rating.sources.sourcecode_page import SourcecodePage
@@ -32,10 +35,24 @@ class Package:
         self.dependencies = dependencies
         self.name = name
         self.nodes = set()
+        self.audits: Dict[str, Audit] = {}
 
     @cached_property
     def real_name(self) -> str:
-        return self.pypi.package["info"]["name"]
+        return self.pypi.summary["name"]
+
+    @property
+    def is_missing_data(self) -> bool:
+        """Some data of the package is not available in offline mode."""
+        return any(
+            source.is_missing
+            for source in (
+                self.pypi,
+                self.sourcerank,
+                self.sourcecode_page,
+                self.get_audit(self.first_node),
+            )
+        )
 
     @cached_property
     def first_node(self) -> Node:
@@ -47,23 +64,35 @@ class Package:
 
     @cached_property
     def sourcerank(self) -> SourceRank:
-        return SourceRank(self)
+        return SourceRank(self, self.dependencies.sourcerank_backend)
 
     @cached_property
     def pypi(self) -> "Pypi":
-        return Pypi(self.name)
+        return Pypi(self.name, self.dependencies.full_pypi_package)
 
     @cached_property
     def sourcecode_page(self) -> "SourcecodePage":
         return SourcecodePage(self)
 
     def get_audit(self, node: Node) -> "Audit":
-        return Audit(self.name, node.version)
+        if node.version not in self.audits:
+            self.audits[node.version] = Audit(self.name, node.version)
+        return self.audits[node.version]
 
     @cached_property
     def rating(self) -> "PackageRating":
         return PackageRating(self)
 
+    def get_cache_keys(self) -> List[CacheKey]:
+        """Get the cache keys of the sources data and the rating of the package."""
+        return [
+            self.pypi.cache_key,
+            self.sourcerank.cache_key,
+            self.sourcecode_page.cache_key,
+            *[self.get_audit(node).cache_key for node in self.nodes],
+            (RATING_CACHE_SOURCE, canonicalize_name(self.name), ""),
+        ]
+
     def get_node_from_parent(
         self, from_package: Optional["Package"] = None
     ) -> Optional["Node"]:
@@ -1,14 +1,13 @@
 import datetime
-import json
-import os
 import logging
 from functools import cached_property
-from pathlib import Path
 from typing import TYPE_CHECKING, TypedDict, Optional, Union, List, Tuple, Dict
 
-from platformdirs import user_cache_dir
+from packaging.utils import canonicalize_name
+
 from pip_rating import __version__
 from pip_rating._compat import cache
+from pip_rating.cache import CacheKey, get_cache_backend, get_cache_policy
 from pip_rating.sources.audit import Vulnerability
 
 from pip_rating.sources.sourcerank import SourceRankBreakdown
@@ -19,7 +18,7 @@ if TYPE_CHECKING:
     from pip_rating.packages import Package
 
 
-RATING_CACHE_DIR = Path(user_cache_dir()) / "pip-rating" / "rating"
+RATING_CACHE_SOURCE = "rating"
 MAX_CACHE_AGE = datetime.timedelta(days=7)
 
 
@@ -217,6 +216,7 @@ BREAKDOWN_SCORES = [
 
 
 class PackageRatingJson(TypedDict):
+    unknown: bool
     rating_score: int
     global_rating_score: int
     vulnerabilities: List[Vulnerability]
@@ -228,7 +228,10 @@ class PackageRating:
         self, package: "Package", params: Optional[PackageRatingParams] = None
     ):
         self.package = package
-        if not params and self.is_cache_expired:
+        self.is_unknown = False
+        if not params and get_cache_policy().offline:
+            params = self.get_params_offline()
+        elif not params and self.is_cache_expired:
             params = self.get_params_from_package()
             self.save_to_cache()
         elif not params:
@@ -237,20 +240,15 @@ class PackageRating:
 
     @property
     def is_cache_expired(self) -> bool:
-        return (
-            not self.cache_path.exists()
-            or self.cache_path.stat().st_mtime
-            < (datetime.datetime.now() - MAX_CACHE_AGE).timestamp()
-        )
+        return get_cache_backend().is_expired(*self.cache_key, MAX_CACHE_AGE)
 
     @property
-    def cache_path(self) -> Path:
-        return RATING_CACHE_DIR / f"{self.package.name}.json"
+    def cache_key(self) -> CacheKey:
+        return RATING_CACHE_SOURCE, canonicalize_name(self.package.name), ""
 
     def get_from_cache(self) -> Optional[PackageRatingCache]:
-        with open(self.cache_path) as file:
-            data = json.load(file)
-        if data["schema_version"] != __version__:
+        data = get_cache_backend().get(*self.cache_key)
+        if data is None or data["schema_version"] != __version__:
             return None
         return data
 
@@ -261,9 +259,7 @@ class PackageRating:
             "schema_version": __version__,
             "params": self.get_params_from_package(),
         }
-        os.makedirs(str(self.cache_path.parent), exist_ok=True)
-        with open(str(self.cache_path), "w") as file:
-            json.dump(cache, file)
+        get_cache_backend().set(*self.cache_key, cache)
         return cache
 
     def get_params_from_cache(self) -> PackageRatingParams:
@@ -272,6 +268,19 @@ class PackageRating:
             cache = self.save_to_cache()
         return cache["params"]
 
+    def get_params_offline(self) -> PackageRatingParams:
+        """Get the params from the cache regardless of its age. If they are not
+        cached, they are calculated using the cached sources data. If some data is
+        missing, the rating is unknown and it is not cached.
+        """
+        cache = get_cache_backend().get(*self.cache_key)
+        if cache is not None and cache["schema_version"] == __version__:
+            return cache["params"]
+        if self.package.is_missing_data:
+            self.is_unknown = True
+            return self.get_params_from_package()
+        return self.save_to_cache()["params"]
+
     def get_params_from_package(self) -> PackageRatingParams:
         return {
             "sourcerank_breakdown": self.package.sourcerank.breakdown,
@@ -296,6 +305,7 @@ class PackageRating:
         return [
             (package, package.rating.get_rating_score(self.package))
             for package in self.package.get_descendant_packages()
+            if not package.rating.is_unknown
         ]
 
     @cached_property
@@ -338,6 +348,7 @@ class PackageRating:
 
     def as_json(self, from_package: Optional["Package"] = None) -> PackageRatingJson:
         return {
+            "unknown": self.is_unknown,
             "rating_score": self.get_rating_score(from_package),
             "global_rating_score": self.get_global_rating_score(from_package),
             "vulnerabilities": self.get_vulnerabilities(from_package),
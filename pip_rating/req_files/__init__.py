@@ -7,13 +7,19 @@ from pip_rating.exceptions import (
 )
 from pip_rating.req_files.base import ReqFileBase
 from pip_rating.req_files.pipfile import PipfileReqFile
+from pip_rating.req_files.pipfile_lock import PipfileLockReqFile
+from pip_rating.req_files.poetry_lock import PoetryLockReqFile
 from pip_rating.req_files.pyproject import PyprojectReqFile
 from pip_rating.req_files.requirements import RequirementsReqFile
 from pip_rating.req_files.setupcfg import SetupcfgReqFile
 from pip_rating.req_files.setuppy import SetuppyReqFile
 
 
+# The lock files are detected first, so their pinned versions are used instead of
+# resolving the requirements of the manifest of the same project.
 REQ_FILE_CLASSES = {
+    "poetry.lock": PoetryLockReqFile,
+    "Pipfile.lock": PipfileLockReqFile,
     "requirements": RequirementsReqFile,
     "setup.cfg": SetupcfgReqFile,
     "setup.py": SetuppyReqFile,
@@ -38,6 +44,7 @@ def find_in_directory(directory: Union[str, Path]) -> ReqFileBase:
         directory = Path(directory)
     for req_file_cls in REQ_FILE_CLASSES.values():
         req_file = req_file_cls.find_in_directory(directory)
+        # The files without requirements are skipped, so the next file type is used
         if req_file:
             return req_file
     raise RequirementsRatingMissingReqFile(str(directory))
@@ -1,9 +1,62 @@
 from pathlib import Path
-from typing import Union, List, Optional
+from typing import Union, List, Optional, NamedTuple, Dict, FrozenSet
 
+from packaging.requirements import InvalidRequirement
+from packaging.requirements import Requirement as PackagingRequirement
+from packaging.utils import canonicalize_name
 from pkg_resources import Requirement
 
 
+class LockedPackage(NamedTuple):
+    """A package pinned in a lock file. The dependencies are the names of the
+    locked packages required by this package, or None if the file does not include
+    them. The extras are used to discover the dependencies.
+    """
+
+    name: str
+    version: str
+    dependencies: Optional[List[str]] = None
+    extras: FrozenSet[str] = frozenset()
+
+
+LockedPackages = Dict[str, LockedPackage]
+
+
+def get_pinned_version(requirement: str) -> Optional[str]:
+    """Get the version of a requirement pinned with ``==``, or None if the
+    requirement is not pinned to a single version.
+    """
+    try:
+        req = PackagingRequirement(requirement)
+    except InvalidRequirement:
+        return None
+    specifiers = list(req.specifier)
+    if req.url or len(specifiers) != 1:
+        return None
+    specifier = specifiers[0]
+    if specifier.operator not in ("==", "===") or "*" in specifier.version:
+        return None
+    return specifier.version
+
+
+def get_locked_requirements(requirements: List[str]) -> Optional[LockedPackages]:
+    """Get the locked packages of a list of requirements. Returns None if any
+    requirement is not pinned.
+    """
+    locked_packages = {}
+    for requirement in requirements:
+        version = get_pinned_version(requirement)
+        if version is None:
+            return None
+        req = PackagingRequirement(requirement)
+        if req.marker is not None and not req.marker.evaluate():
+            continue
+        locked_packages[canonicalize_name(req.name)] = LockedPackage(
+            req.name, version, extras=frozenset(req.extras)
+        )
+    return locked_packages
+
+
 class ReqFileBase(list):
     """Base class for requirement files."""
 
@@ -30,6 +83,13 @@ class ReqFileBase(list):
         """Get the dependencies from the file."""
         raise NotImplementedError
 
+    def get_locked_packages(self) -> Optional[LockedPackages]:
+        """Get the pinned packages of the file by canonical name, so the
+        dependencies tree can be built without resolving the versions. Returns None
+        if the file has no lock data.
+        """
+        return None
+
     def __contains__(self, item: str) -> bool:
         req = Requirement(item)
         for package in self:
@@ -0,0 +1,190 @@
+import json
+import subprocess
+import sys
+from importlib import metadata
+from pathlib import Path
+from typing import Union, List, Optional, Dict, Tuple
+
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+
+from pip_rating.exceptions import RequirementsRatingInvalidEnvironment
+from pip_rating.req_files import ReqFileBase
+from pip_rating.req_files.base import LockedPackage, LockedPackages
+
+
+# Packages excluded by pip freeze, unless they are required by other packages
+EXCLUDED_PACKAGES = {"pip", "setuptools", "wheel", "distribute"}
+# Get the sys.path and the markers environment of an interpreter, as
+# packaging.markers.default_environment does
+INTERPRETER_SCRIPT = """
+import json, os, platform, sys
+info = sys.implementation.version
+version = "{0.major}.{0.minor}.{0.micro}".format(info)
+if info.releaselevel != "final":
+    version += info.releaselevel[0] + str(info.serial)
+print(json.dumps({
+    "path": sys.path,
+    "environment": {
+        "implementation_name": sys.implementation.name,
+        "implementation_version": version,
+        "os_name": os.name,
+        "platform_machine": platform.machine(),
+        "platform_release": platform.release(),
+        "platform_system": platform.system(),
+        "platform_version": platform.version(),
+        "python_full_version": platform.python_version(),
+        "platform_python_implementation": platform.python_implementation(),
+        "python_version": ".".join(platform.python_version_tuple()[:2]),
+        "sys_platform": sys.platform,
+    },
+}))
+"""
+
+
+def get_interpreter_environment(python: str) -> Tuple[List[str], Dict[str, str]]:
+    """Get the sys.path and the markers environment of the given interpreter."""
+    try:
+        output = subprocess.run(
+            [python, "-c", INTERPRETER_SCRIPT],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        data = json.loads(output)
+    except (OSError, subprocess.CalledProcessError, ValueError) as e:
+        raise RequirementsRatingInvalidEnvironment(f"Cannot run {python}: {e}")
+    return [path for path in data["path"] if path], data["environment"]
+
+
+class EnvironmentReqFile(ReqFileBase):
+    """Installed packages of a Python environment. The packages are read from the
+    metadata of the distributions in the given paths, by default the paths of the
+    current interpreter.
+    """
+
+    def __init__(
+        self,
+        paths: Optional[List[str]] = None,
+        environment: Optional[Dict[str, str]] = None,
+    ):
+        """Initialize the environment.
+
+        :param paths: The paths with the installed distributions, like sys.path.
+        :param environment: The environment used to evaluate the markers of the
+            requirements. By default, the environment of the current interpreter.
+        """
+        self.paths = paths
+        self.environment = environment or {}
+        super().__init__(self.get_environment_path())
+
+    @classmethod
+    def from_interpreter(cls, python: str) -> "EnvironmentReqFile":
+        """Get the installed packages of the given interpreter."""
+        return cls(*get_interpreter_environment(python))
+
+    @classmethod
+    def find_in_directory(cls, directory: Union[str, Path]) -> Optional["ReqFileBase"]:
+        """The environments are not files, so they are never found in a directory."""
+        return None
+
+    @classmethod
+    def is_valid(cls, path: Union[str, Path]) -> bool:
+        """The environments are not files, so no path is valid."""
+        return False
+
+    def get_environment_path(self) -> Path:
+        """Get the path shown for the environment: the first existing path of the
+        distributions, or the prefix of the current interpreter.
+        """
+        if self.paths is None:
+            return Path(sys.prefix)
+        for path in self.paths:
+            if Path(path).exists():
+                return Path(path)
+        raise RequirementsRatingInvalidEnvironment(
+            f"None of the paths exist: {', '.join(self.paths)}"
+        )
+
+    def get_distributions(self) -> Dict[str, metadata.Distribution]:
+        """Get the distributions by canonical name. As in the imports, the first
+        distribution found in the paths is used.
+        """
+        if self.paths is None:
+            distributions = metadata.distributions()
+        else:
+            distributions = metadata.distributions(path=self.paths)
+        installed = {}
+        for distribution in distributions:
+            name = distribution.metadata["Name"]
+            if name and canonicalize_name(name) not in installed:
+                installed[canonicalize_name(name)] = distribution
+        return installed
+
+    def is_required(self, requirement: Requirement) -> bool:
+        """Check if the requirement applies to the environment. The requirements of
+        the extras are not installed by default, so they are ignored.
+        """
+        if requirement.marker is None:
+            return True
+        return requirement.marker.evaluate({**self.environment, "extra": ""})
+
+    def get_locked_packages(self) -> LockedPackages:
+        """Get the installed packages with their installed dependencies."""
+        distributions = self.get_distributions()
+        locked_packages = {}
+        for name, distribution in distributions.items():
+            dependencies = []
+            for require in distribution.requires or []:
+                try:
+                    requirement = Requirement(require)
+                except InvalidRequirement:
+                    continue
+                dependency = canonicalize_name(requirement.name)
+                if (
+                    dependency in distributions
+                    and dependency not in dependencies
+                    and self.is_required(requirement)
+                ):
+                    dependencies.append(dependency)
+            locked_packages[name] = LockedPackage(
+                distribution.metadata["Name"], distribution.version, dependencies
+            )
+        return locked_packages
+
+    def get_dependencies(self) -> List[str]:
+        """Get the installed packages that are not dependencies of other packages,
+        pinned to their installed versions. The packages that are only required
+        inside a dependency cycle are not reached from those packages, so the first
+        package of each cycle is added too.
+        """
+        locked_packages = self.get_locked_packages()
+        dependencies = {
+            dependency
+            for package in locked_packages.values()
+            for dependency in package.dependencies
+        }
+        roots = [name for name in locked_packages if name not in dependencies]
+        reached = set()
+        for name in roots + list(locked_packages):
+            if name in reached:
+                continue
+            if name not in roots:
+                roots.append(name)
+            pending = [name]
+            while pending:
+                current = pending.pop()
+                if current not in reached:
+                    reached.add(current)
+                    pending.extend(locked_packages[current].dependencies)
+        return [
+            f"{locked_packages[name].name}=={locked_packages[name].version}"
+            for name in roots
+            if name not in EXCLUDED_PACKAGES
+        ]
+
+    def __str__(self) -> str:
+        return str(self.path)
+
+    def __repr__(self) -> str:
+        return f"<ReqFile {self}>"
@@ -0,0 +1,46 @@
+import json
+from pathlib import Path
+from typing import Union, List, Optional
+
+from pip_rating.req_files import ReqFileBase
+from pip_rating.req_files.base import LockedPackages, get_locked_requirements
+
+
+class PipfileLockReqFile(ReqFileBase):
+    """Parse packages from Pipfile.lock file."""
+
+    @classmethod
+    def find_in_directory(cls, directory: Union[str, Path]) -> "PipfileLockReqFile":
+        """Find Pipfile.lock in the given directory."""
+        if isinstance(directory, str):
+            directory = Path(directory)
+        path = directory / "Pipfile.lock"
+        if path.exists():
+            return cls(path)
+
+    @classmethod
+    def is_valid(cls, path: Union[str, Path]) -> bool:
+        """Check if the given path is a valid Pipfile.lock file."""
+        if isinstance(path, str):
+            path = Path(path)
+        return path.exists() and path.name == "Pipfile.lock"
+
+    def get_dependencies(self) -> List[str]:
+        """Get the default packages from the Pipfile.lock file. Like pip freeze, all
+        the installed packages are included, not only the direct dependencies.
+        """
+        with open(str(self.path)) as file:
+            data = json.load(file)
+        dependencies = []
+        for name, package in data.get("default", {}).items():
+            dependency = f"{name}{package.get('version', '')}"
+            if package.get("markers"):
+                dependency += f" ; {package['markers']}"
+            dependencies.append(dependency)
+        return dependencies
+
+    def get_locked_packages(self) -> Optional[LockedPackages]:
+        """Get the locked packages. Pipfile.lock does not include the dependencies
+        of the packages.
+        """
+        return get_locked_requirements(self)
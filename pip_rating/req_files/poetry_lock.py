@@ -0,0 +1,147 @@
+from pathlib import Path
+from typing import Union, List, Optional, Set
+
+from packaging.markers import Marker
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+
+from pip_rating.req_files import ReqFileBase
+from pip_rating.req_files.base import LockedPackage, LockedPackages
+from pip_rating._compat import tomllib
+
+
+def is_required(dependency: Union[str, dict, list]) -> bool:
+    """Check if a dependency of a poetry.lock package applies to this environment.
+    The dependencies can be a version, a dict with the markers, or a list of them.
+    """
+    if isinstance(dependency, list):
+        return any(map(is_required, dependency))
+    if isinstance(dependency, dict) and dependency.get("markers"):
+        return Marker(dependency["markers"]).evaluate({"extra": ""})
+    return True
+
+
+def is_main_package(package: dict) -> bool:
+    """Check if a poetry.lock package is a runtime package. The lock files of
+    Poetry 2 list the dependency groups of each package, and the lock files before
+    Poetry 1.5 use a category. The packages without any of them are main packages.
+    """
+    if "groups" in package:
+        return "main" in package["groups"]
+    return package.get("category", "main") == "main"
+
+
+def get_main_requirements(path: Path) -> Optional[Set[str]]:
+    """Get the canonical names of the runtime requirements of a pyproject.toml
+    file, or None if the file does not exist or has no requirements.
+    """
+    if not path.exists():
+        return None
+    with open(str(path), "rb") as file:
+        data = tomllib.load(file)
+    names = set()
+    for requirement in data.get("project", {}).get("dependencies", []):
+        try:
+            names.add(canonicalize_name(Requirement(requirement).name))
+        except InvalidRequirement:
+            continue
+    poetry_dependencies = data.get("tool", {}).get("poetry", {}).get("dependencies", {})
+    names.update(canonicalize_name(name) for name in poetry_dependencies)
+    names.discard("python")
+    return names or None
+
+
+def get_required_packages(packages: List[dict], names: Set[str]) -> List[dict]:
+    """Get the packages required by the given names, directly or through other
+    packages of the lock file.
+    """
+    packages_by_name = {
+        canonicalize_name(package["name"]): package for package in packages
+    }
+    pending = [name for name in names if name in packages_by_name]
+    required = set()
+    while pending:
+        name = pending.pop()
+        if name in required:
+            continue
+        required.add(name)
+        for dependency, value in packages_by_name[name].get("dependencies", {}).items():
+            dependency = canonicalize_name(dependency)
+            if dependency in packages_by_name and is_required(value):
+                pending.append(dependency)
+    return [
+        package
+        for package in packages
+        if canonicalize_name(package["name"]) in required
+    ]
+
+
+class PoetryLockReqFile(ReqFileBase):
+    """Parse packages from poetry.lock file."""
+
+    @classmethod
+    def find_in_directory(cls, directory: Union[str, Path]) -> "PoetryLockReqFile":
+        """Find poetry.lock in the given directory."""
+        if isinstance(directory, str):
+            directory = Path(directory)
+        path = directory / "poetry.lock"
+        if path.exists():
+            return cls(path)
+
+    @classmethod
+    def is_valid(cls, path: Union[str, Path]) -> bool:
+        """Check if the given path is a valid poetry.lock file."""
+        if isinstance(path, str):
+            path = Path(path)
+        return path.exists() and path.name == "poetry.lock"
+
+    def get_packages(self) -> List[dict]:
+        """Get the packages of the poetry.lock file. The packages that are not in
+        the main group, such as the development packages, are ignored. The lock
+        files of Poetry 1.5 to 1.8 do not record the groups, so the packages required
+        by the runtime requirements of the pyproject.toml file are used instead. If
+        it is not found, all the packages are used.
+        """
+        with open(str(self.path), "rb") as file:
+            data = tomllib.load(file)
+        packages = data.get("package", [])
+        if any("groups" in package or "category" in package for package in packages):
+            return [package for package in packages if is_main_package(package)]
+        names = get_main_requirements(Path(self.path).parent / "pyproject.toml")
+        if names is None:
+            return packages
+        return get_required_packages(packages, names)
+
+    def get_locked_packages(self) -> Optional[LockedPackages]:
+        """Get the locked packages with their dependencies. The dependencies not
+        locked, such as the optional ones, are ignored.
+        """
+        packages = self.get_packages()
+        names = {canonicalize_name(package["name"]) for package in packages}
+        locked_packages = {}
+        for package in packages:
+            dependencies = [
+                canonicalize_name(name)
+                for name, dependency in package.get("dependencies", {}).items()
+                if canonicalize_name(name) in names and is_required(dependency)
+            ]
+            locked_packages[canonicalize_name(package["name"])] = LockedPackage(
+                package["name"], package["version"], dependencies
+            )
+        return locked_packages
+
+    def get_dependencies(self) -> List[str]:
+        """Get the packages that are not dependencies of other packages, pinned to
+        their locked versions.
+        """
+        locked_packages = self.get_locked_packages()
+        dependencies: Set[str] = {
+            dependency
+            for package in locked_packages.values()
+            for dependency in package.dependencies
+        }
+        return [
+            f"{package.name}=={package.version}"
+            for name, package in locked_packages.items()
+            if name not in dependencies
+        ]
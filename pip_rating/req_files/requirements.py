@@ -1,11 +1,21 @@
 import re
 from pathlib import Path
-from typing import Union, List, Optional
+from typing import Union, List, Optional, Dict
 
-from pip_rating.req_files.base import ReqFileBase
+from packaging.utils import canonicalize_name
+
+from pip_rating.req_files.base import (
+    ReqFileBase,
+    LockedPackage,
+    LockedPackages,
+    get_locked_requirements,
+)
 
 
 COMMENT_REGEX = re.compile(r"(#.*)")
+VIA_REGEX = re.compile(r"#\s*via\b(.*)")
+# Options that add requirements not pinned in the file
+UNLOCKED_OPTIONS = ("-r", "-c", "-e", "--requirement", "--constraint", "--editable")
 REQUIREMENTS_FILES = [
     "requirements.in",
     "requirements.txt",
@@ -51,7 +61,53 @@ class RequirementsReqFile(ReqFileBase):
         lines = []
         with open(str(self.path)) as f:
             for line in f:
-                line = re.sub(COMMENT_REGEX, "", line).strip()
-                if line:
+                line = re.sub(COMMENT_REGEX, "", line).strip().rstrip("\\ ")
+                if line and not line.startswith("--hash"):
                     lines.append(line)
         return lines
+
+    def get_locked_packages(self) -> Optional[LockedPackages]:
+        """Get the locked packages if all the requirements are pinned, as in the
+        pip-compile or pip freeze output. The ``# via`` comments of pip-compile are
+        used as the dependencies of the packages.
+        """
+        requirements = []
+        parents: Dict[str, List[str]] = {}
+        current = None
+        in_via = False
+        with open(str(self.path)) as f:
+            for line in f:
+                line = line.strip()
+                via_match = VIA_REGEX.search(line)
+                if line.startswith("#") and current is not None and via_match:
+                    in_via = True
+                    parents[current].extend(via_match.group(1).split(","))
+                    continue
+                elif line.startswith("#"):
+                    if in_via:
+                        parents[current].append(line[1:])
+                    continue
+                requirement = re.sub(COMMENT_REGEX, "", line).rstrip("\\ ")
+                in_via = False
+                if not requirement or requirement.startswith("--hash"):
+                    continue
+                if requirement.startswith(UNLOCKED_OPTIONS):
+                    return None
+                if requirement.startswith("-"):
+                    continue
+                requirements.append(requirement)
+                current = canonicalize_name(re.split(r"[\s\[<>=!~;@]", requirement)[0])
+                parents[current] = via_match.group(1).split(",") if via_match else []
+        locked_packages = get_locked_requirements(requirements)
+        if locked_packages is None or not any(parents.values()):
+            return locked_packages
+        dependencies: Dict[str, List[str]] = {name: [] for name in locked_packages}
+        for name, package_parents in parents.items():
+            for parent in map(str.strip, package_parents):
+                parent = canonicalize_name(parent.split("[")[0]) if parent else ""
+                if parent in dependencies and name in locked_packages:
+                    dependencies[parent].append(name)
+        return {
+            name: LockedPackage(package.name, package.version, dependencies[name])
+            for name, package in locked_packages.items()
+        }
@@ -0,0 +1,231 @@
+"""Cache of the dependencies trees resolved by the version solver."""
+import datetime
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, TypedDict, Union
+
+from anytree import Node
+from packaging.markers import default_environment
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+
+from pip_rating import __version__
+from pip_rating.cache import CacheKey, get_cache_backend, get_cache_policy
+from pip_rating.sources.simple_index import DEFAULT_INDEX_URL
+from pip_rating.stats import run_stats
+
+RESOLUTION_CACHE_SOURCE = "resolution"
+PREVIOUS_RESOLUTION_CACHE_SOURCE = "previous_resolution"
+RESOLUTION_MAX_AGE = datetime.timedelta(
+    days=int(os.environ.get("PIP_RATING_RESOLUTION_MAX_AGE", 1))
+)
+
+
+class NodeDict(TypedDict, total=False):
+    name: str
+    version: str
+    pip_string: str
+    extras_name: str
+    extras: List[str]
+    cyclic: bool
+    children: List["NodeDict"]
+
+
+class PreviousResolution(TypedDict):
+    requirements: List[str]
+    tree: NodeDict
+    ratings: Dict[str, Optional[int]]
+
+
+class ResolutionChange(NamedTuple):
+    name: str
+    previous_version: Optional[str]
+    version: Optional[str]
+    previous_rating_score: Optional[int]
+    rating_score: Optional[int]
+
+
+def normalize_requirement(requirement: str) -> str:
+    try:
+        req = Requirement(requirement)
+    except InvalidRequirement:
+        return requirement.strip()
+    req.name = canonicalize_name(req.name)
+    return str(req)
+
+
+def get_hash(
+    requirements: Iterable[str],
+    index_url: Optional[str],
+    extra_index_url: Optional[str],
+    pre: bool,
+    **kwargs
+) -> str:
+    """Get a hash of the resolution inputs: the normalized requirements, the
+    indexes, the pre-releases flag, the target environment of the markers and the
+    pip-rating version. The requirements are sorted, so their order in the file
+    does not change the hash.
+    """
+    content = json.dumps(
+        {
+            "requirements": sorted(normalize_requirement(req) for req in requirements),
+            "index_url": (index_url or DEFAULT_INDEX_URL).rstrip("/"),
+            "extra_index_url": extra_index_url
+            or os.environ.get("PIP_EXTRA_INDEX_URL", ""),
+            "pre": pre,
+            "environment": default_environment(),
+            "version": __version__,
+            **kwargs,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def get_resolution_key(
+    requirements: Iterable[str],
+    index_url: Optional[str] = None,
+    extra_index_url: Optional[str] = None,
+    pre: bool = False,
+) -> CacheKey:
+    """Get the cache key of the resolution of the requirements."""
+    return (
+        RESOLUTION_CACHE_SOURCE,
+        get_hash(requirements, index_url, extra_index_url, pre),
+        "",
+    )
+
+
+def get_previous_resolution_key(
+    path: Union[str, Path],
+    index_url: Optional[str] = None,
+    extra_index_url: Optional[str] = None,
+    pre: bool = False,
+) -> CacheKey:
+    """Get the cache key of the last resolution of the requirements file, whatever
+    its requirements were.
+    """
+    return (
+        PREVIOUS_RESOLUTION_CACHE_SOURCE,
+        get_hash([], index_url, extra_index_url, pre, path=str(Path(path).resolve())),
+        "",
+    )
+
+
+def tree_to_dict(node: Node) -> NodeDict:
+    """Convert the dependencies tree to a JSON serializable dict."""
+    data: NodeDict = {"name": node.name}
+    for attribute in ("version", "pip_string", "extras_name"):
+        if hasattr(node, attribute):
+            data[attribute] = getattr(node, attribute)
+    if hasattr(node, "extras"):
+        data["extras"] = sorted(node.extras)
+    if getattr(node, "cyclic", False):
+        data["cyclic"] = True
+    if node.children:
+        data["children"] = [tree_to_dict(child) for child in node.children]
+    return data
+
+
+def tree_from_dict(data: NodeDict, parent: Optional[Node] = None) -> Node:
+    """Create the dependencies tree from the dict created by tree_to_dict."""
+    attributes = {
+        key: value for key, value in data.items() if key not in ("name", "children")
+    }
+    if "extras" in attributes:
+        attributes["extras"] = frozenset(attributes["extras"])
+    node = Node(data["name"], parent=parent, **attributes)
+    for child in data.get("children", []):
+        tree_from_dict(child, node)
+    return node
+
+
+def get_cached_tree(key: CacheKey) -> Optional[Node]:
+    """Get the resolved tree from the cache, or None if it is not cached or it is
+    expired. In offline mode, the cached tree is used regardless of its age.
+    """
+    cache_backend = get_cache_backend()
+    if not get_cache_policy().offline and cache_backend.is_expired(
+        *key, RESOLUTION_MAX_AGE
+    ):
+        run_stats.increment(RESOLUTION_CACHE_SOURCE, "misses")
+        return None
+    data = cache_backend.get(*key)
+    if data is None:
+        run_stats.increment(RESOLUTION_CACHE_SOURCE, "misses")
+        return None
+    run_stats.increment(RESOLUTION_CACHE_SOURCE, "hits")
+    return tree_from_dict(data["tree"])
+
+
+def set_cached_tree(key: CacheKey, tree: Node):
+    get_cache_backend().set(
+        *key,
+        {
+            "updated_at": datetime.datetime.now().isoformat(),
+            "tree": tree_to_dict(tree),
+        },
+    )
+
+
+def get_previous_resolution(key: CacheKey) -> Optional[PreviousResolution]:
+    return get_cache_backend().get(*key)
+
+
+def set_previous_resolution(
+    key: CacheKey,
+    requirements: Iterable[str],
+    tree: Node,
+    ratings: Dict[str, Optional[int]],
+):
+    get_cache_backend().set(
+        *key,
+        {
+            "requirements": sorted(normalize_requirement(req) for req in requirements),
+            "tree": tree_to_dict(tree),
+            "ratings": ratings,
+        },
+    )
+
+
+def get_tree_versions(tree: Node) -> Dict[str, str]:
+    """Get the resolved version of each package of the tree. The cyclic nodes are
+    references to their ancestors, so they are ignored.
+    """
+    return {
+        node.name: node.version
+        for node in tree.descendants
+        if getattr(node, "version", "undecided") != "undecided"
+        and not getattr(node, "cyclic", False)
+    }
+
+
+def get_resolution_changes(
+    previous_resolution: PreviousResolution,
+    tree: Node,
+    ratings: Dict[str, Optional[int]],
+) -> List[ResolutionChange]:
+    """Get the packages added, removed or updated since the previous resolution,
+    and the packages whose rating changed.
+    """
+    previous_versions = get_tree_versions(tree_from_dict(previous_resolution["tree"]))
+    versions = get_tree_versions(tree)
+    changes = []
+    for name in sorted(set(previous_versions) | set(versions)):
+        change = ResolutionChange(
+            name,
+            previous_versions.get(name),
+            versions.get(name),
+            previous_resolution["ratings"].get(name),
+            ratings.get(name),
+        )
+        rating_changed = (
+            name in ratings
+            and name in previous_resolution["ratings"]
+            and change.previous_rating_score != change.rating_score
+        )
+        if change.previous_version != change.version or rating_changed:
+            changes.append(change)
+    return changes
@@ -25,6 +25,7 @@ if TYPE_CHECKING:
 
 
 MIN_PACKAGE_NAME = 15
+UNKNOWN_RATING = "[bold bright_black]Unknown[/bold bright_black]"
 FORMATS = ["text", "tree", "json", "only-rating", "badge"]
 BADGE_FLAT_SVG = """\
 <svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" width="82"
@@ -96,6 +97,7 @@ PIP_RATING_BADGE_COLORS = {
     "D": os.environ.get("PIP_RATING_BADGE_D_COLOR") or "#FFAF00",
     "E": os.environ.get("PIP_RATING_BADGE_E_COLOR") or "#FF5F00",
     "F": os.environ.get("PIP_RATING_BADGE_F_COLOR") or "#E05D44",
+    "?": os.environ.get("PIP_RATING_BADGE_UNKNOWN_COLOR") or "#9F9F9F",
 }
 PIP_RATING_BADGES = {
     "flat": BADGE_FLAT_SVG,
@@ -126,8 +128,10 @@ def colorize_score(score: Union["ScoreBase", int]) -> str:
     return f"[bold bright_black]{score}[/bold bright_black]"
 
 
-def colorize_rating(score: Union["ScoreBase", int]) -> "RatingLetter":
-    """Colorize the rating."""
+def colorize_rating(score: Optional[Union["ScoreBase", int]]) -> "RatingLetter":
+    """Colorize the rating. The score is None when the rating is unknown."""
+    if score is None:
+        return UNKNOWN_RATING_LETTER
     for rating_letter in RATING_LETTERS:
         if max(0, int(score)) >= rating_letter.score:
             return rating_letter
@@ -137,6 +141,8 @@ def colorize_rating_package(
     package: "Package", parent_package: Optional["Package"] = None
 ) -> str:
     """Colorize the rating of the package."""
+    if package.rating.is_unknown:
+        return UNKNOWN_RATING
     colorized_rating = colorize_rating(package.rating.get_rating_score(parent_package))
     colorized_global_rating = colorize_rating(
         package.rating.get_global_rating_score(parent_package)
@@ -209,6 +215,7 @@ RATING_LETTERS = [
     RatingLetter("E", 5, "orange_red1"),
     RatingLetter("F", 0, "bright_red"),
 ]
+UNKNOWN_RATING_LETTER = RatingLetter("?", -1, "bright_black")
 
 
 class JsonResults(TypedDict):
@@ -218,7 +225,7 @@ class JsonResults(TypedDict):
     updated_at: str
     schema_version: str
     global_rating_letter: str
-    global_rating_score: int
+    global_rating_score: Optional[int]
     packages: List[dict]
 
 
@@ -251,6 +258,11 @@ class Results:
     def processing_package(self, package: Any):
         self.status.update(f"Processing package [bold green]{package}[/bold green]...")
 
+    def fetched_package(self, package: "Package"):
+        self.status.update(
+            f"Fetched data of package [bold green]{package.name}[/bold green]..."
+        )
+
     def analizing_package(self, package: str, total: int):
         if self._status:
             self._status.stop()
@@ -273,7 +285,7 @@ class Results:
             refresh=True,
         )
 
-    def get_global_rating_score(self, dependencies: "Dependencies") -> int:
+    def get_global_rating_score(self, dependencies: "Dependencies") -> Optional[int]:
         global_rating_score = dependencies.get_global_rating_score()
         if self.progress:
             self.progress.update(
@@ -302,12 +314,42 @@ class Results:
             self.show_badge_results(dependencies)
         else:
             raise ValueError(f"Format name must be one of {', '.join(FORMATS)}")
+        self.show_resolution_changes(dependencies)
+
+    def show_resolution_changes(self, dependencies: "Dependencies"):
+        """Show on stderr the packages whose version or rating changed since the
+        previous resolution, in incremental mode.
+        """
+        changes = dependencies.get_changes()
+        if not changes:
+            return
+        table = Table(title="Changes since the previous resolution")
+        table.add_column("Package")
+        table.add_column("Version")
+        table.add_column("Rating")
+        for change in changes:
+            table.add_row(
+                change.name,
+                f"{change.previous_version or '-'} -> {change.version or '-'}",
+                f"{colorize_rating(change.previous_rating_score)} -> "
+                f"{colorize_rating(change.rating_score)}",
+            )
+        self.progress_console.print(table)
 
     def show_packages_results(self, dependencies: "Dependencies"):
         global_rating_score = self.get_global_rating_score(dependencies)
         for package in dependencies.packages.values():
             if package.name not in dependencies.req_file:
                 continue
+            if package.rating.is_unknown:
+                self.results_console.print(
+                    f":package: Package [bold blue]{package.name}[/bold blue]: "
+                    + UNKNOWN_RATING
+                )
+                self.results_console.print(
+                    "  :grey_question: The package data is not cached (offline mode)\n"
+                )
+                continue
             package_global_rating_score = package.rating.get_global_rating_score()
             package_global_rating_score_letter = colorize_rating(
                 package_global_rating_score
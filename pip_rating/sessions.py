@@ -0,0 +1,259 @@
+"""Pooled HTTP sessions shared by all the sources."""
+import datetime
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
+
+from pip_rating.stats import run_stats
+
+HTTP_POOL_SIZE = int(os.environ.get("PIP_RATING_HTTP_POOL_SIZE", 16))
+HTTP_RETRIES = int(os.environ.get("PIP_RATING_HTTP_RETRIES", 3))
+HTTP_BACKOFF_FACTOR = float(os.environ.get("PIP_RATING_HTTP_BACKOFF_FACTOR", 0.5))
+HTTP_TIMEOUT = float(os.environ.get("PIP_RATING_HTTP_TIMEOUT", 30))
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+DEFAULT_RATE_LIMITS = {"libraries.io": 60.0}
+RATE_LIMIT_RETRIES = int(os.environ.get("PIP_RATING_RATE_LIMIT_RETRIES", 5))
+RATE_LIMIT_MAX_WAIT = float(os.environ.get("PIP_RATING_RATE_LIMIT_MAX_WAIT", 300))
+
+
+def parse_rate_limits(value: str) -> Dict[str, float]:
+    """Parse the requests per minute of the hosts, using the ``host=rate`` syntax
+    separated by commas. For example: ``libraries.io=60,api.github.com=30``. A zero
+    rate disables the limit of the host.
+    """
+    rate_limits = {}
+    for item in filter(None, map(str.strip, value.split(","))):
+        host, _, rate = item.partition("=")
+        rate_limits[host.strip()] = float(rate)
+    return rate_limits
+
+
+RATE_LIMITS = {
+    **DEFAULT_RATE_LIMITS,
+    **parse_rate_limits(os.environ.get("PIP_RATING_RATE_LIMITS", "")),
+}
+
+
+def get_retry_after(response: requests.Response) -> Optional[float]:
+    """Get the seconds to wait from the Retry-After header, which can be a number
+    of seconds or a date.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = datetime.datetime.now(retry_at.tzinfo)
+    return max((retry_at - now).total_seconds(), 0.0)
+
+
+def get_response_size(response: requests.Response, stream: bool = False) -> int:
+    """Get the number of bytes downloaded for the response body. The streamed
+    responses are not read yet, so their Content-Length header is used.
+    """
+    if "Content-Length" in response.headers:
+        try:
+            return int(response.headers["Content-Length"])
+        except ValueError:
+            pass
+    return 0 if stream else len(response.content)
+
+
+class OfflineError(requests.ConnectionError):
+    """A request was made in offline mode."""
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTP adapter with a default timeout for the requests."""
+
+    def __init__(self, *args, timeout: float = HTTP_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class TokenBucket:
+    """Pace the requests to a host. The bucket is refilled at the given rate of
+    tokens per minute up to its capacity, and each request takes a token. Without
+    rate, the requests are only paused after a rate limit response. This class is
+    thread-safe.
+    """
+
+    def __init__(self, rate: Optional[float] = None, capacity: float = 1.0):
+        self.rate = rate / 60 if rate else None
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def get_wait(self) -> float:
+        """Take a token and return 0, or return the seconds to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.rate is None:
+                return 0.0
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Wait until a request can be done. Returns the seconds waited."""
+        waited = 0.0
+        wait = self.get_wait()
+        while wait > 0:
+            time.sleep(wait)
+            waited += wait
+            wait = self.get_wait()
+        return waited
+
+    def pause(self, seconds: float):
+        """Do not allow requests during the given seconds."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class SessionPool:
+    """Keep one requests session per host, so the connections are reused between
+    requests (keep-alive) instead of doing a new TCP and TLS handshake every time.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        retries: int = HTTP_RETRIES,
+        backoff_factor: float = HTTP_BACKOFF_FACTOR,
+        timeout: float = HTTP_TIMEOUT,
+        rate_limits: Optional[Dict[str, float]] = None,
+        rate_limit_retries: int = RATE_LIMIT_RETRIES,
+    ):
+        """Initialize the session pool.
+
+        :param pool_size: Maximum number of connections kept alive for each host.
+        :param retries: Number of retries for connection errors and server errors.
+        :param backoff_factor: Backoff factor between retries, in seconds.
+        :param timeout: Default timeout for the requests, in seconds.
+        :param rate_limits: Maximum requests per minute for each host.
+        :param rate_limit_retries: Number of retries for rate limit responses (429).
+        """
+        self.offline = False
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.rate_limits = RATE_LIMITS if rate_limits is None else rate_limits
+        self.rate_limit_retries = rate_limit_retries
+        self.sessions: Dict[str, requests.Session] = {}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def create_session(self) -> requests.Session:
+        """Create a new session with the pool and retries configuration."""
+        session = requests.Session()
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            raise_on_status=False,
+        )
+        adapter = TimeoutHTTPAdapter(
+            timeout=self.timeout,
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def get_session(self, url: str) -> requests.Session:
+        """Get the session for the host of the given url."""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self.sessions:
+                self.sessions[host] = self.create_session()
+            return self.sessions[host]
+
+    def get_bucket(self, url: str) -> TokenBucket:
+        """Get the rate limiter for the host of the given url."""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate_limits.get(host))
+            return self.buckets[host]
+
+    def get_rate_limit_wait(self, response: requests.Response, attempt: int) -> float:
+        """Get the seconds to wait after a rate limit response. The Retry-After
+        header is used if present, otherwise an exponential backoff with jitter.
+        """
+        wait = get_retry_after(response)
+        if wait is None:
+            wait = self.backoff_factor * 2**attempt * random.uniform(1, 2)
+        return min(wait, RATE_LIMIT_MAX_WAIT)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Make a request, pacing the requests to each host using its rate limit.
+        After a rate limit response (429), the requests to the host are paused and
+        the request is retried up to rate_limit_retries times.
+        """
+        if self.offline:
+            raise OfflineError(f"Offline mode is enabled, {method} {url} not allowed")
+        host = urlparse(url).netloc
+        bucket = self.get_bucket(url)
+        attempt = 0
+        while True:
+            run_stats.record_wait(host, bucket.acquire())
+            response = self.get_session(url).request(method, url, **kwargs)
+            run_stats.record_download(
+                host, get_response_size(response, kwargs.get("stream", False))
+            )
+            if response.status_code != 429 or attempt >= self.rate_limit_retries:
+                return response
+            response.close()
+            bucket.pause(self.get_rate_limit_wait(response, attempt))
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def close(self):
+        """Close all the sessions."""
+        with self._lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions = {}
+
+
+session_pool = SessionPool()
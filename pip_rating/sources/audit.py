@@ -1,15 +1,27 @@
 import datetime
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import cached_property
-from hashlib import sha1
-from pathlib import Path
-from typing import List, TypedDict, Optional
+from typing import List, TypedDict, Optional, Dict, Iterator, Iterable
 
 from pip_audit._service.pypi import PyPIService
 from pip_audit._service.osv import OsvService
 from pip_audit._service.interface import ResolvedDependency, VulnerabilityResult
-from packaging.version import Version
+from packaging.utils import canonicalize_name
+from packaging.version import InvalidVersion, Version
 
+from pip_rating.cache import CacheKey, get_cache_policy
+from pip_rating.sessions import SessionPool, session_pool
 from pip_rating.sources.base import SourceBase
+from pip_rating.stats import run_stats
+from pip_rating.utils import parse_iso_datetime
+
+
+OSV_QUERYBATCH_URL = "https://api.osv.dev/v1/querybatch"
+OSV_VULNERABILITY_URL = "https://api.osv.dev/v1/vulns/{id}"
+# The OSV API accepts up to 1000 queries per batch
+OSV_BATCH_SIZE = int(os.environ.get("PIP_RATING_OSV_BATCH_SIZE", 1000))
 
 
 class Vulnerability(TypedDict):
@@ -35,29 +47,70 @@ def vulns_to_dict(vulnerabilities: List[VulnerabilityResult]) -> List[Vulnerabil
     ]
 
 
+def sort_versions(versions: Iterable[str]) -> List[str]:
+    """Sort the unique versions. The versions that are not valid PEP 440 versions
+    are sorted as strings after the valid ones.
+    """
+    valid_versions = []
+    invalid_versions = []
+    for version in set(versions):
+        try:
+            valid_versions.append((Version(version), version))
+        except InvalidVersion:
+            invalid_versions.append(version)
+    return [version for _, version in sorted(valid_versions)] + sorted(invalid_versions)
+
+
+def osv_vuln_to_dict(vuln: dict, package_name: str) -> Optional[Vulnerability]:
+    """Convert an OSV vulnerability to a dict, in the same way as pip-audit does for
+    its OSV service. Withdrawn vulnerabilities are ignored and return None.
+    """
+    if vuln.get("withdrawn"):
+        return None
+    description = vuln.get("summary") or vuln.get("details") or "N/A"
+    fix_versions = []
+    for affected in vuln.get("affected") or []:
+        package = affected.get("package", {})
+        if package.get("ecosystem") != "PyPI" or canonicalize_name(
+            package.get("name", "")
+        ) != canonicalize_name(package_name):
+            continue
+        for affected_range in affected.get("ranges", []):
+            if affected_range["type"] == "ECOSYSTEM":
+                fix_versions.extend(
+                    event["fixed"]
+                    for event in affected_range["events"]
+                    if "fixed" in event
+                )
+    published = vuln.get("published")
+    return {
+        "id": vuln["id"],
+        "description": description.replace("\n", " "),
+        "fix_versions": sort_versions(fix_versions),
+        "aliases": list(vuln.get("aliases", [])),
+        "published_iso_dt": parse_iso_datetime(published).isoformat()
+        if published
+        else None,
+    }
+
+
 class Audit(SourceBase):
     """Audit source"""
 
     source_name = "audit"
+    fetch_threads = int(os.environ.get("PIP_RATING_AUDIT_FETCH_THREADS", 8))
 
     def __init__(self, package_name: str, version: str):
         self.version = version
         super().__init__(package_name)
 
     @property
-    def cache_file(self) -> Path:
-        return (
-            self.cache_dir
-            / f"{self.package_name}_{sha1(self.version.encode('utf-8')).hexdigest()}.json"
-        )
+    def cache_key(self) -> CacheKey:
+        return self.source_name, canonicalize_name(self.package_name), self.version
 
     @cached_property
     def vulnerabilities(self) -> List[Vulnerability]:
-        if not self.is_cache_expired:
-            cache = self.get_from_cache()
-        else:
-            cache = self.save_to_cache()
-        return cache["vulnerabilities"]
+        return self.fetch()["vulnerabilities"]
 
     @cached_property
     def is_vulnerable(self) -> bool:
@@ -71,9 +124,121 @@ class Audit(SourceBase):
         for vuln in osv_vulnerabilities:
             if vuln["id"] not in vulnerability_ids:
                 vulnerabilities.append(vuln)
+        return self.create_cache_data(vulnerabilities)
+
+    def get_missing_data(self) -> dict:
+        return self.create_cache_data([])
+
+    def create_cache_data(self, vulnerabilities: List[Vulnerability]) -> dict:
         return {
             "package_name": self.package_name,
             "version": self.version,
             "updated_at": datetime.datetime.now().isoformat(),
             "vulnerabilities": vulnerabilities,
         }
+
+
+class AuditBatch:
+    """Query the vulnerabilities of many package versions at once using the OSV
+    batch API, and save the results to the cache of each Audit.
+    """
+
+    def __init__(self, audits: List[Audit], pool: SessionPool = session_pool):
+        self.audits = audits
+        self.pool = pool
+        self.vulnerabilities: Dict[str, dict] = {}
+
+    def query_batch(self, audits: List[Audit]) -> List[List[str]]:
+        """Query OSV for the given audits. Returns the vulnerability ids for each
+        audit, in the same order.
+        """
+        queries = [
+            {
+                "package": {
+                    "name": canonicalize_name(audit.package_name),
+                    "ecosystem": "PyPI",
+                },
+                "version": audit.version,
+            }
+            for audit in audits
+        ]
+        vulnerability_ids: List[List[str]] = [[] for _ in audits]
+        pending = list(range(len(queries)))
+        while pending:
+            with self.pool.post(
+                OSV_QUERYBATCH_URL,
+                json={"queries": [queries[index] for index in pending]},
+            ) as response:
+                response.raise_for_status()
+                results = response.json()["results"]
+            next_pending = []
+            for index, result in zip(pending, results):
+                vulnerability_ids[index].extend(
+                    vuln["id"] for vuln in result.get("vulns", [])
+                )
+                if result.get("next_page_token"):
+                    queries[index]["page_token"] = result["next_page_token"]
+                    next_pending.append(index)
+            pending = next_pending
+        return vulnerability_ids
+
+    def get_vulnerability(self, vulnerability_id: str) -> dict:
+        """Get the OSV vulnerability details. The result is kept in memory because
+        the same vulnerability affects to many versions.
+        """
+        if vulnerability_id not in self.vulnerabilities:
+            with self.pool.get(
+                OSV_VULNERABILITY_URL.format(id=vulnerability_id)
+            ) as response:
+                response.raise_for_status()
+                self.vulnerabilities[vulnerability_id] = response.json()
+        return self.vulnerabilities[vulnerability_id]
+
+    def fetch_vulnerabilities(self, vulnerability_ids: Iterable[str]):
+        """Get concurrently the details of the vulnerabilities not in memory."""
+        vulnerability_ids = [
+            vulnerability_id
+            for vulnerability_id in dict.fromkeys(vulnerability_ids)
+            if vulnerability_id not in self.vulnerabilities
+        ]
+        if not vulnerability_ids:
+            return
+        with ThreadPoolExecutor(
+            max_workers=Audit.fetch_threads, thread_name_prefix="pip-rating-osv"
+        ) as executor:
+            list(executor.map(self.get_vulnerability, vulnerability_ids))
+
+    def get_chunks(self) -> Iterator[List[Audit]]:
+        """Get the audits with the cache expired in chunks of OSV_BATCH_SIZE. In
+        offline mode there are no chunks.
+        """
+        if get_cache_policy().offline:
+            return
+        audits = [audit for audit in self.audits if audit.is_cache_expired]
+        for index in range(0, len(audits), OSV_BATCH_SIZE):
+            yield audits[index : index + OSV_BATCH_SIZE]
+
+    def fetch(self):
+        """Query the vulnerabilities of the audits with the cache expired and save
+        the results to their caches. The details of the vulnerabilities of each
+        chunk are fetched concurrently.
+        """
+        for chunk in self.get_chunks():
+            start = time.monotonic()
+            chunk_vulnerability_ids = self.query_batch(chunk)
+            run_stats.increment(Audit.source_name, "misses", len(chunk))
+            run_stats.record_latency(Audit.source_name, time.monotonic() - start)
+            self.fetch_vulnerabilities(
+                vulnerability_id
+                for vulnerability_ids in chunk_vulnerability_ids
+                for vulnerability_id in vulnerability_ids
+            )
+            for audit, vulnerability_ids in zip(chunk, chunk_vulnerability_ids):
+                vulnerabilities = []
+                for vulnerability_id in vulnerability_ids:
+                    vulnerability = osv_vuln_to_dict(
+                        self.get_vulnerability(vulnerability_id), audit.package_name
+                    )
+                    if vulnerability is not None:
+                        vulnerabilities.append(vulnerability)
+                audit.set_cache_data(audit.create_cache_data(vulnerabilities))
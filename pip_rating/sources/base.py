@@ -1,10 +1,46 @@
 import datetime
-import json
-import os
+import threading
+import time
 from functools import cached_property
-from pathlib import Path
+from typing import Optional, TypedDict, Dict
 
-from platformdirs import user_cache_dir
+import requests
+from packaging.utils import canonicalize_name
+
+from pip_rating.cache import (
+    CacheBackendBase,
+    CacheKey,
+    get_cache_backend,
+    get_cache_policy,
+    background_refresher,
+    in_flight,
+)
+from pip_rating.sessions import SessionPool, session_pool
+from pip_rating.stats import run_stats
+
+
+class CacheValidators(TypedDict, total=False):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    last_serial: Optional[int]
+
+
+def get_validators(response: requests.Response) -> CacheValidators:
+    """Get the validators of the response to revalidate it later."""
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+def get_conditional_headers(validators: CacheValidators) -> Dict[str, str]:
+    """Get the headers for a conditional request using the given validators."""
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
 
 
 class SourceBase:
@@ -12,36 +48,155 @@ class SourceBase:
 
     source_name: str
     max_cache_age = datetime.timedelta(days=7)
+    fetch_threads = 8
+    session_pool: SessionPool = session_pool
 
     def __init__(self, package_name: str):
         self.package_name = package_name
+        self._fetch_lock = threading.Lock()
+        self._fetched_data: Optional[dict] = None
+        self._missing = False
 
     @property
-    def cache_dir(self) -> Path:
-        return Path(user_cache_dir()) / "pip-rating" / self.source_name
+    def cache_backend(self) -> CacheBackendBase:
+        return get_cache_backend()
 
     @property
-    def cache_file(self) -> Path:
-        return self.cache_dir / f"{self.package_name}.json"
+    def cache_key(self) -> CacheKey:
+        return self.source_name, canonicalize_name(self.package_name), ""
 
     @cached_property
     def is_cache_expired(self) -> bool:
+        return self.cache_backend.is_expired(*self.cache_key, self.max_cache_age)
+
+    @cached_property
+    def is_cache_stale(self) -> bool:
+        """The cache is expired, but it can be used while it is refreshed in
+        background according to the cache policy.
+        """
+        cache_policy = get_cache_policy()
         return (
-            not self.cache_file.exists()
-            or self.cache_file.stat().st_mtime
-            < (datetime.datetime.now() - self.max_cache_age).timestamp()
+            cache_policy.stale_while_revalidate
+            and not cache_policy.offline
+            and self.is_cache_expired
+            and not self.cache_backend.is_expired(
+                *self.cache_key, cache_policy.max_staleness
+            )
         )
 
-    def get_from_cache(self) -> dict:
-        with open(self.cache_file) as file:
-            return json.load(file)
+    def fetch(self) -> dict:
+        """Get the source data from the cache, or from the network if the cache is
+        expired or corrupted. The data is kept in memory, so it is only loaded once per instance.
+        In offline mode, the cached data is used regardless of its age, and the
+        missing data is replaced by neutral values. This method is thread-safe.
+        """
+        with self._fetch_lock:
+            if self._fetched_data is None:
+                if get_cache_policy().offline:
+                    self._fetched_data = self.get_from_cache()
+                    if self._fetched_data is None:
+                        self._missing = True
+                        self._fetched_data = self.get_missing_data()
+                        run_stats.increment(self.source_name, "unavailable")
+                    else:
+                        run_stats.increment(self.source_name, "hits")
+                elif not self.is_cache_expired:
+                    self._fetched_data = self.get_from_cache()
+                    if self._fetched_data is not None:
+                        run_stats.increment(self.source_name, "hits")
+                elif self.is_cache_stale:
+                    self._fetched_data = self.get_from_cache()
+                    if self._fetched_data is not None:
+                        run_stats.increment(self.source_name, "stale_hits")
+                        background_refresher.submit(
+                            [self.cache_key], self.refresh_cache_once
+                        )
+                if self._fetched_data is None:
+                    # The cache is expired, or the cached entry was corrupted
+                    self._fetched_data = self.refresh_cache_once()
+            return self._fetched_data
+
+    @property
+    def is_missing(self) -> bool:
+        """The source data is not available in offline mode."""
+        self.fetch()
+        return self._missing
+
+    def refresh_cache_once(self) -> dict:
+        """Refresh the cache, or wait for the refresh of the same entry in progress
+        in this process, for example by another instance of the same source.
+        """
+        return in_flight.do(self.cache_key, self.refresh_cache_locked)
+
+    def refresh_cache_locked(self) -> dict:
+        """Refresh the cache holding the lock of the entry, so only one process
+        fetches the data at a time. If the entry was refreshed by another process
+        while waiting for the lock, its data is used instead.
+        """
+        with self.cache_backend.lock(*self.cache_key):
+            self.cache_backend.reload(*self.cache_key)
+            if not self.cache_backend.is_expired(*self.cache_key, self.max_cache_age):
+                cache_data = self.get_from_cache()
+                if cache_data is not None:
+                    run_stats.increment(self.source_name, "hits")
+                    return cache_data
+            return self.refresh_cache()
+
+    def refresh_cache(self) -> dict:
+        """Update the expired cache. If the cached data has validators, a conditional
+        request is used, and if the data has not changed upstream, only the cache
+        update time is refreshed.
+        """
+        cache_data = self.cache_backend.get(*self.cache_key)
+        validators = cache_data.get("validators") if cache_data else None
+        start = time.monotonic()
+        if not validators:
+            try:
+                cache_data = self.save_to_cache()
+            except Exception:
+                run_stats.increment(self.source_name, "errors")
+                raise
+            run_stats.increment(self.source_name, "misses")
+            run_stats.record_latency(self.source_name, time.monotonic() - start)
+            return cache_data
+        try:
+            new_cache_data = self.get_revalidated_cache_data(validators)
+        except Exception:
+            run_stats.increment(self.source_name, "errors")
+            raise
+        run_stats.increment(self.source_name, "revalidations")
+        run_stats.record_latency(self.source_name, time.monotonic() - start)
+        if new_cache_data is None:
+            run_stats.increment(self.source_name, "not_modified")
+            self.cache_backend.touch(*self.cache_key)
+            return self.get_from_cache()
+        return self.save_to_cache(new_cache_data)
+
+    def get_from_cache(self) -> Optional[dict]:
+        return self.cache_backend.get(*self.cache_key)
 
     def get_cache_data(self) -> dict:
         raise NotImplementedError
 
-    def save_to_cache(self) -> dict:
-        cache_data = self.get_cache_data()
-        os.makedirs(str(self.cache_file.parent), exist_ok=True)
-        with open(self.cache_file, "w") as file:
-            json.dump(cache_data, file)
+    def get_missing_data(self) -> dict:
+        """Get the data used when the source data is not available."""
+        raise NotImplementedError
+
+    def get_revalidated_cache_data(self, validators: CacheValidators) -> Optional[dict]:
+        """Get the new data using a conditional request, or None if the data has not
+        changed upstream. By default, the data is requested again.
+        """
+        return self.get_cache_data()
+
+    def set_cache_data(self, cache_data: dict):
+        """Save the given data to the cache and keep it in memory. This is used when
+        the data of many packages is obtained at once.
+        """
+        with self._fetch_lock:
+            self._fetched_data = self.save_to_cache(cache_data)
+
+    def save_to_cache(self, cache_data: Optional[dict] = None) -> dict:
+        if cache_data is None:
+            cache_data = self.get_cache_data()
+        self.cache_backend.set(*self.cache_key, cache_data)
         return cache_data
@@ -1,11 +1,18 @@
 import datetime
+import os
 from functools import cached_property
 from itertools import chain
 from typing import TypedDict, Optional, List, Dict
 
 import requests
 
-from pip_rating.sources.base import SourceBase
+from pip_rating.cache import get_cache_policy, in_flight
+from pip_rating.sources.base import (
+    SourceBase,
+    CacheValidators,
+    get_validators,
+    get_conditional_headers,
+)
 
 URL = "https://pypi.org/pypi/{package_name}/json"
 
@@ -63,56 +70,173 @@ class PypiPackage(TypedDict):
     releases: Dict[str, List[PypiPackageReleaseUpload]]
 
 
-class PypiCacheDict(TypedDict):
+class PypiSummary(TypedDict):
+    name: str
+    version: str
+    project_urls: Dict[str, str]
+    first_upload_iso_dt: Optional[str]
+    latest_upload_iso_dt: Optional[str]
+    releases_count: int
+    requires_dist: Optional[List[str]]
+    yanked: bool
+    yanked_reason: Optional[str]
+    yanked_releases: List[str]
+
+
+class PypiBaseCacheDict(TypedDict):
     package_name: str
     updated_at: str
+    summary: PypiSummary
+
+
+class PypiCacheDict(PypiBaseCacheDict, total=False):
     package: PypiPackage
+    validators: CacheValidators
+
+
+def get_uploads(package: PypiPackage) -> List[PypiPackageReleaseUpload]:
+    """Get all the uploads of all the releases of the package."""
+    return list(chain(*list(package["releases"].values())))
+
+
+def get_summary(package: PypiPackage) -> PypiSummary:
+    """Get the package data required by the rating, so the full PyPI document with
+    every release and every upload is not stored in the cache.
+    """
+    upload_times = [
+        upload["upload_time_iso_8601"]
+        for upload in get_uploads(package)
+        if upload.get("upload_time_iso_8601")
+    ]
+    return {
+        "name": package["info"]["name"],
+        "version": package["info"].get("version"),
+        "project_urls": package["info"].get("project_urls") or {},
+        "first_upload_iso_dt": min(upload_times) if upload_times else None,
+        "latest_upload_iso_dt": max(upload_times) if upload_times else None,
+        "releases_count": len(package["releases"]),
+        "requires_dist": package["info"].get("requires_dist"),
+        "yanked": package["info"].get("yanked", False),
+        "yanked_reason": package["info"].get("yanked_reason"),
+        "yanked_releases": [
+            version
+            for version, uploads in package["releases"].items()
+            if uploads and all(upload.get("yanked") for upload in uploads)
+        ],
+    }
 
 
 class Pypi(SourceBase):
     source_name = "pypi"
-
-    def get_cache_data(self) -> dict:
-        return {
+    fetch_threads = int(os.environ.get("PIP_RATING_PYPI_FETCH_THREADS", 16))
+
+    def __init__(self, package_name: str, full_package: bool = False):
+        """Initialize the PyPI source.
+
+        :param package_name: Name of the package.
+        :param full_package: Keep the full PyPI document in the cache, not only the
+            summary. It is required by the JSON output.
+        """
+        super().__init__(package_name)
+        self.full_package = full_package
+
+    def create_cache_data(
+        self, package: PypiPackage, validators: Optional[CacheValidators] = None
+    ) -> PypiCacheDict:
+        cache_data: PypiCacheDict = {
             "package_name": self.package_name,
             "updated_at": datetime.datetime.now().isoformat(),
-            "package": dict(self.get_package()),
+            "summary": get_summary(package),
         }
+        if self.full_package:
+            cache_data["package"] = package
+        if validators is not None:
+            cache_data["validators"] = {
+                **validators,
+                "last_serial": package.get("last_serial"),
+            }
+        return cache_data
+
+    def get_missing_data(self) -> PypiCacheDict:
+        return self.create_cache_data(
+            {"info": {"name": self.package_name}, "releases": {}}
+        )
+
+    def get_cache_data(self) -> PypiCacheDict:
+        with self.get_response() as response:
+            return self.create_cache_data(response.json(), get_validators(response))
+
+    def get_revalidated_cache_data(
+        self, validators: CacheValidators
+    ) -> Optional[PypiCacheDict]:
+        """Revalidate the cache using the ETag and Last-Modified validators. PyPI
+        returns the last serial of the project in a header, so if the serial has not
+        changed the response body is not downloaded.
+        """
+        with self.get_response(get_conditional_headers(validators)) as response:
+            last_serial = response.headers.get("X-PyPI-Last-Serial")
+            if response.status_code == 304 or (
+                last_serial is not None
+                and last_serial == str(validators.get("last_serial"))
+            ):
+                return None
+            return self.create_cache_data(response.json(), get_validators(response))
+
+    def get_from_cache(self) -> Optional[PypiCacheDict]:
+        cache_data = super().get_from_cache()
+        if cache_data is not None and "summary" not in cache_data:
+            # Cache created by a previous version with the full document only
+            return self.save_to_cache(self.create_cache_data(cache_data["package"]))
+        if (
+            self.full_package
+            and not get_cache_policy().offline
+            and (cache_data is None or "package" not in cache_data)
+        ):
+            return self.save_to_cache()
+        return cache_data
 
     @cached_property
-    def package(self) -> PypiPackage:
-        if not self.is_cache_expired:
-            cache = self.get_from_cache()
-        else:
-            cache = self.save_to_cache()
-        return cache["package"]
+    def summary(self) -> PypiSummary:
+        return self.fetch()["summary"]
 
     @cached_property
-    def uploads(self) -> List[PypiPackageReleaseUpload]:
-        uploads = chain(*list(self.package["releases"].values()))
-        return sorted(uploads, key=lambda upload: upload.get("upload_time_iso_8601"))
-
-    @property
-    def latest_upload(self) -> Optional[PypiPackageReleaseUpload]:
-        return self.uploads[-1] if self.uploads else None
-
-    @property
-    def first_upload(self) -> Optional[PypiPackageReleaseUpload]:
-        return self.uploads[0] if self.uploads else None
+    def package(self) -> PypiPackage:
+        cache_data = self.fetch()
+        if "package" not in cache_data and get_cache_policy().offline:
+            return {}
+        if "package" not in cache_data:
+            self.full_package = True
+            package = in_flight.do((*self.cache_key, "package"), self.get_package)
+            cache_data = self.create_cache_data(dict(package))
+            self.set_cache_data(cache_data)
+        return cache_data["package"]
 
     @property
     def latest_upload_iso_dt(self) -> Optional[str]:
-        if self.latest_upload:
-            return self.latest_upload["upload_time_iso_8601"]
-        return None
+        return self.summary["latest_upload_iso_dt"]
 
     @property
     def first_upload_iso_dt(self) -> Optional[str]:
-        if self.first_upload:
-            return self.first_upload["upload_time_iso_8601"]
-        return None
+        return self.summary["first_upload_iso_dt"]
+
+    def get_response(
+        self, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Request the package document. The body is only downloaded when it is
+        read.
+        """
+        response = self.session_pool.get(
+            URL.format(package_name=self.package_name),
+            headers=headers or {},
+            stream=True,
+        )
+        try:
+            response.raise_for_status()
+        except requests.RequestException:
+            response.close()
+            raise
+        return response
 
     def get_package(self) -> PypiPackage:
-        with requests.get(URL.format(package_name=self.package_name)) as response:
-            response.raise_for_status()
+        with self.get_response() as response:
             return response.json()
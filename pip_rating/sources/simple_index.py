@@ -0,0 +1,328 @@
+import datetime
+import os
+from email.parser import HeaderParser
+from functools import cached_property
+from html.parser import HTMLParser
+from typing import TypedDict, Optional, List, Dict, Tuple
+from urllib.parse import urljoin, urlsplit, unquote
+
+import requests
+from packaging.version import Version
+from packaging.utils import (
+    InvalidSdistFilename,
+    InvalidVersion,
+    InvalidWheelFilename,
+    canonicalize_name,
+    parse_sdist_filename,
+    parse_wheel_filename,
+)
+
+from pip_rating.cache import CacheKey
+from pip_rating.sources.base import (
+    SourceBase,
+    CacheValidators,
+    get_validators,
+    get_conditional_headers,
+)
+from pip_rating.sources.pypi import Pypi
+
+PYPI_INDEX_URL = "https://pypi.org/simple"
+DEFAULT_INDEX_URL = os.environ.get("PIP_INDEX_URL", PYPI_INDEX_URL).rstrip("/")
+SIMPLE_JSON_CONTENT_TYPE = "application/vnd.pypi.simple.v1+json"
+SIMPLE_ACCEPT = f"{SIMPLE_JSON_CONTENT_TYPE}, text/html;q=0.1"
+METADATA_ATTRIBUTES = ("core-metadata", "dist-info-metadata")
+
+
+class IndexFile(TypedDict):
+    filename: str
+    url: str
+    version: str
+    requires_python: Optional[str]
+    yanked: bool
+    metadata: bool
+
+
+class SimpleIndexCacheDict(TypedDict, total=False):
+    package_name: str
+    updated_at: str
+    files: List[IndexFile]
+    validators: CacheValidators
+
+
+class CoreMetadataCacheDict(TypedDict):
+    package_name: str
+    version: str
+    updated_at: str
+    requires_dist: Optional[List[str]]
+
+
+def get_file_version(filename: str) -> Optional[str]:
+    """Get the version of a wheel or a sdist from its filename. Returns None for
+    the other distribution formats and for the invalid filenames.
+    """
+    try:
+        if filename.endswith(".whl"):
+            return str(parse_wheel_filename(filename)[1])
+        return str(parse_sdist_filename(filename)[1])
+    except (InvalidWheelFilename, InvalidSdistFilename, InvalidVersion):
+        return None
+
+
+def create_index_file(
+    url: str,
+    requires_python: Optional[str],
+    yanked: bool,
+    metadata: bool,
+    filename: Optional[str] = None,
+) -> Optional[IndexFile]:
+    """Create the file of the index, or None if the version is unknown."""
+    url = url.split("#", 1)[0]
+    filename = filename or unquote(urlsplit(url).path.rsplit("/", 1)[-1])
+    version = get_file_version(filename)
+    if version is None:
+        return None
+    return {
+        "filename": filename,
+        "url": url,
+        "version": version,
+        "requires_python": requires_python or None,
+        "yanked": yanked,
+        "metadata": metadata,
+    }
+
+
+class SimpleIndexParser(HTMLParser):
+    """Get the files of the HTML project page of a simple index (PEP 503), with the
+    Requires-Python, yanked and metadata (PEP 658 and PEP 714) attributes.
+    """
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.files: List[IndexFile] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        if tag == "base":
+            self.base_url = urljoin(self.base_url, dict(attrs).get("href") or "")
+        if tag != "a":
+            return
+        attributes = dict(attrs)
+        if not attributes.get("href"):
+            return
+        metadata = [attributes.get(f"data-{name}") for name in METADATA_ATTRIBUTES]
+        index_file = create_index_file(
+            urljoin(self.base_url, attributes["href"]),
+            attributes.get("data-requires-python"),
+            "data-yanked" in attributes,
+            any(value is not None and value != "false" for value in metadata),
+        )
+        if index_file is not None:
+            self.files.append(index_file)
+
+
+def parse_simple_json(content: dict, base_url: str) -> List[IndexFile]:
+    """Get the files of the JSON project page of a simple index (PEP 691)."""
+    files = []
+    for file in content.get("files", []):
+        index_file = create_index_file(
+            urljoin(base_url, file["url"]),
+            file.get("requires-python"),
+            bool(file.get("yanked")),
+            any(file.get(name) for name in METADATA_ATTRIBUTES),
+            file.get("filename"),
+        )
+        if index_file is not None:
+            files.append(index_file)
+    return files
+
+
+def parse_simple_html(content: str, base_url: str) -> List[IndexFile]:
+    """Get the files of the HTML project page of a simple index (PEP 503)."""
+    parser = SimpleIndexParser(base_url)
+    parser.feed(content)
+    parser.close()
+    return parser.files
+
+
+def is_same_version(version: Optional[str], other: str) -> bool:
+    """Compare the versions after normalizing them."""
+    try:
+        return version is not None and Version(version) == Version(other)
+    except InvalidVersion:
+        return version == other
+
+
+def parse_requires_dist(content: str) -> List[str]:
+    """Get the Requires-Dist fields of the core metadata file of a distribution."""
+    return HeaderParser().parsestr(content).get_all("Requires-Dist") or []
+
+
+class SimpleIndex(SourceBase):
+    """Files of a project in a simple repository index. The JSON API (PEP 691) is
+    requested, and the HTML page is parsed if the index does not support it.
+    """
+
+    source_name = "simple_index"
+
+    def __init__(self, package_name: str, index_url: Optional[str] = None):
+        """Initialize the simple index source.
+
+        :param package_name: Name of the package.
+        :param index_url: Base URL of the index. By default, the PyPI index.
+        """
+        super().__init__(package_name)
+        self.index_url = (index_url or DEFAULT_INDEX_URL).rstrip("/")
+
+    @property
+    def cache_key(self) -> CacheKey:
+        """The entries of the default index are stored without the index URL."""
+        index_url = "" if self.index_url == DEFAULT_INDEX_URL else self.index_url
+        return self.source_name, canonicalize_name(self.package_name), index_url
+
+    @property
+    def url(self) -> str:
+        return f"{self.index_url}/{canonicalize_name(self.package_name)}/"
+
+    @cached_property
+    def files(self) -> List[IndexFile]:
+        return self.fetch()["files"]
+
+    def create_cache_data(
+        self, response: requests.Response, validators: Optional[CacheValidators]
+    ) -> SimpleIndexCacheDict:
+        content_type = response.headers.get("Content-Type", "")
+        if content_type.startswith(SIMPLE_JSON_CONTENT_TYPE):
+            files = parse_simple_json(response.json(), response.url)
+        else:
+            files = parse_simple_html(response.text, response.url)
+        cache_data: SimpleIndexCacheDict = {
+            "package_name": self.package_name,
+            "updated_at": datetime.datetime.now().isoformat(),
+            "files": files,
+        }
+        if validators:
+            cache_data["validators"] = validators
+        return cache_data
+
+    def get_missing_data(self) -> SimpleIndexCacheDict:
+        return {
+            "package_name": self.package_name,
+            "updated_at": datetime.datetime.now().isoformat(),
+            "files": [],
+        }
+
+    def get_cache_data(self) -> SimpleIndexCacheDict:
+        response = self.get_response()
+        return self.create_cache_data(response, get_validators(response))
+
+    def get_revalidated_cache_data(
+        self, validators: CacheValidators
+    ) -> Optional[SimpleIndexCacheDict]:
+        response = self.get_response(get_conditional_headers(validators))
+        if response.status_code == 304:
+            return None
+        return self.create_cache_data(response, get_validators(response))
+
+    def get_response(
+        self, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        response = self.session_pool.get(
+            self.url, headers={"Accept": SIMPLE_ACCEPT, **(headers or {})}
+        )
+        response.raise_for_status()
+        return response
+
+
+class CoreMetadata(SourceBase):
+    """Requirements of a version of a package, without downloading the package.
+    They are read from the core metadata file of a wheel (PEP 658), or from the
+    PyPI document of the package if the version is the latest one. The requirements
+    are None if neither of them lists them.
+    """
+
+    source_name = "core_metadata"
+    # The metadata of a released version does not change
+    max_cache_age = datetime.timedelta(days=365)
+
+    def __init__(
+        self,
+        package_name: str,
+        version: str,
+        files: Optional[List[IndexFile]] = None,
+        index_url: Optional[str] = None,
+    ):
+        """Initialize the core metadata source.
+
+        :param package_name: Name of the package.
+        :param version: Version of the package.
+        :param files: Files of the version in the index.
+        :param index_url: Base URL of the index. By default, the PyPI index.
+        """
+        super().__init__(package_name)
+        self.version = version
+        self.files = files or []
+        self.index_url = (index_url or DEFAULT_INDEX_URL).rstrip("/")
+
+    @property
+    def cache_key(self) -> CacheKey:
+        """The entries of the default index are stored without the index URL, as in
+        the simple index source. The URL of the other indexes follows the version.
+        """
+        version = self.version
+        if self.index_url != DEFAULT_INDEX_URL:
+            version = f"{version} {self.index_url}"
+        return self.source_name, canonicalize_name(self.package_name), version
+
+    @property
+    def use_pypi(self) -> bool:
+        """The PyPI document only describes the packages of the PyPI index."""
+        return self.index_url == PYPI_INDEX_URL
+
+    @cached_property
+    def requires_dist(self) -> Optional[List[str]]:
+        return self.fetch()["requires_dist"]
+
+    @property
+    def wheels(self) -> List[IndexFile]:
+        return [file for file in self.files if file["filename"].endswith(".whl")]
+
+    def create_cache_data(
+        self, requires_dist: Optional[List[str]]
+    ) -> CoreMetadataCacheDict:
+        return {
+            "package_name": self.package_name,
+            "version": self.version,
+            "updated_at": datetime.datetime.now().isoformat(),
+            "requires_dist": requires_dist,
+        }
+
+    def get_missing_data(self) -> CoreMetadataCacheDict:
+        return self.create_cache_data(None)
+
+    def save_to_cache(
+        self, cache_data: Optional[CoreMetadataCacheDict] = None
+    ) -> CoreMetadataCacheDict:
+        """The unknown requirements are not cached, because they may be found with
+        another index or once the metadata file is available.
+        """
+        if cache_data is None:
+            cache_data = self.get_cache_data()
+        if cache_data["requires_dist"] is None:
+            return cache_data
+        return super().save_to_cache(cache_data)
+
+    def get_cache_data(self) -> CoreMetadataCacheDict:
+        """Get the requirements from the metadata file of the first wheel with one,
+        or from the PyPI document. PyPI returns null requirements both when there
+        are none and when they are unknown, so they are unknown in that case.
+        """
+        metadata_urls = [file["url"] for file in self.wheels if file["metadata"]]
+        if metadata_urls:
+            response = self.session_pool.get(f"{metadata_urls[0]}.metadata")
+            response.raise_for_status()
+            return self.create_cache_data(parse_requires_dist(response.text))
+        if self.use_pypi:
+            summary = Pypi(self.package_name).summary
+            if is_same_version(summary.get("version"), self.version):
+                return self.create_cache_data(summary.get("requires_dist"))
+        return self.create_cache_data(None)
@@ -2,13 +2,17 @@ import base64
 import datetime
 import os
 import re
+import time
 from functools import cached_property
-from typing import TYPE_CHECKING, TypedDict, Optional
+from typing import TYPE_CHECKING, TypedDict, Optional, Tuple, List, Iterator
 
 import click
 import requests
 
+from pip_rating.cache import get_cache_policy
+from pip_rating.sessions import SessionPool, session_pool
 from pip_rating.sources.base import SourceBase
+from pip_rating.stats import run_stats
 
 
 if TYPE_CHECKING:
@@ -17,6 +21,13 @@ if TYPE_CHECKING:
 
 GITHUB_REPOSITORY_URL = "https://github.com/([^/]+)/([^/]+).*"
 GITHUB_README_URL = "https://api.github.com/repos/{owner}/{repo}/readme"
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+# The GraphQL API has no readme field, so the most common names are requested. The
+# readmes with other names are requested using the REST API.
+GITHUB_README_NAMES = ["README.md", "README.rst", "README.txt", "README", "readme.md"]
+GITHUB_BATCH_SIZE = int(os.environ.get("PIP_RATING_GITHUB_BATCH_SIZE", 50))
+# Keep the full readme in the cache, only for debugging
+STORE_READMES = bool(os.environ.get("PIP_RATING_STORE_READMES"))
 PIP_INSTALL_PATTERNS = [
     re.compile(r"pip3? +install +(?:-U +|--upgrade +|)([A-Za-z0-9_\-.]+)"),
     re.compile(r"poetry +add +([A-Za-z0-9_\-.]+)"),
@@ -28,13 +39,13 @@ github_token = os.environ.get("GITHUB_TOKEN", "")
 github_warning = False
 
 
-def get_github_readme(owner: str, repo: str) -> str:
+def get_github_readme(owner: str, repo: str, pool: SessionPool = session_pool) -> str:
     """Get the readme content from GitHub."""
     headers = {}
     if github_token:
         headers["Authorization"] = f"Bearer {github_token}"
     try:
-        with requests.get(
+        with pool.get(
             GITHUB_README_URL.format(owner=owner, repo=repo), headers=headers
         ) as response:
             response.raise_for_status()
@@ -69,8 +80,72 @@ def get_github_readme(owner: str, repo: str) -> str:
         return ""
 
 
+def get_github_readmes_query(repositories: List[Tuple[str, str]]) -> str:
+    """Get the GraphQL query of the readmes of the given repositories. Each
+    repository uses an alias and its own owner and name variables.
+    """
+    variables = ", ".join(
+        f"$owner{index}: String!, $name{index}: String!"
+        for index in range(len(repositories))
+    )
+    readmes = " ".join(
+        f'readme{position}: object(expression: "HEAD:{name}") {{ ... on Blob {{ text }} }}'
+        for position, name in enumerate(GITHUB_README_NAMES)
+    )
+    fields = " ".join(
+        f"repository{index}: repository(owner: $owner{index}, name: $name{index}) "
+        f"{{ {readmes} }}"
+        for index in range(len(repositories))
+    )
+    return f"query({variables}) {{ {fields} }}"
+
+
+def get_github_readmes(
+    repositories: List[Tuple[str, str]], pool: SessionPool = session_pool
+) -> List[Optional[str]]:
+    """Get the readme contents of many GitHub repositories in a single GraphQL
+    query. The GraphQL API requires a token. The content is None for the
+    repositories not found or without a readme in GITHUB_README_NAMES, so they can
+    be requested using the REST API. If the query fails for all the repositories,
+    for example because of the rate limit, an error is raised.
+    """
+    variables = {}
+    for index, (owner, repo) in enumerate(repositories):
+        variables[f"owner{index}"] = owner
+        variables[f"name{index}"] = repo
+    with pool.post(
+        GITHUB_GRAPHQL_URL,
+        json={"query": get_github_readmes_query(repositories), "variables": variables},
+        headers={"Authorization": f"Bearer {github_token}"},
+    ) as response:
+        response.raise_for_status()
+        content = response.json()
+    data = content.get("data") or {}
+    repositories_data = [
+        data.get(f"repository{index}") for index in range(len(repositories))
+    ]
+    if content.get("errors") and not any(repositories_data):
+        messages = "; ".join(
+            error.get("message", "") for error in content["errors"] or []
+        )
+        raise requests.RequestException(
+            f"GitHub GraphQL query failed: {messages}", response=response
+        )
+    contents = []
+    for readmes in repositories_data:
+        readme_content = None
+        for position in range(len(GITHUB_README_NAMES)):
+            readme = (readmes or {}).get(f"readme{position}") or {}
+            if readme.get("text") is not None:
+                readme_content = readme["text"]
+                break
+        contents.append(readme_content)
+    return contents
+
+
 class Sourcecode(TypedDict):
     package_in_readme: Optional[bool]
+    install_command: Optional[str]
     readme_content: str
 
 
@@ -86,56 +161,148 @@ def replace_chars(package_name: str):
     return package_name.lower().replace("_", "-").replace(".", "-")
 
 
+def search_install_command(
+    content: str, package_name: str
+) -> Tuple[Optional[bool], Optional[str]]:
+    """Search for install commands in readme. Returns whether the package name of
+    the install commands is package_name, and the matched install command. The first
+    command of package_name is returned if any, otherwise the last command found.
+    If no command is found, return None and None.
+    """
+    package_in_readme = None
+    install_command = None
+    for pattern in PIP_INSTALL_PATTERNS:
+        for match in pattern.finditer(content):
+            if match.group(1).startswith("-"):
+                continue
+            package_in_readme = replace_chars(match.group(1)) == replace_chars(
+                package_name
+            )
+            install_command = match.group(0)
+            if package_in_readme:
+                return True, install_command
+    return package_in_readme, install_command
+
+
 def search_in_readme(content: str, package_name: str) -> Optional[bool]:
     """Search for patterns in readme. If found the pattern, check if the package name is package_name.
     If the package name found is package_name, return True, else continues searching. If after all
     patterns are searched and no package name is found, return False. If any pattern matches,
     return None.
     """
-    package_in_readme = None
-    for pattern in PIP_INSTALL_PATTERNS:
-        results = pattern.findall(content)
-        for result in results:
-            if result.startswith("-"):
-                continue
-            package_in_readme = replace_chars(result) == replace_chars(package_name)
-            if package_in_readme:
-                return True
-    return package_in_readme
+    return search_install_command(content, package_name)[0]
 
 
 class SourcecodePage(SourceBase):
     source_name = "sourcecode_page"
+    fetch_threads = int(os.environ.get("PIP_RATING_SOURCECODE_PAGE_FETCH_THREADS", 4))
 
     def __init__(self, package: "Package"):
         self.package = package
         super().__init__(package.name)
 
-    def get_cache_data(self) -> SourcecodeCacheDict:
-        project_urls = self.package.pypi.package["info"].get("project_urls") or {}
-        content = ""
+    def get_missing_data(self) -> SourcecodeCacheDict:
+        return {
+            "package_name": self.package_name,
+            "updated_at": datetime.datetime.now().isoformat(),
+            "source": "github",
+            "sourcecode": {
+                "package_in_readme": None,
+                "install_command": None,
+                "readme_content": "",
+            },
+        }
+
+    @cached_property
+    def github_repository(self) -> Optional[Tuple[str, str]]:
+        """The owner and name of the GitHub repository in the project urls."""
+        project_urls = self.package.pypi.summary["project_urls"] or {}
         for url in project_urls.values():
             github_match = re.match(GITHUB_REPOSITORY_URL, url)
             if github_match:
-                content = get_github_readme(
-                    github_match.group(1), github_match.group(2)
-                )
-                break
-        package_in_readme = search_in_readme(content, self.package.name)
+                return github_match.group(1), github_match.group(2)
+        return None
+
+    def get_cache_data(self) -> SourcecodeCacheDict:
+        content = ""
+        if self.github_repository is not None:
+            content = get_github_readme(*self.github_repository, self.session_pool)
+        return self.create_cache_data(content)
+
+    def create_cache_data(self, content: str) -> SourcecodeCacheDict:
+        """Create the cache data with the verdict of the readme. The readme content
+        is only kept if PIP_RATING_STORE_READMES is set.
+        """
+        package_in_readme, install_command = search_install_command(
+            content, self.package.name
+        )
         return {
             "package_name": self.package_name,
             "updated_at": datetime.datetime.now().isoformat(),
             "source": "github",
             "sourcecode": {
                 "package_in_readme": package_in_readme,
-                "readme_content": content,
+                "install_command": install_command,
+                "readme_content": content if STORE_READMES else "",
             },
         }
 
     @cached_property
     def package_in_readme(self) -> Optional[bool]:
-        if not self.is_cache_expired:
-            cache = self.get_from_cache()
-        else:
-            cache = self.save_to_cache()
-        return cache["sourcecode"]["package_in_readme"]
+        return self.fetch()["sourcecode"]["package_in_readme"]
+
+
+class SourcecodePageBatch:
+    """Get the GitHub readmes of many packages at once using the GraphQL API, and
+    save the results to the cache of each SourcecodePage.
+    """
+
+    def __init__(
+        self, sourcecode_pages: List[SourcecodePage], pool: SessionPool = session_pool
+    ):
+        self.sourcecode_pages = sourcecode_pages
+        self.pool = pool
+
+    def get_sourcecode_pages(self) -> List[SourcecodePage]:
+        """Get the pages with the cache expired and a GitHub repository. Without
+        GitHub token or in offline mode there are no pages, and the pages are
+        fetched one by one.
+        """
+        if not github_token or get_cache_policy().offline:
+            return []
+        return [
+            sourcecode_page
+            for sourcecode_page in self.sourcecode_pages
+            if sourcecode_page.is_cache_expired
+            and sourcecode_page.github_repository is not None
+        ]
+
+    def get_chunks(self) -> Iterator[List[SourcecodePage]]:
+        """Get the pages to fetch in chunks of GITHUB_BATCH_SIZE."""
+        sourcecode_pages = self.get_sourcecode_pages()
+        for index in range(0, len(sourcecode_pages), GITHUB_BATCH_SIZE):
+            yield sourcecode_pages[index : index + GITHUB_BATCH_SIZE]
+
+    def fetch(self):
+        """Get the readmes of the pages with the cache expired and save the results
+        to their caches. The readmes not found by the batch query are requested
+        using the REST API, which finds the readme whatever its name.
+        """
+        for chunk in self.get_chunks():
+            start = time.monotonic()
+            contents = get_github_readmes(
+                [sourcecode_page.github_repository for sourcecode_page in chunk],
+                self.pool,
+            )
+            run_stats.increment(SourcecodePage.source_name, "misses", len(chunk))
+            run_stats.record_latency(
+                SourcecodePage.source_name, time.monotonic() - start
+            )
+            for sourcecode_page, content in zip(chunk, contents):
+                if content is None:
+                    content = get_github_readme(
+                        *sourcecode_page.github_repository, self.pool
+                    )
+                sourcecode_page.set_cache_data(
+                    sourcecode_page.create_cache_data(content)
+                )
@@ -1,18 +1,37 @@
 import datetime
-import time
+import json
+import os
 from functools import cached_property
-from typing import Iterator, Tuple, TypedDict, TYPE_CHECKING
+from html.parser import HTMLParser
+from typing import (
+    Iterator,
+    Tuple,
+    TypedDict,
+    TYPE_CHECKING,
+    Optional,
+    Dict,
+    List,
+    Union,
+)
 
 import requests
-from bs4 import BeautifulSoup
-from requests import RequestException
 
-from pip_rating.sources.base import SourceBase
+from pip_rating.sources.base import (
+    SourceBase,
+    CacheValidators,
+    get_validators,
+    get_conditional_headers,
+)
 
 if TYPE_CHECKING:
     from pip_rating.packages import Package
 
 SOURCERANK_URL = "https://libraries.io/pypi/{package_name}/sourcerank"
+SOURCERANK_API_URL = "https://libraries.io/api/pypi/{package_name}/sourcerank"
+SOURCERANK_BACKENDS = ("api", "html")
+DEFAULT_SOURCERANK_BACKEND = os.environ.get("PIP_RATING_SOURCERANK_BACKEND", "api")
+BREAKDOWN_ITEM_CLASS = "list-group-item"
+PARSER_CHUNK_SIZE = 8192
 BREAKDOWN_MAPPING = {
     "Basic info present?": "basic_info_present",
     "Source repository present?": "source_repository_present",
@@ -30,7 +49,86 @@ BREAKDOWN_MAPPING = {
     "Libraries.io subscribers": "librariesio_subscribers",
     "Total": "total",
 }
-RETRY_WAIT = 30
+API_BREAKDOWN_MAPPING = {
+    "basic_info_present": "basic_info_present",
+    "repository_present": "source_repository_present",
+    "readme_present": "readme_present",
+    "license_present": "license_present",
+    "versions_present": "has_multiple_versions",
+    "follows_semver": "follows_semver",
+    "recent_release": "recent_release",
+    "not_brand_new": "not_brand_new",
+    "one_point_oh": "is_1_or_greater",
+    "dependent_projects": "dependent_projects",
+    "dependent_repositories": "dependent_repositories",
+    "stars": "stars",
+    "contributors": "contributors",
+    "subscribers": "librariesio_subscribers",
+}
+
+
+class BreakdownParser(HTMLParser):
+    """Extract the breakdown from the ``list-group-item`` entries of the sourcerank
+    page. Only the text inside these entries is collected, and the parsing can be
+    stopped once all the breakdown items have been found.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.item_strings: Optional[List[str]] = None
+        self.text: List[str] = []
+        self.breakdown: Dict[str, int] = {}
+
+    @property
+    def done(self) -> bool:
+        return len(self.breakdown) == len(BREAKDOWN_MAPPING)
+
+    def flush_text(self):
+        """Add the text since the last tag to the strings of the current item. The
+        text can be received in several parts if it is split between chunks.
+        """
+        text = "".join(self.text).strip()
+        self.text = []
+        if self.item_strings is not None and text:
+            self.item_strings.append(text)
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        self.flush_text()
+        if tag != "li":
+            return
+        classes = (dict(attrs).get("class") or "").split()
+        if BREAKDOWN_ITEM_CLASS in classes:
+            self.item_strings = []
+
+    def handle_endtag(self, tag: str):
+        self.flush_text()
+        if tag != "li" or self.item_strings is None:
+            return
+        strings, self.item_strings = self.item_strings, None
+        if len(strings) > 1 and strings[1] in BREAKDOWN_MAPPING:
+            self.breakdown[BREAKDOWN_MAPPING[strings[1]]] = int(strings[0])
+
+    def handle_data(self, data: str):
+        if self.item_strings is not None:
+            self.text.append(data)
+
+
+def parse_breakdown(content: Union[str, bytes]) -> Dict[str, int]:
+    """Parse the breakdown of the sourcerank page. The page is fed to the parser
+    in chunks starting at the first breakdown item, and the rest of the page is
+    skipped once all the items have been found.
+    """
+    if isinstance(content, bytes):
+        content = content.decode("utf-8", errors="replace")
+    start = content.rfind("<li", 0, max(content.find(BREAKDOWN_ITEM_CLASS), 0))
+    parser = BreakdownParser()
+    for position in range(max(start, 0), len(content), PARSER_CHUNK_SIZE):
+        parser.feed(content[position : position + PARSER_CHUNK_SIZE])
+        if parser.done:
+            break
+    else:
+        parser.close()
+    return parser.breakdown
 
 
 class SourceRankBreakdown(TypedDict):
@@ -55,49 +153,122 @@ class SourceRankCacheDict(TypedDict):
     package_name: str
     updated_at: str
     breakdown: SourceRankBreakdown
+    validators: CacheValidators
 
 
 class SourceRank(SourceBase):
     source_name = "sourcerank"
+    fetch_threads = int(os.environ.get("PIP_RATING_SOURCERANK_FETCH_THREADS", 4))
+    api_key = os.environ.get("LIBRARIES_IO_API_KEY", "")
 
-    def __init__(self, package: "Package"):
+    def __init__(self, package: "Package", backend: str = DEFAULT_SOURCERANK_BACKEND):
+        """Initialize the SourceRank source.
+
+        :param package: Package to get the sourcerank.
+        :param backend: How the sourcerank is obtained. Using "api", the libraries.io
+            API is used if an API key is available, and using "html" the sourcerank
+            page is always scraped.
+        """
         self.package = package
+        self.backend = backend
         super().__init__(package.name)
 
-    def get_cache_data(self) -> dict:
+    def create_cache_data(self, response: requests.Response) -> SourceRankCacheDict:
+        return {
+            "package_name": self.package_name,
+            "updated_at": datetime.datetime.now().isoformat(),
+            "breakdown": dict(self.get_breakdown(response.content)),
+            "validators": get_validators(response),
+        }
+
+    def get_missing_data(self) -> dict:
         return {
             "package_name": self.package_name,
             "updated_at": datetime.datetime.now().isoformat(),
-            "breakdown": dict(self.get_breakdown()),
+            "breakdown": dict.fromkeys(BREAKDOWN_MAPPING.values(), 0),
         }
 
+    def get_cache_data(self) -> SourceRankCacheDict:
+        return self.create_cache_data(self.get_response())
+
+    def get_revalidated_cache_data(
+        self, validators: CacheValidators
+    ) -> Optional[SourceRankCacheDict]:
+        response = self.get_response(get_conditional_headers(validators))
+        if response.status_code == 304:
+            return None
+        return self.create_cache_data(response)
+
     @cached_property
     def breakdown(self) -> SourceRankBreakdown:
-        if not self.is_cache_expired:
-            cache = self.get_from_cache()
-        else:
-            cache = self.save_to_cache()
-        return cache["breakdown"]
+        return self.fetch()["breakdown"]
 
     def request(self) -> bytes:
         """Request the sourcerank page and return the content"""
-        with requests.get(
-            SOURCERANK_URL.format(package_name=self.package.real_name)
-        ) as response:
+        return self.get_response().content
+
+    @property
+    def use_api(self) -> bool:
+        """The libraries.io API is used if selected and an API key is available."""
+        return self.backend == "api" and bool(self.api_key)
+
+    def get_response(
+        self, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Request the sourcerank breakdown using the libraries.io API if available.
+        The sourcerank page is used as fallback if the API cannot be used or fails.
+        """
+        if self.use_api:
             try:
+                response = self.get_api_response(headers)
+            except requests.RequestException:
+                pass
+            else:
+                if response.ok or response.status_code == 304:
+                    return response
+        return self.get_page_response(headers)
+
+    def get_api_response(
+        self, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Request the sourcerank breakdown to the libraries.io API."""
+        with self.session_pool.get(
+            SOURCERANK_API_URL.format(package_name=self.package.real_name),
+            params={"api_key": self.api_key},
+            headers=headers or {},
+        ) as response:
+            return response
+
+    def get_page_response(
+        self, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Request the sourcerank page. The requests are paced by the rate limit of
+        libraries.io in the session pool. If the rate limit is still exceeded after
+        the retries, an error is raised so the limit page is not cached.
+        """
+        with self.session_pool.get(
+            SOURCERANK_URL.format(package_name=self.package.real_name),
+            headers=headers or {},
+        ) as response:
+            if response.status_code == 429:
                 response.raise_for_status()
-            except RequestException as e:
-                if e.response is not None and e.response.status_code == 429:
-                    self.package.dependencies.results.progress_console.print(
-                        f"Reached request limit for Sourcerank, waiting {RETRY_WAIT} seconds"
-                    )
-                    time.sleep(RETRY_WAIT)
-                    return self.request()
-            return response.content
-
-    def get_breakdown(self) -> Iterator[Tuple[str, int]]:
-        soup = BeautifulSoup(self.request(), "html.parser")
-        for item in soup.find_all("li", "list-group-item"):
-            stripped_strings = list(item.stripped_strings)
-            if stripped_strings[1] in BREAKDOWN_MAPPING:
-                yield BREAKDOWN_MAPPING[stripped_strings[1]], int(stripped_strings[0])
+            return response
+
+    def get_breakdown(
+        self, content: Optional[bytes] = None
+    ) -> Iterator[Tuple[str, int]]:
+        """Parse the breakdown of the API response or of the sourcerank page."""
+        if content is None:
+            content = self.request()
+        if content.lstrip()[:1] in ("{", b"{"):
+            yield from self.get_api_breakdown(json.loads(content))
+            return
+        yield from parse_breakdown(content).items()
+
+    def get_api_breakdown(self, data: Dict[str, int]) -> Iterator[Tuple[str, int]]:
+        """Map the API response to the breakdown. The API does not return the total,
+        which is the sum of all the scores, including the negative ones.
+        """
+        for key, name in API_BREAKDOWN_MAPPING.items():
+            yield name, int(data.get(key) or 0)
+        yield "total", sum(int(value or 0) for value in data.values())
@@ -0,0 +1,197 @@
+"""Statistics of the cache contents and of the cache usage during a run."""
+import datetime
+import math
+import threading
+from typing import Dict, List, Optional, Tuple, TypedDict, TYPE_CHECKING
+
+from rich.console import Console
+from rich.table import Table
+
+if TYPE_CHECKING:
+    from pip_rating.cache import CacheEntry
+
+
+LATENCY_PERCENTILES = (50, 90, 99)
+AGE_BUCKETS: List[Tuple[str, Optional[datetime.timedelta]]] = [
+    ("<1d", datetime.timedelta(days=1)),
+    ("<7d", datetime.timedelta(days=7)),
+    ("<30d", datetime.timedelta(days=30)),
+    ("<90d", datetime.timedelta(days=90)),
+    (">=90d", None),
+]
+
+
+class SourceCacheStats(TypedDict):
+    entries: int
+    bytes: int
+    ages: Dict[str, int]
+
+
+class SourceRunStats(TypedDict):
+    hits: int
+    stale_hits: int
+    unavailable: int
+    misses: int
+    revalidations: int
+    not_modified: int
+    errors: int
+    latency: Dict[str, float]
+
+
+class RunStatsDict(TypedDict):
+    sources: Dict[str, SourceRunStats]
+    bytes_downloaded: Dict[str, int]
+    rate_limit_wait: Dict[str, float]
+
+
+def percentile(values: List[float], percent: int) -> float:
+    """Get the percentile of the values using the nearest-rank method."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+
+def get_cache_stats(entries: List["CacheEntry"]) -> Dict[str, SourceCacheStats]:
+    """Get the number of entries, the size in bytes and the histogram of the ages
+    (since the last update) of the cache entries per source.
+    """
+    now = datetime.datetime.now()
+    stats: Dict[str, SourceCacheStats] = {}
+    for entry in sorted(entries, key=lambda entry: entry.source):
+        source_stats = stats.setdefault(
+            entry.source,
+            {"entries": 0, "bytes": 0, "ages": {name: 0 for name, _ in AGE_BUCKETS}},
+        )
+        source_stats["entries"] += 1
+        source_stats["bytes"] += entry.size
+        age = now - entry.updated_at
+        for name, max_age in AGE_BUCKETS:
+            if max_age is None or age < max_age:
+                source_stats["ages"][name] += 1
+                break
+    return stats
+
+
+def print_cache_stats(stats: Dict[str, SourceCacheStats], console: Console):
+    """Print the cache stats as a table."""
+    table = Table(title="Cache")
+    table.add_column("Source")
+    table.add_column("Entries", justify="right")
+    table.add_column("Bytes", justify="right")
+    for name, _ in AGE_BUCKETS:
+        table.add_column(name, justify="right")
+    for source, source_stats in stats.items():
+        table.add_row(
+            source,
+            str(source_stats["entries"]),
+            str(source_stats["bytes"]),
+            *[str(count) for count in source_stats["ages"].values()],
+        )
+    console.print(table)
+
+
+class RunStats:
+    """Count how the sources data is obtained during the run: from the cache (hits
+    and stale hits), not available in offline mode, or from the network (misses and
+    revalidations), with the latency of the network operations and the number of
+    errors. The bytes downloaded and the time waited because of the rate limits are
+    counted per host. This class is thread-safe.
+    """
+
+    counters = {
+        "hits": "Hits",
+        "stale_hits": "Stale",
+        "unavailable": "N/A",
+        "misses": "Miss",
+        "revalidations": "Reval",
+        "not_modified": "304",
+        "errors": "Err",
+    }
+
+    def __init__(self):
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.latencies: Dict[str, List[float]] = {}
+        self.bytes_downloaded: Dict[str, int] = {}
+        self.rate_limit_wait: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, source: str, counter: str, value: int = 1):
+        with self._lock:
+            counts = self.counts.setdefault(source, {name: 0 for name in self.counters})
+            counts[counter] += value
+
+    def record_latency(self, source: str, seconds: float):
+        """Record the duration of a network operation of the source."""
+        with self._lock:
+            self.latencies.setdefault(source, []).append(seconds)
+
+    def record_download(self, host: str, size: int):
+        with self._lock:
+            self.bytes_downloaded[host] = self.bytes_downloaded.get(host, 0) + size
+
+    def record_wait(self, host: str, seconds: float):
+        """Record the time waited because of the rate limit of the host."""
+        if not seconds:
+            return
+        with self._lock:
+            self.rate_limit_wait[host] = self.rate_limit_wait.get(host, 0.0) + seconds
+
+    def reset(self):
+        with self._lock:
+            self.counts = {}
+            self.latencies = {}
+            self.bytes_downloaded = {}
+            self.rate_limit_wait = {}
+
+    def as_dict(self) -> RunStatsDict:
+        with self._lock:
+            sources = sorted(set(self.counts) | set(self.latencies))
+            return {
+                "sources": {
+                    source: {
+                        **self.counts.get(source, {name: 0 for name in self.counters}),
+                        "latency": {
+                            f"p{percent}": percentile(
+                                self.latencies.get(source, []), percent
+                            )
+                            for percent in LATENCY_PERCENTILES
+                        },
+                    }
+                    for source in sources
+                },
+                "bytes_downloaded": dict(self.bytes_downloaded),
+                "rate_limit_wait": dict(self.rate_limit_wait),
+            }
+
+    def print(self, console: Console):
+        """Print the run stats as tables."""
+        data = self.as_dict()
+        table = Table(title="Sources")
+        table.add_column("Source")
+        for label in self.counters.values():
+            table.add_column(label, justify="right")
+        for percent in LATENCY_PERCENTILES:
+            table.add_column(f"p{percent}", justify="right")
+        for source, source_stats in data["sources"].items():
+            table.add_row(
+                source,
+                *[str(source_stats[counter]) for counter in self.counters],
+                *[f"{value:.2f}s" for value in source_stats["latency"].values()],
+            )
+        console.print(table)
+        table = Table(title="Hosts")
+        table.add_column("Host")
+        table.add_column("Bytes", justify="right")
+        table.add_column("Rate limit wait", justify="right")
+        hosts = sorted(set(data["bytes_downloaded"]) | set(data["rate_limit_wait"]))
+        for host in hosts:
+            table.add_row(
+                host,
+                str(data["bytes_downloaded"].get(host, 0)),
+                f"{data['rate_limit_wait'].get(host, 0.0):.2f}s",
+            )
+        console.print(table)
+
+
+run_stats = RunStats()
@@ -0,0 +1,75 @@
+"""Benchmark the parser of the sourcerank page against the previous BeautifulSoup
+parser, using the recorded page of the tests. The recorded page only has the
+breakdown list, so it is padded with markup before and after the list to reach
+the size of a real libraries.io page (about 80 KB).
+
+BeautifulSoup is only required by this benchmark::
+
+    $ pip install beautifulsoup4
+    $ python -m tests.benchmark_sourcerank --number 50
+"""
+import argparse
+import timeit
+from typing import Dict, Union
+
+from pip_rating.sources.sourcerank import BREAKDOWN_MAPPING, parse_breakdown
+from tests.sources.test_sourcerank import SOURCERANK_PAGE
+
+PAGE_SIZE = 80 * 1024
+HEADER_ITEM = '<div class="row"><a class="nav-link" href="/pypi">Packages</a></div>\n'
+FOOTER_ITEM = '<div class="row"><p class="text-muted">Dependent project</p></div>\n'
+
+
+def get_page(size: int = PAGE_SIZE) -> str:
+    """Get the recorded page padded to the given size. A quarter of the padding
+    goes before the breakdown, like the navigation of the real page, and the rest
+    goes after it.
+    """
+    padding = max(size - len(SOURCERANK_PAGE), 0)
+    start = SOURCERANK_PAGE.index('<ul class="list-group">')
+    header = HEADER_ITEM * (padding // 4 // len(HEADER_ITEM))
+    footer = FOOTER_ITEM * (padding * 3 // 4 // len(FOOTER_ITEM))
+    return (
+        SOURCERANK_PAGE[:start]
+        + header
+        + SOURCERANK_PAGE[start:].replace("</ul>", "</ul>\n" + footer, 1)
+    )
+
+
+def parse_breakdown_bs4(content: Union[str, bytes]) -> Dict[str, int]:
+    """The parser used before the streaming parser."""
+    from bs4 import BeautifulSoup
+
+    breakdown = {}
+    soup = BeautifulSoup(content, "html.parser")
+    for item in soup.find_all("li", "list-group-item"):
+        stripped_strings = list(item.stripped_strings)
+        if stripped_strings[1] in BREAKDOWN_MAPPING:
+            breakdown[BREAKDOWN_MAPPING[stripped_strings[1]]] = int(stripped_strings[0])
+    return breakdown
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20, help="Runs per parser.")
+    parser.add_argument("--size", type=int, default=PAGE_SIZE, help="Page bytes.")
+    args = parser.parse_args()
+    page = get_page(args.size).encode()
+    parsers = {"streaming": parse_breakdown}
+    try:
+        import bs4  # noqa: F401
+    except ImportError:
+        print("beautifulsoup4 is not installed, the previous parser is skipped.")
+    else:
+        parsers["beautifulsoup"] = parse_breakdown_bs4
+    expected = parse_breakdown(page)
+    print(f"Page size: {len(page)} bytes, {args.number} runs per parser.")
+    for name, function in parsers.items():
+        if function(page) != expected:
+            raise SystemExit(f"The {name} parser returns a different breakdown.")
+        seconds = timeit.timeit(lambda: function(page), number=args.number)
+        print(f"{name}: {seconds / args.number * 1000:.2f} ms per page")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,40 @@ from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 from pip_rating.req_files import ReqFileBase
+from pip_rating.req_files.base import (
+    LockedPackage,
+    get_pinned_version,
+    get_locked_requirements,
+)
+
+
+class TestLockedRequirements(unittest.TestCase):
+    """Test the locked requirements functions."""
+
+    def test_get_pinned_version(self):
+        """Test the get_pinned_version function."""
+        self.assertEqual("1.0.0", get_pinned_version("package==1.0.0"))
+        self.assertEqual("1.0.0", get_pinned_version("package[extra]===1.0.0"))
+        for requirement in [
+            "package",
+            "package>=1.0.0",
+            "package==1.*",
+            "package>=1.0,==1.0.0",
+            "package @ https://example.com/package.zip",
+            "invalid requirement",
+        ]:
+            with self.subTest(requirement):
+                self.assertIsNone(get_pinned_version(requirement))
+
+    def test_get_locked_requirements(self):
+        """Test the get_locked_requirements function."""
+        self.assertEqual(
+            {"package-name": LockedPackage("Package_Name", "1.0.0")},
+            get_locked_requirements(
+                ["Package_Name==1.0.0", 'other==1.0.0 ; python_version < "3"']
+            ),
+        )
+        self.assertIsNone(get_locked_requirements(["package==1.0.0", "other"]))
 
 
 class TestReqFileBase(unittest.TestCase):
@@ -0,0 +1,138 @@
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch, MagicMock
+
+from pip_rating.exceptions import RequirementsRatingInvalidEnvironment
+from pip_rating.req_files.base import LockedPackage
+from pip_rating.req_files.environment import (
+    EnvironmentReqFile,
+    get_interpreter_environment,
+)
+
+
+DISTRIBUTIONS = {
+    "Django": (
+        "4.2.3",
+        [
+            "asgiref (<4,>=3.6.0)",
+            "sqlparse>=0.3.1",
+            "tzdata ; sys_platform == 'win32'",
+            "argon2-cffi>=19.1.0 ; extra == 'argon2'",
+        ],
+    ),
+    "asgiref": ("3.7.2", []),
+    "sqlparse": ("0.4.4", []),
+    "tzdata": ("2023.3", []),
+    "pip": ("23.2", []),
+}
+
+
+class TestEnvironmentReqFile(unittest.TestCase):
+    """Test EnvironmentReqFile class."""
+
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        for name, (version, requires) in DISTRIBUTIONS.items():
+            directory = Path(self.temp_dir.name) / f"{name}-{version}.dist-info"
+            directory.mkdir()
+            (directory / "METADATA").write_text(
+                f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+                + "".join(f"Requires-Dist: {require}\n" for require in requires)
+            )
+        self.environment = {"sys_platform": "linux"}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_init(self):
+        """Test the __init__ method in the EnvironmentReqFile class."""
+        with self.subTest("Test with paths"):
+            missing = str(Path(self.temp_dir.name) / "missing.zip")
+            req = EnvironmentReqFile([missing, self.temp_dir.name], self.environment)
+            self.assertEqual(["Django==4.2.3", "tzdata==2023.3"], sorted(req))
+            self.assertEqual(Path(self.temp_dir.name), req.path)
+            self.assertEqual(self.temp_dir.name, str(req))
+        with self.subTest("Test with current interpreter"), patch(
+            "pip_rating.req_files.environment.metadata.distributions",
+            return_value=[],
+        ):
+            req = EnvironmentReqFile()
+            self.assertEqual([], list(req))
+            self.assertEqual(Path(sys.prefix), req.path)
+        with self.subTest("Test with missing paths"), self.assertRaises(
+            RequirementsRatingInvalidEnvironment
+        ):
+            EnvironmentReqFile([str(Path(self.temp_dir.name) / "missing")])
+
+    @patch("pip_rating.req_files.environment.get_interpreter_environment")
+    def test_from_interpreter(self, mock_get_interpreter_environment: MagicMock):
+        """Test the from_interpreter method in the EnvironmentReqFile class."""
+        mock_get_interpreter_environment.return_value = (
+            [self.temp_dir.name],
+            {"sys_platform": "win32"},
+        )
+        req = EnvironmentReqFile.from_interpreter("python")
+        mock_get_interpreter_environment.assert_called_once_with("python")
+        self.assertEqual(["Django==4.2.3"], list(req))
+
+    def test_find_in_directory(self):
+        """Test the find_in_directory method in the EnvironmentReqFile class."""
+        self.assertIsNone(EnvironmentReqFile.find_in_directory("directory"))
+
+    def test_is_valid(self):
+        """Test the is_valid method in the EnvironmentReqFile class."""
+        self.assertFalse(EnvironmentReqFile.is_valid("path"))
+
+    def test_get_locked_packages(self):
+        """Test the get_locked_packages method in the EnvironmentReqFile class."""
+        req = EnvironmentReqFile([self.temp_dir.name], self.environment)
+        locked_packages = req.get_locked_packages()
+        self.assertEqual(
+            LockedPackage("Django", "4.2.3", ["asgiref", "sqlparse"]),
+            locked_packages["django"],
+        )
+        self.assertEqual(
+            LockedPackage("tzdata", "2023.3", []), locked_packages["tzdata"]
+        )
+
+    def test_get_dependencies(self):
+        """Test the get_dependencies method in the EnvironmentReqFile class."""
+        req = EnvironmentReqFile([self.temp_dir.name], self.environment)
+        with self.subTest("Test dependency cycle"), patch.object(
+            EnvironmentReqFile, "get_locked_packages"
+        ) as mock_get_locked_packages:
+            mock_get_locked_packages.return_value = {
+                "django": LockedPackage("Django", "4.2.3", ["asgiref"]),
+                "asgiref": LockedPackage("asgiref", "3.7.2", []),
+                "foo": LockedPackage("foo", "1.0", ["bar"]),
+                "bar": LockedPackage("bar", "2.0", ["foo"]),
+                "baz": LockedPackage("baz", "3.0", ["foo"]),
+            }
+            self.assertEqual(["Django==4.2.3", "baz==3.0"], req.get_dependencies())
+            del mock_get_locked_packages.return_value["baz"]
+            self.assertEqual(["Django==4.2.3", "foo==1.0"], req.get_dependencies())
+
+
+class TestGetInterpreterEnvironment(unittest.TestCase):
+    """Test the get_interpreter_environment function."""
+
+    @patch("pip_rating.req_files.environment.subprocess.run")
+    def test_get_interpreter_environment(self, mock_run: MagicMock):
+        """Test the get_interpreter_environment function."""
+        with self.subTest("Test valid interpreter"):
+            mock_run.return_value.stdout = json.dumps(
+                {"path": ["", "/site-packages"], "environment": {"os_name": "posix"}}
+            )
+            self.assertEqual(
+                (["/site-packages"], {"os_name": "posix"}),
+                get_interpreter_environment("python"),
+            )
+        with self.subTest("Test invalid interpreter"), self.assertRaises(
+            RequirementsRatingInvalidEnvironment
+        ):
+            mock_run.side_effect = subprocess.CalledProcessError(1, "python")
+            get_interpreter_environment("python")
@@ -1,4 +1,5 @@
 import unittest
+from tempfile import TemporaryDirectory
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -7,6 +8,8 @@ from pip_rating.exceptions import (
     RequirementsRatingMissingReqFile,
 )
 from pip_rating.req_files import get_req_file_cls, find_in_directory
+from pip_rating.req_files.poetry_lock import PoetryLockReqFile
+from pip_rating.req_files.pyproject import PyprojectReqFile
 
 
 class TestGetReqFileCls(unittest.TestCase):
@@ -59,3 +62,17 @@ class TestFindIndirectory(unittest.TestCase):
                 mock_requirements_req_file.find_in_directory.return_value,
                 find_in_directory("directory"),
             )
+        with self.subTest(
+            "Test lock file before project file"
+        ), TemporaryDirectory() as tmp:
+            Path(tmp, "pyproject.toml").write_text("[tool.poetry]\n")
+            Path(tmp, "poetry.lock").write_text(
+                '[[package]]\nname = "django"\nversion = "4.2.3"\n'
+            )
+            self.assertIsInstance(find_in_directory(tmp), PoetryLockReqFile)
+        with self.subTest("Test empty file"), TemporaryDirectory() as tmp:
+            Path(tmp, "requirements.txt").write_text("# No requirements\n")
+            Path(tmp, "pyproject.toml").write_text(
+                '[project]\ndependencies = ["django"]\n'
+            )
+            self.assertIsInstance(find_in_directory(tmp), PyprojectReqFile)
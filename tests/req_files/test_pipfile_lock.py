@@ -0,0 +1,64 @@
+import json
+import unittest
+from unittest.mock import patch, MagicMock, mock_open
+
+from pip_rating.req_files import PipfileLockReqFile
+from pip_rating.req_files.base import LockedPackage
+
+
+PIPFILE_LOCK_FILE = json.dumps(
+    {
+        "_meta": {},
+        "default": {
+            "django": {"hashes": [], "version": "==4.2.3"},
+            "tzdata": {"version": "==2023.3", "markers": "sys_platform == 'win32'"},
+        },
+        "develop": {"pytest": {"version": "==7.4.0"}},
+    }
+)
+
+
+class TestPipfileLockReqFile(unittest.TestCase):
+    """Test PipfileLockReqFile class."""
+
+    @patch("pip_rating.req_files.pipfile_lock.PipfileLockReqFile.__init__")
+    @patch("pip_rating.req_files.pipfile_lock.Path")
+    def test_find_in_directory(self, mock_path: MagicMock, mock_init: MagicMock):
+        """Test the find_in_directory method in the PipfileLockReqFile class."""
+        mock_init.return_value = None
+        req = PipfileLockReqFile.find_in_directory("directory")
+        self.assertIsInstance(req, PipfileLockReqFile)
+        mock_path.return_value.__truediv__.assert_called_once_with("Pipfile.lock")
+        mock_init.assert_called_once_with(
+            mock_path.return_value.__truediv__.return_value
+        )
+
+    @patch("pip_rating.req_files.pipfile_lock.Path")
+    def test_is_valid(self, mock_path: MagicMock):
+        """Test the is_valid method in the PipfileLockReqFile class."""
+        mock_path.return_value.exists.return_value = True
+        mock_path.return_value.name = "Pipfile.lock"
+        self.assertTrue(PipfileLockReqFile.is_valid("path"))
+        mock_path.return_value.exists.assert_called_once_with()
+
+    @patch("builtins.open", mock_open(read_data=PIPFILE_LOCK_FILE))
+    @patch("pip_rating.req_files.pipfile_lock.PipfileLockReqFile.__init__")
+    def test_get_dependencies(self, mock_init: MagicMock):
+        """Test the get_dependencies method in the PipfileLockReqFile class."""
+        mock_init.return_value = None
+        req = PipfileLockReqFile("Pipfile.lock")
+        req.path = "Pipfile.lock"
+        self.assertEqual(
+            ["django==4.2.3", "tzdata==2023.3 ; sys_platform == 'win32'"],
+            req.get_dependencies(),
+        )
+
+    @patch("pip_rating.req_files.pipfile_lock.PipfileLockReqFile.__init__")
+    def test_get_locked_packages(self, mock_init: MagicMock):
+        """Test the get_locked_packages method in the PipfileLockReqFile class."""
+        mock_init.return_value = None
+        req = PipfileLockReqFile("Pipfile.lock")
+        req.extend(["django==4.2.3", "tzdata==2023.3 ; sys_platform == 'nonexistent'"])
+        self.assertEqual(
+            {"django": LockedPackage("django", "4.2.3")}, req.get_locked_packages()
+        )
@@ -0,0 +1,208 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch, MagicMock, mock_open
+
+from pip_rating.req_files import PoetryLockReqFile
+from pip_rating.req_files.base import LockedPackage
+from pip_rating.req_files.poetry_lock import (
+    get_main_requirements,
+    get_required_packages,
+    is_main_package,
+    is_required,
+)
+
+
+POETRY_LOCK_FILE = b"""
+[[package]]
+name = "Django"
+version = "4.2.3"
+
+[package.dependencies]
+asgiref = ">=3.6.0,<4"
+sqlparse = ">=0.3.1"
+tzdata = {version = "*", markers = "sys_platform == 'nonexistent'"}
+argon2-cffi = {version = ">=19.1.0", optional = true}
+
+[[package]]
+name = "asgiref"
+version = "3.7.2"
+
+[[package]]
+name = "sqlparse"
+version = "0.4.4"
+
+[[package]]
+name = "tzdata"
+version = "2023.3"
+
+[[package]]
+name = "pytest"
+version = "7.4.0"
+category = "dev"
+
+[[package]]
+name = "coverage"
+version = "7.3.0"
+groups = ["dev"]
+"""
+
+# Poetry 1.5 to 1.8 do not record the groups nor the category of the packages
+POETRY_1_5_LOCK_FILE = """
+[[package]]
+name = "Django"
+version = "4.2.3"
+
+[package.dependencies]
+asgiref = ">=3.6.0,<4"
+
+[[package]]
+name = "asgiref"
+version = "3.7.2"
+
+[[package]]
+name = "pytest"
+version = "7.4.0"
+
+[package.dependencies]
+iniconfig = "*"
+
+[[package]]
+name = "iniconfig"
+version = "2.0.0"
+"""
+PYPROJECT_FILE = """
+[tool.poetry.dependencies]
+python = "^3.8"
+django = "^4.2"
+
+[tool.poetry.group.dev.dependencies]
+pytest = "^7.4"
+"""
+
+
+class TestIsRequired(unittest.TestCase):
+    """Test the is_required function."""
+
+    def test_is_required(self):
+        """Test the is_required function."""
+        self.assertTrue(is_required(">=1.0"))
+        self.assertTrue(is_required({"version": ">=1.0"}))
+        self.assertFalse(is_required({"markers": "sys_platform == 'nonexistent'"}))
+        self.assertTrue(
+            is_required([{"markers": "sys_platform == 'nonexistent'"}, ">=1.0"])
+        )
+
+
+class TestIsMainPackage(unittest.TestCase):
+    """Test the is_main_package function."""
+
+    def test_is_main_package(self):
+        """Test the is_main_package function."""
+        with self.subTest("Test groups"):
+            self.assertTrue(is_main_package({"groups": ["main", "dev"]}))
+            self.assertFalse(is_main_package({"groups": ["dev"]}))
+        with self.subTest("Test category"):
+            self.assertTrue(is_main_package({"category": "main"}))
+            self.assertFalse(is_main_package({"category": "dev"}))
+        with self.subTest("Test without groups nor category"):
+            self.assertTrue(is_main_package({}))
+
+
+class TestGetMainRequirements(unittest.TestCase):
+    """Test the get_main_requirements function."""
+
+    def test_get_main_requirements(self):
+        """Test the get_main_requirements function."""
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "pyproject.toml"
+            with self.subTest("Test missing file"):
+                self.assertIsNone(get_main_requirements(path))
+            with self.subTest("Test poetry dependencies"):
+                path.write_text(PYPROJECT_FILE)
+                self.assertEqual({"django"}, get_main_requirements(path))
+            with self.subTest("Test project dependencies"):
+                path.write_text('[project]\ndependencies = ["Flask>=2", "invalid["]\n')
+                self.assertEqual({"flask"}, get_main_requirements(path))
+            with self.subTest("Test without dependencies"):
+                path.write_text("[tool.poetry.dependencies]\npython = '^3.8'\n")
+                self.assertIsNone(get_main_requirements(path))
+
+
+class TestGetRequiredPackages(unittest.TestCase):
+    """Test the get_required_packages function."""
+
+    def test_get_required_packages(self):
+        """Test the get_required_packages function."""
+        packages = [
+            {"name": "Django", "dependencies": {"asgiref": "*", "missing": "*"}},
+            {"name": "asgiref"},
+            {"name": "pytest"},
+        ]
+        self.assertEqual(packages[:2], get_required_packages(packages, {"django"}))
+
+
+class TestPoetryLockReqFile(unittest.TestCase):
+    """Test PoetryLockReqFile class."""
+
+    @patch("pip_rating.req_files.poetry_lock.PoetryLockReqFile.__init__")
+    @patch("pip_rating.req_files.poetry_lock.Path")
+    def test_find_in_directory(self, mock_path: MagicMock, mock_init: MagicMock):
+        """Test the find_in_directory method in the PoetryLockReqFile class."""
+        mock_init.return_value = None
+        req = PoetryLockReqFile.find_in_directory("directory")
+        self.assertIsInstance(req, PoetryLockReqFile)
+        mock_path.return_value.__truediv__.assert_called_once_with("poetry.lock")
+        mock_init.assert_called_once_with(
+            mock_path.return_value.__truediv__.return_value
+        )
+
+    @patch("pip_rating.req_files.poetry_lock.Path")
+    def test_is_valid(self, mock_path: MagicMock):
+        """Test the is_valid method in the PoetryLockReqFile class."""
+        mock_path.return_value.exists.return_value = True
+        mock_path.return_value.name = "poetry.lock"
+        self.assertTrue(PoetryLockReqFile.is_valid("path"))
+        mock_path.return_value.exists.assert_called_once_with()
+
+    @patch("builtins.open", mock_open(read_data=POETRY_LOCK_FILE))
+    @patch("pip_rating.req_files.poetry_lock.PoetryLockReqFile.__init__")
+    def test_get_locked_packages(self, mock_init: MagicMock):
+        """Test the get_locked_packages method in the PoetryLockReqFile class."""
+        mock_init.return_value = None
+        req = PoetryLockReqFile("poetry.lock")
+        req.path = "poetry.lock"
+        self.assertEqual(
+            {
+                "django": LockedPackage("Django", "4.2.3", ["asgiref", "sqlparse"]),
+                "asgiref": LockedPackage("asgiref", "3.7.2", []),
+                "sqlparse": LockedPackage("sqlparse", "0.4.4", []),
+                "tzdata": LockedPackage("tzdata", "2023.3", []),
+            },
+            req.get_locked_packages(),
+        )
+
+    @patch("builtins.open", mock_open(read_data=POETRY_LOCK_FILE))
+    @patch("pip_rating.req_files.poetry_lock.PoetryLockReqFile.__init__")
+    def test_get_dependencies(self, mock_init: MagicMock):
+        """Test the get_dependencies method in the PoetryLockReqFile class."""
+        mock_init.return_value = None
+        req = PoetryLockReqFile("poetry.lock")
+        req.path = "poetry.lock"
+        self.assertEqual(["Django==4.2.3", "tzdata==2023.3"], req.get_dependencies())
+
+    def test_get_packages(self):
+        """Test the get_packages method with a lock file of Poetry 1.5 to 1.8."""
+        with TemporaryDirectory() as directory:
+            Path(directory, "poetry.lock").write_text(POETRY_1_5_LOCK_FILE)
+            with self.subTest("Test without pyproject.toml"):
+                req = PoetryLockReqFile(Path(directory, "poetry.lock"))
+                self.assertEqual(4, len(req.get_packages()))
+            with self.subTest("Test with pyproject.toml"):
+                Path(directory, "pyproject.toml").write_text(PYPROJECT_FILE)
+                req = PoetryLockReqFile(Path(directory, "poetry.lock"))
+                self.assertEqual(
+                    ["Django", "asgiref"],
+                    [package["name"] for package in req.get_packages()],
+                )
+                self.assertEqual(["Django==4.2.3"], list(req))
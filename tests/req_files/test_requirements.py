@@ -3,6 +3,7 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch, mock_open
 
 from pip_rating.req_files import RequirementsReqFile
+from pip_rating.req_files.base import LockedPackage
 
 
 REQUIREMENTS_FILE = """
@@ -10,6 +11,20 @@ REQUIREMENTS_FILE = """
 package==1.0.0
 other  # Comment
 """
+PIP_COMPILE_FILE = """
+#
+# This file is autogenerated by pip-compile with Python 3.9
+#
+asgiref==3.7.2
+    # via django
+django==4.2.3 \\
+    --hash=sha256:1234
+    # via -r requirements.in
+sqlparse==0.4.4
+    # via
+    #   -r requirements.in
+    #   django
+"""
 
 
 class TestRequirementsReqFile(unittest.TestCase):
@@ -101,3 +116,54 @@ class TestRequirementsReqFile(unittest.TestCase):
             ["package==1.0.0", "other"],
             req.get_dependencies(),
         )
+
+    @patch("pip_rating.req_files.requirements.RequirementsReqFile.__init__")
+    def test_get_locked_packages(self, mock_init: MagicMock):
+        """Test the get_locked_packages method in the RequirementsReqFile class."""
+        mock_init.return_value = None
+        req = RequirementsReqFile("requirements.txt")
+        req.path = "requirements.txt"
+        with self.subTest("Test pip-compile output"), patch(
+            "builtins.open", mock_open(read_data=PIP_COMPILE_FILE)
+        ):
+            self.assertEqual(
+                {
+                    "asgiref": LockedPackage("asgiref", "3.7.2", []),
+                    "django": LockedPackage("django", "4.2.3", ["asgiref", "sqlparse"]),
+                    "sqlparse": LockedPackage("sqlparse", "0.4.4", []),
+                },
+                req.get_locked_packages(),
+            )
+        with self.subTest("Test pinned without via comments"), patch(
+            "builtins.open", mock_open(read_data="package[extra]==1.0.0\n")
+        ):
+            self.assertEqual(
+                {
+                    "package": LockedPackage(
+                        "package", "1.0.0", None, frozenset(["extra"])
+                    )
+                },
+                req.get_locked_packages(),
+            )
+        with self.subTest("Test not pinned"), patch(
+            "builtins.open", mock_open(read_data=REQUIREMENTS_FILE)
+        ):
+            self.assertIsNone(req.get_locked_packages())
+        with self.subTest("Test other requirements file"), patch(
+            "builtins.open", mock_open(read_data="package==1.0.0\n-r other.txt\n")
+        ):
+            self.assertIsNone(req.get_locked_packages())
+
+    @patch("builtins.open", mock_open(read_data=PIP_COMPILE_FILE))
+    @patch("pip_rating.req_files.requirements.RequirementsReqFile.__init__")
+    def test_get_dependencies_hashes(self, mock_init: MagicMock):
+        """Test the get_dependencies method with hashes in the RequirementsReqFile
+        class.
+        """
+        mock_init.return_value = None
+        req = RequirementsReqFile("requirements.txt")
+        req.path = "requirements.txt"
+        self.assertEqual(
+            ["asgiref==3.7.2", "django==4.2.3", "sqlparse==0.4.4"],
+            req.get_dependencies(),
+        )
@@ -1,5 +1,4 @@
 import unittest
-from pathlib import Path
 from typing import cast
 from unittest.mock import Mock, patch, MagicMock, PropertyMock
 
@@ -7,7 +6,41 @@ from packaging.version import Version
 from pip_audit._service import VulnerabilityResult
 from pip_audit._service.interface import VulnerabilityID
 
-from pip_rating.sources.audit import vulns_to_dict, Audit
+from pip_rating.cache import CachePolicy
+from pip_rating.sources.audit import (
+    vulns_to_dict,
+    Audit,
+    AuditBatch,
+    osv_vuln_to_dict,
+    sort_versions,
+    OSV_QUERYBATCH_URL,
+)
+
+OSV_VULNERABILITY = {
+    "id": "GHSA-1234",
+    "summary": "Summary\nof the vulnerability",
+    "aliases": ["CVE-1234"],
+    "published": "2023-05-22T20:15:09Z",
+    "affected": [
+        {
+            "package": {"name": "Package_Name", "ecosystem": "PyPI"},
+            "ranges": [
+                {
+                    "type": "ECOSYSTEM",
+                    "events": [{"introduced": "0"}, {"fixed": "1.10.0"}],
+                },
+                {
+                    "type": "ECOSYSTEM",
+                    "events": [{"introduced": "0"}, {"fixed": "1.9.1"}],
+                },
+            ],
+        },
+        {
+            "package": {"name": "other", "ecosystem": "PyPI"},
+            "ranges": [{"type": "ECOSYSTEM", "events": [{"fixed": "3.0.0"}]}],
+        },
+    ],
+}
 
 
 class TestVulnsToDict(unittest.TestCase):
@@ -32,6 +65,72 @@ class TestVulnsToDict(unittest.TestCase):
         self.assertEqual(vulnerabilities, vulns_to_dict([mock_vulnerability]))
 
 
+class TestSortVersions(unittest.TestCase):
+    """Test the sort_versions function."""
+
+    def test_sort_versions(self):
+        """Test the sort_versions function."""
+        self.assertEqual(
+            ["1.9.1", "1.10.0", "abc", "release-2"],
+            sort_versions(["release-2", "1.10.0", "abc", "1.9.1", "1.10.0"]),
+        )
+
+
+class TestOsvVulnToDict(unittest.TestCase):
+    """Test the osv_vuln_to_dict function."""
+
+    def test_osv_vuln_to_dict(self):
+        """Test the osv_vuln_to_dict function."""
+        with self.subTest("Test vulnerability"):
+            self.assertEqual(
+                {
+                    "id": "GHSA-1234",
+                    "description": "Summary of the vulnerability",
+                    "fix_versions": ["1.9.1", "1.10.0"],
+                    "aliases": ["CVE-1234"],
+                    "published_iso_dt": "2023-05-22T20:15:09+00:00",
+                },
+                osv_vuln_to_dict(OSV_VULNERABILITY, "package-name"),
+            )
+        with self.subTest("Test withdrawn vulnerability"):
+            self.assertIsNone(
+                osv_vuln_to_dict(
+                    dict(OSV_VULNERABILITY, withdrawn="2023-05-23T00:00:00Z"),
+                    "package-name",
+                )
+            )
+        with self.subTest("Test vulnerability without optional fields"):
+            self.assertEqual(
+                {
+                    "id": "GHSA-1234",
+                    "description": "N/A",
+                    "fix_versions": [],
+                    "aliases": [],
+                    "published_iso_dt": None,
+                },
+                osv_vuln_to_dict({"id": "GHSA-1234"}, "package-name"),
+            )
+        with self.subTest("Test invalid fixed version"):
+            vulnerability = {
+                "id": "GHSA-1234",
+                "affected": [
+                    {
+                        "package": {"name": "package-name", "ecosystem": "PyPI"},
+                        "ranges": [
+                            {
+                                "type": "ECOSYSTEM",
+                                "events": [{"fixed": "2.0"}, {"fixed": "invalid"}],
+                            }
+                        ],
+                    }
+                ],
+            }
+            self.assertEqual(
+                ["2.0", "invalid"],
+                osv_vuln_to_dict(vulnerability, "package-name")["fix_versions"],
+            )
+
+
 class TestAudit(unittest.TestCase):
     """Test the Audit class."""
 
@@ -44,24 +143,14 @@ class TestAudit(unittest.TestCase):
         mock_init.assert_called_once_with(package_name)
         self.assertEqual(version, audit.version)
 
-    @patch("pip_rating.sources.audit.Audit.cache_dir", new_callable=PropertyMock)
-    def test_cache_file(self, mock_cache_dir: MagicMock):
-        """Test the cache_file property."""
-        package_name = "package_name"
-        mock_cache_dir.return_value = Path("cache_dir")
-        audit = Audit(package_name, "version")
-        self.assertEqual(
-            f"cache_dir/{package_name}_c692273deb2772da307ffe37041fef77bf4baa97.json",
-            str(audit.cache_file),
-        )
+    def test_cache_key(self):
+        """Test the cache_key property."""
+        audit = Audit("Package_Name", "1.0.0")
+        self.assertEqual(("audit", "package-name", "1.0.0"), audit.cache_key)
 
     @patch("pip_rating.sources.audit.Audit.is_cache_expired", new_callable=PropertyMock)
-    @patch("pip_rating.sources.audit.Audit.__init__")
-    def test_vulnerabilities(
-        self, mock_init: MagicMock, mock_is_cache_expired: MagicMock
-    ):
+    def test_vulnerabilities(self, mock_is_cache_expired: MagicMock):
         """Test the vulnerabilities' property."""
-        mock_init.return_value = None
         with self.subTest("Test is_cache_expired is False"), patch(
             "pip_rating.sources.audit.Audit.get_from_cache"
         ) as mock_get_from_cache:
@@ -70,10 +159,10 @@ class TestAudit(unittest.TestCase):
             audit = Audit("package_name", "version")
             self.assertEqual("vulnerabilities", audit.vulnerabilities)
         with self.subTest("Test is_cache_expired is True"), patch(
-            "pip_rating.sources.audit.Audit.save_to_cache"
-        ) as mock_save_to_cache:
+            "pip_rating.sources.audit.Audit.refresh_cache_once"
+        ) as mock_refresh_cache:
             mock_is_cache_expired.return_value = True
-            mock_save_to_cache.return_value = {"vulnerabilities": "vulnerabilities"}
+            mock_refresh_cache.return_value = {"vulnerabilities": "vulnerabilities"}
             audit = Audit("package_name", "version")
             self.assertEqual("vulnerabilities", audit.vulnerabilities)
 
@@ -140,3 +229,105 @@ class TestAudit(unittest.TestCase):
             },
             audit.get_cache_data(),
         )
+
+
+class TestAuditBatch(unittest.TestCase):
+    """Test the AuditBatch class."""
+
+    def test_query_batch(self):
+        """Test the query_batch method."""
+        mock_pool = MagicMock()
+        mock_response = mock_pool.post.return_value.__enter__.return_value
+        mock_response.json.side_effect = [
+            {
+                "results": [
+                    {"vulns": [{"id": "id1"}], "next_page_token": "token"},
+                    {},
+                ]
+            },
+            {"results": [{"vulns": [{"id": "id2"}]}]},
+        ]
+        audits = [Audit("Package_Name", "1.0.0"), Audit("other", "2.0.0")]
+        self.assertEqual(
+            [["id1", "id2"], []], AuditBatch(audits, mock_pool).query_batch(audits)
+        )
+        self.assertEqual(2, mock_pool.post.call_count)
+        mock_pool.post.assert_called_with(
+            OSV_QUERYBATCH_URL,
+            json={
+                "queries": [
+                    {
+                        "package": {"name": "package-name", "ecosystem": "PyPI"},
+                        "version": "1.0.0",
+                        "page_token": "token",
+                    }
+                ]
+            },
+        )
+
+    def test_get_vulnerability(self):
+        """Test the get_vulnerability method."""
+        mock_pool = MagicMock()
+        mock_response = mock_pool.get.return_value.__enter__.return_value
+        audit_batch = AuditBatch([], mock_pool)
+        self.assertEqual(
+            mock_response.json.return_value, audit_batch.get_vulnerability("id")
+        )
+        self.assertEqual(
+            mock_response.json.return_value, audit_batch.get_vulnerability("id")
+        )
+        mock_pool.get.assert_called_once_with("https://api.osv.dev/v1/vulns/id")
+
+    @patch("pip_rating.sources.audit.AuditBatch.get_vulnerability")
+    def test_fetch_vulnerabilities(self, mock_get_vulnerability: MagicMock):
+        """Test the fetch_vulnerabilities method."""
+        audit_batch = AuditBatch([])
+        audit_batch.vulnerabilities["id1"] = {}
+        audit_batch.fetch_vulnerabilities(["id1", "id2", "id3", "id2"])
+        self.assertEqual(
+            ["id2", "id3"],
+            sorted(call.args[0] for call in mock_get_vulnerability.mock_calls),
+        )
+
+    @patch("pip_rating.sources.audit.OSV_BATCH_SIZE", new=2)
+    def test_get_chunks(self):
+        """Test the get_chunks method."""
+        audits = [Mock(is_cache_expired=True) for _ in range(3)]
+        audits.insert(1, Mock(is_cache_expired=False))
+        self.assertEqual(
+            [[audits[0], audits[2]], [audits[3]]],
+            list(AuditBatch(audits).get_chunks()),
+        )
+        with self.subTest("Test offline"), patch(
+            "pip_rating.sources.audit.get_cache_policy",
+            return_value=CachePolicy(offline=True),
+        ):
+            self.assertEqual([], list(AuditBatch(audits).get_chunks()))
+
+    @patch("pip_rating.sources.audit.run_stats")
+    @patch("pip_rating.sources.audit.AuditBatch.get_vulnerability")
+    @patch("pip_rating.sources.audit.AuditBatch.query_batch")
+    @patch("pip_rating.sources.audit.AuditBatch.get_chunks")
+    def test_fetch(
+        self,
+        mock_get_chunks: MagicMock,
+        mock_query_batch: MagicMock,
+        mock_get_vulnerability: MagicMock,
+        mock_run_stats: MagicMock,
+    ):
+        """Test the fetch method."""
+        mock_audit = Mock()
+        mock_audit.package_name = "package-name"
+        mock_get_chunks.return_value = [[mock_audit]]
+        mock_query_batch.return_value = [["GHSA-1234"]]
+        mock_get_vulnerability.return_value = OSV_VULNERABILITY
+        AuditBatch([mock_audit]).fetch()
+        mock_query_batch.assert_called_once_with([mock_audit])
+        mock_audit.create_cache_data.assert_called_once_with(
+            [osv_vuln_to_dict(OSV_VULNERABILITY, "package-name")]
+        )
+        mock_audit.set_cache_data.assert_called_once_with(
+            mock_audit.create_cache_data.return_value
+        )
+        mock_run_stats.increment.assert_called_once_with("audit", "misses", 1)
+        mock_run_stats.record_latency.assert_called_once()
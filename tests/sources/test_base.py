@@ -1,7 +1,8 @@
+import datetime
 import unittest
-from pathlib import Path
-from unittest.mock import patch, MagicMock, PropertyMock, mock_open
+from unittest.mock import patch, MagicMock, PropertyMock
 
+from pip_rating.cache import CachePolicy
 from pip_rating.sources.base import SourceBase
 
 
@@ -14,48 +15,261 @@ class TestSourceBase(unittest.TestCase):
         source_base = SourceBase(package_name)
         self.assertEqual(package_name, source_base.package_name)
 
-    @patch("pip_rating.sources.base.user_cache_dir")
-    def test_cache_dir(self, mock_user_cache_dir: MagicMock):
-        """Test the cache_dir property."""
-        mock_user_cache_dir.return_value = "user_cache_dir"
-        package_name = "package_name"
-        source_base = SourceBase(package_name)
+    @patch("pip_rating.sources.base.get_cache_backend")
+    def test_cache_backend(self, mock_get_cache_backend: MagicMock):
+        """Test the cache_backend property."""
+        source_base = SourceBase("package_name")
+        self.assertEqual(mock_get_cache_backend.return_value, source_base.cache_backend)
+
+    def test_cache_key(self):
+        """Test the cache_key property."""
+        source_base = SourceBase("Package_Name")
         source_base.source_name = "source_name"
-        self.assertEqual(
-            f"{source_base.cache_dir}",
-            f"{mock_user_cache_dir.return_value}/pip-rating/{source_base.source_name}",
-        )
+        self.assertEqual(("source_name", "package-name", ""), source_base.cache_key)
 
-    @patch("pip_rating.sources.base.SourceBase.cache_dir", new_callable=PropertyMock)
-    def test_cache_file(self, mock_cache_dir: MagicMock):
-        """Test the cache_file property."""
-        mock_cache_dir.return_value = Path("cache_dir")
-        package_name = "package_name"
-        source_base = SourceBase(package_name)
+    @patch(
+        "pip_rating.sources.base.SourceBase.cache_backend", new_callable=PropertyMock
+    )
+    def test_is_cache_expired(self, mock_cache_backend: MagicMock):
+        """Test the is_cache_expired property."""
+        source_base = SourceBase("package_name")
+        source_base.source_name = "source_name"
         self.assertEqual(
-            f"{source_base.cache_file}",
-            f"{mock_cache_dir.return_value}/{package_name}.json",
+            mock_cache_backend.return_value.is_expired.return_value,
+            source_base.is_cache_expired,
+        )
+        mock_cache_backend.return_value.is_expired.assert_called_once_with(
+            "source_name", "package-name", "", SourceBase.max_cache_age
         )
 
-    @patch("pip_rating.sources.base.SourceBase.cache_file", new_callable=PropertyMock)
-    def test_is_cache_expired(self, mock_cache_file: MagicMock):
-        """Test the is_cache_expired property."""
-        with self.subTest("Test cache file does not exist"):
-            mock_cache_file.return_value.exists.return_value = False
+    @patch("pip_rating.sources.base.run_stats")
+    @patch.object(SourceBase, "source_name", "source_name", create=True)
+    @patch(
+        "pip_rating.sources.base.SourceBase.is_cache_expired", new_callable=PropertyMock
+    )
+    def test_fetch(self, mock_is_cache_expired: MagicMock, mock_run_stats: MagicMock):
+        """Test the fetch method."""
+        with self.subTest("Test cache not expired"), patch(
+            "pip_rating.sources.base.SourceBase.get_from_cache"
+        ) as mock_get_from_cache:
+            mock_is_cache_expired.return_value = False
+            mock_get_from_cache.return_value = {"key": "value"}
             source_base = SourceBase("package_name")
-            self.assertTrue(source_base.is_cache_expired)
-        with self.subTest("Test cache file exists and is expired"):
-            mock_cache_file.return_value.exists.return_value = True
-            mock_cache_file.return_value.stat.return_value.st_mtime = 0
+            self.assertEqual({"key": "value"}, source_base.fetch())
+            self.assertEqual({"key": "value"}, source_base.fetch())
+            mock_get_from_cache.assert_called_once_with()
+            mock_run_stats.increment.assert_called_once_with("source_name", "hits")
+        mock_run_stats.reset_mock()
+        with self.subTest("Test cache expired"), patch(
+            "pip_rating.sources.base.SourceBase.refresh_cache_once"
+        ) as mock_refresh_cache:
+            mock_is_cache_expired.return_value = True
+            mock_refresh_cache.return_value = {"key": "value"}
             source_base = SourceBase("package_name")
-            self.assertTrue(source_base.is_cache_expired)
+            self.assertEqual({"key": "value"}, source_base.fetch())
+            self.assertEqual({"key": "value"}, source_base.fetch())
+            mock_refresh_cache.assert_called_once_with()
+        with self.subTest("Test offline"), patch(
+            "pip_rating.sources.base.get_cache_policy",
+            return_value=CachePolicy(offline=True),
+        ), patch(
+            "pip_rating.sources.base.SourceBase.get_from_cache",
+            return_value={"key": "cached"},
+        ), patch(
+            "pip_rating.sources.base.SourceBase.refresh_cache"
+        ) as mock_refresh_cache:
+            source_base = SourceBase("package_name")
+            self.assertEqual({"key": "cached"}, source_base.fetch())
+            self.assertFalse(source_base.is_missing)
+            mock_refresh_cache.assert_not_called()
+        with self.subTest("Test offline missing data"), patch(
+            "pip_rating.sources.base.get_cache_policy",
+            return_value=CachePolicy(offline=True),
+        ), patch(
+            "pip_rating.sources.base.SourceBase.get_from_cache", return_value=None
+        ), patch(
+            "pip_rating.sources.base.SourceBase.get_missing_data"
+        ) as mock_get_missing_data:
+            source_base = SourceBase("package_name")
+            self.assertEqual(mock_get_missing_data.return_value, source_base.fetch())
+            self.assertTrue(source_base.is_missing)
+            mock_run_stats.increment.assert_called_with("source_name", "unavailable")
+        with self.subTest("Test cache stale"), patch(
+            "pip_rating.sources.base.SourceBase.is_cache_stale",
+            new_callable=PropertyMock,
+            return_value=True,
+        ), patch(
+            "pip_rating.sources.base.SourceBase.get_from_cache",
+            return_value={"key": "stale"},
+        ), patch(
+            "pip_rating.sources.base.background_refresher"
+        ) as mock_background_refresher:
+            source_base = SourceBase("package_name")
+            source_base.source_name = "source_name"
+            self.assertEqual({"key": "stale"}, source_base.fetch())
+            mock_background_refresher.submit.assert_called_once_with(
+                [("source_name", "package-name", "")], source_base.refresh_cache_once
+            )
+        with self.subTest("Test corrupted cache"), patch(
+            "pip_rating.sources.base.SourceBase.get_from_cache", return_value=None
+        ), patch(
+            "pip_rating.sources.base.SourceBase.refresh_cache_once"
+        ) as mock_refresh_cache_once:
+            mock_is_cache_expired.return_value = False
+            mock_refresh_cache_once.return_value = {"key": "value"}
+            source_base = SourceBase("package_name")
+            self.assertEqual({"key": "value"}, source_base.fetch())
+            mock_refresh_cache_once.assert_called_once_with()
+
+    @patch(
+        "pip_rating.sources.base.SourceBase.cache_backend", new_callable=PropertyMock
+    )
+    @patch(
+        "pip_rating.sources.base.SourceBase.is_cache_expired", new_callable=PropertyMock
+    )
+    def test_is_cache_stale(
+        self, mock_is_cache_expired: MagicMock, mock_cache_backend: MagicMock
+    ):
+        """Test the is_cache_stale property."""
+        max_staleness = datetime.timedelta(days=30)
+        mock_is_expired = mock_cache_backend.return_value.is_expired
+        with self.subTest("Test default policy"), patch(
+            "pip_rating.sources.base.get_cache_policy",
+            return_value=CachePolicy("default"),
+        ):
+            mock_is_cache_expired.return_value = True
+            self.assertFalse(SourceBase("package_name").is_cache_stale)
+        with patch(
+            "pip_rating.sources.base.get_cache_policy",
+            return_value=CachePolicy("stale-while-revalidate", max_staleness),
+        ):
+            with self.subTest("Test cache not expired"):
+                mock_is_cache_expired.return_value = False
+                self.assertFalse(SourceBase("package_name").is_cache_stale)
+            mock_is_cache_expired.return_value = True
+            with self.subTest("Test cache stale"):
+                mock_is_expired.return_value = False
+                source_base = SourceBase("package_name")
+                source_base.source_name = "source_name"
+                self.assertTrue(source_base.is_cache_stale)
+                mock_is_expired.assert_called_once_with(
+                    "source_name", "package-name", "", max_staleness
+                )
+            with self.subTest("Test cache older than max staleness"):
+                mock_is_expired.return_value = True
+                source_base = SourceBase("package_name")
+                source_base.source_name = "source_name"
+                self.assertFalse(source_base.is_cache_stale)
+
+    @patch("pip_rating.sources.base.in_flight")
+    def test_refresh_cache_once(self, mock_in_flight: MagicMock):
+        """Test the refresh_cache_once method."""
+        source_base = SourceBase("package_name")
+        source_base.source_name = "source_name"
+        self.assertEqual(
+            mock_in_flight.do.return_value, source_base.refresh_cache_once()
+        )
+        mock_in_flight.do.assert_called_once_with(
+            ("source_name", "package-name", ""), source_base.refresh_cache_locked
+        )
 
-    @patch("builtins.open", mock_open(read_data='{"key": "value"}'))
-    @patch("pip_rating.sources.base.SourceBase.cache_file")
-    def test_get_from_cache(self, _: MagicMock):
+    @patch("pip_rating.sources.base.run_stats")
+    @patch("pip_rating.sources.base.SourceBase.refresh_cache")
+    @patch("pip_rating.sources.base.SourceBase.get_from_cache")
+    @patch(
+        "pip_rating.sources.base.SourceBase.cache_backend", new_callable=PropertyMock
+    )
+    def test_refresh_cache_locked(
+        self,
+        mock_cache_backend: MagicMock,
+        mock_get_from_cache: MagicMock,
+        mock_refresh_cache: MagicMock,
+        mock_run_stats: MagicMock,
+    ):
+        """Test the refresh_cache_locked method."""
+        source_base = SourceBase("package_name")
+        source_base.source_name = "source_name"
+        mock_backend = mock_cache_backend.return_value
+        with self.subTest("Test refreshed by another process"):
+            mock_backend.is_expired.return_value = False
+            self.assertEqual(
+                mock_get_from_cache.return_value, source_base.refresh_cache_locked()
+            )
+            mock_backend.lock.assert_called_once_with("source_name", "package-name", "")
+            mock_backend.reload.assert_called_once_with(
+                "source_name", "package-name", ""
+            )
+            mock_refresh_cache.assert_not_called()
+        with self.subTest("Test expired"):
+            mock_backend.is_expired.return_value = True
+            self.assertEqual(
+                mock_refresh_cache.return_value, source_base.refresh_cache_locked()
+            )
+
+    @patch("pip_rating.sources.base.run_stats")
+    @patch("pip_rating.sources.base.SourceBase.save_to_cache")
+    @patch("pip_rating.sources.base.SourceBase.get_revalidated_cache_data")
+    @patch(
+        "pip_rating.sources.base.SourceBase.cache_backend", new_callable=PropertyMock
+    )
+    def test_refresh_cache(
+        self,
+        mock_cache_backend: MagicMock,
+        mock_get_revalidated_cache_data: MagicMock,
+        mock_save_to_cache: MagicMock,
+        mock_run_stats: MagicMock,
+    ):
+        """Test the refresh_cache method."""
+        source_base = SourceBase("package_name")
+        source_base.source_name = "source_name"
+        mock_backend = mock_cache_backend.return_value
+        with self.subTest("Test without validators"):
+            mock_backend.get.return_value = {"key": "value"}
+            self.assertEqual(
+                mock_save_to_cache.return_value, source_base.refresh_cache()
+            )
+            mock_save_to_cache.assert_called_once_with()
+            mock_get_revalidated_cache_data.assert_not_called()
+            mock_run_stats.increment.assert_called_once_with("source_name", "misses")
+        mock_run_stats.reset_mock()
+        mock_save_to_cache.reset_mock()
+        mock_backend.get.return_value = {"validators": {"etag": "etag"}}
+        with self.subTest("Test not modified"):
+            mock_get_revalidated_cache_data.return_value = None
+            self.assertEqual(mock_backend.get.return_value, source_base.refresh_cache())
+            mock_get_revalidated_cache_data.assert_called_once_with({"etag": "etag"})
+            mock_backend.touch.assert_called_once_with(
+                "source_name", "package-name", ""
+            )
+            mock_save_to_cache.assert_not_called()
+            mock_run_stats.increment.assert_called_with("source_name", "not_modified")
+            mock_run_stats.record_latency.assert_called_once()
+        with self.subTest("Test modified"):
+            mock_get_revalidated_cache_data.return_value = {"key": "new"}
+            self.assertEqual(
+                mock_save_to_cache.return_value, source_base.refresh_cache()
+            )
+            mock_save_to_cache.assert_called_once_with({"key": "new"})
+        with self.subTest("Test error"):
+            mock_get_revalidated_cache_data.side_effect = ValueError
+            with self.assertRaises(ValueError):
+                source_base.refresh_cache()
+            mock_run_stats.increment.assert_called_with("source_name", "errors")
+
+    @patch(
+        "pip_rating.sources.base.SourceBase.cache_backend", new_callable=PropertyMock
+    )
+    def test_get_from_cache(self, mock_cache_backend: MagicMock):
         """Test the get_from_cache method."""
         source_base = SourceBase("package_name")
-        self.assertEqual(source_base.get_from_cache(), {"key": "value"})
+        source_base.source_name = "source_name"
+        self.assertEqual(
+            mock_cache_backend.return_value.get.return_value,
+            source_base.get_from_cache(),
+        )
+        mock_cache_backend.return_value.get.assert_called_once_with(
+            "source_name", "package-name", ""
+        )
 
     def test_get_cache_data(self):
         """Test the get_cache_data method."""
@@ -63,27 +277,43 @@ class TestSourceBase(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             source_base.get_cache_data()
 
-    @patch("pip_rating.sources.base.json.dump")
-    @patch("builtins.open")
-    @patch("pip_rating.sources.base.os.makedirs")
-    @patch("pip_rating.sources.base.SourceBase.cache_file")
+    @patch("pip_rating.sources.base.SourceBase.get_cache_data")
+    def test_get_revalidated_cache_data(self, mock_get_cache_data: MagicMock):
+        """Test the get_revalidated_cache_data method."""
+        self.assertEqual(
+            mock_get_cache_data.return_value,
+            SourceBase("package_name").get_revalidated_cache_data({"etag": "etag"}),
+        )
+
+    @patch("pip_rating.sources.base.SourceBase.save_to_cache")
+    def test_set_cache_data(self, mock_save_to_cache: MagicMock):
+        """Test the set_cache_data method."""
+        source_base = SourceBase("package_name")
+        source_base.set_cache_data({"key": "value"})
+        mock_save_to_cache.assert_called_once_with({"key": "value"})
+        self.assertEqual(mock_save_to_cache.return_value, source_base.fetch())
+
+    @patch(
+        "pip_rating.sources.base.SourceBase.cache_backend", new_callable=PropertyMock
+    )
     @patch("pip_rating.sources.base.SourceBase.get_cache_data")
     def test_save_to_cache(
-        self,
-        mock_get_cache_data: MagicMock,
-        _: MagicMock,
-        mock_makedirs: MagicMock,
-        mock_open_: MagicMock,
-        mock_json_dump: MagicMock,
+        self, mock_get_cache_data: MagicMock, mock_cache_backend: MagicMock
     ):
         """Test the save_to_cache method."""
         mock_get_cache_data.return_value = {"key": "value"}
         source_base = SourceBase("package_name")
-        self.assertEqual(mock_get_cache_data.return_value, source_base.save_to_cache())
-        mock_makedirs.assert_called_once_with(
-            str(source_base.cache_file.parent), exist_ok=True
-        )
-        mock_open_.assert_called_once_with(source_base.cache_file, "w")
-        mock_json_dump.assert_called_once_with(
-            {"key": "value"}, mock_open_.return_value.__enter__.return_value
-        )
+        source_base.source_name = "source_name"
+        with self.subTest("Test get the cache data"):
+            self.assertEqual({"key": "value"}, source_base.save_to_cache())
+            mock_cache_backend.return_value.set.assert_called_once_with(
+                "source_name", "package-name", "", {"key": "value"}
+            )
+        mock_cache_backend.reset_mock()
+        mock_get_cache_data.reset_mock()
+        with self.subTest("Test given cache data"):
+            self.assertEqual({"other": 1}, source_base.save_to_cache({"other": 1}))
+            mock_get_cache_data.assert_not_called()
+            mock_cache_backend.return_value.set.assert_called_once_with(
+                "source_name", "package-name", "", {"other": 1}
+            )
@@ -1,104 +1,246 @@
 import unittest
 from unittest.mock import patch, MagicMock, PropertyMock
 
-from pip_rating.sources.pypi import Pypi
+import requests
+
+from pip_rating.sources.pypi import Pypi, get_summary
+
+
+PYPI_PACKAGE = {
+    "info": {
+        "name": "Package-Name",
+        "version": "1.0.0",
+        "project_urls": {"Source": "https://github.com/owner/repo"},
+        "requires_dist": ["requests>=2.0"],
+        "yanked": False,
+        "yanked_reason": None,
+    },
+    "releases": {
+        "1.0.0": [
+            {"upload_time_iso_8601": "2023-01-02T00:00:00Z", "yanked": False},
+            {"upload_time_iso_8601": "2023-01-03T00:00:00Z", "yanked": False},
+        ],
+        "0.9.0": [{"upload_time_iso_8601": "2022-01-01T00:00:00Z", "yanked": True}],
+        "0.8.0": [],
+    },
+}
+PYPI_SUMMARY = {
+    "name": "Package-Name",
+    "version": "1.0.0",
+    "project_urls": {"Source": "https://github.com/owner/repo"},
+    "first_upload_iso_dt": "2022-01-01T00:00:00Z",
+    "latest_upload_iso_dt": "2023-01-03T00:00:00Z",
+    "releases_count": 3,
+    "requires_dist": ["requests>=2.0"],
+    "yanked": False,
+    "yanked_reason": None,
+    "yanked_releases": ["0.9.0"],
+}
+
+
+class TestGetSummary(unittest.TestCase):
+    """Test the get_summary function."""
+
+    def test_get_summary(self):
+        """Test the get_summary function."""
+        with self.subTest("Test package with uploads"):
+            self.assertEqual(PYPI_SUMMARY, get_summary(PYPI_PACKAGE))
+        with self.subTest("Test package without uploads"):
+            summary = get_summary({"info": {"name": "name"}, "releases": {}})
+            self.assertIsNone(summary["first_upload_iso_dt"])
+            self.assertIsNone(summary["latest_upload_iso_dt"])
+            self.assertEqual({}, summary["project_urls"])
 
 
 class TestPypi(unittest.TestCase):
     """Test the PyPI class."""
 
-    @patch("pip_rating.sources.pypi.Pypi.get_package")
     @patch("pip_rating.sources.pypi.datetime")
+    def test_create_cache_data(self, mock_datetime: MagicMock):
+        """Test the create_cache_data method."""
+        package_name = "package_name"
+        mock_datetime.datetime.now.return_value.isoformat.return_value = "isoformat"
+        with self.subTest("Test only summary"):
+            self.assertEqual(
+                {
+                    "package_name": package_name,
+                    "updated_at": "isoformat",
+                    "summary": PYPI_SUMMARY,
+                },
+                Pypi(package_name).create_cache_data(PYPI_PACKAGE),
+            )
+        with self.subTest("Test full package"):
+            self.assertEqual(
+                {
+                    "package_name": package_name,
+                    "updated_at": "isoformat",
+                    "summary": PYPI_SUMMARY,
+                    "package": PYPI_PACKAGE,
+                },
+                Pypi(package_name, True).create_cache_data(PYPI_PACKAGE),
+            )
+
+    def test_get_missing_data(self):
+        """Test the get_missing_data method."""
+        summary = Pypi("package_name").get_missing_data()["summary"]
+        self.assertEqual("package_name", summary["name"])
+        self.assertIsNone(summary["latest_upload_iso_dt"])
+        self.assertIsNone(summary["first_upload_iso_dt"])
+
+    @patch("pip_rating.sources.pypi.Pypi.create_cache_data")
+    @patch("pip_rating.sources.pypi.Pypi.get_response")
     def test_get_cache_data(
-        self, mock_datetime: MagicMock, mock_get_package: MagicMock
+        self, mock_get_response: MagicMock, mock_create_cache_data: MagicMock
     ):
         """Test the get_cache_data method."""
-        package_name = "package_name"
-        mock_datetime.datetime.now.return_value.isoformat.return_value = "isoformat"
-        mock_get_package.return_value = {"releases": "releases"}
+        mock_response = mock_get_response.return_value.__enter__.return_value
+        mock_response.headers = {"ETag": "etag"}
         self.assertEqual(
-            {
-                "package_name": package_name,
-                "updated_at": mock_datetime.datetime.now.return_value.isoformat.return_value,
-                "package": mock_get_package.return_value,
-            },
-            Pypi(package_name).get_cache_data(),
+            mock_create_cache_data.return_value, Pypi("package_name").get_cache_data()
+        )
+        mock_create_cache_data.assert_called_once_with(
+            mock_response.json.return_value, {"etag": "etag", "last_modified": None}
         )
 
+    @patch("pip_rating.sources.pypi.Pypi.create_cache_data")
+    @patch("pip_rating.sources.pypi.Pypi.get_response")
+    def test_get_revalidated_cache_data(
+        self, mock_get_response: MagicMock, mock_create_cache_data: MagicMock
+    ):
+        """Test the get_revalidated_cache_data method."""
+        mock_response = mock_get_response.return_value.__enter__.return_value
+        validators = {"etag": "etag", "last_modified": None, "last_serial": 10}
+        with self.subTest("Test not modified"):
+            mock_response.status_code = 304
+            mock_response.headers = {}
+            self.assertIsNone(
+                Pypi("package_name").get_revalidated_cache_data(validators)
+            )
+            mock_get_response.assert_called_once_with({"If-None-Match": "etag"})
+        with self.subTest("Test same last serial"):
+            mock_response.status_code = 200
+            mock_response.headers = {"X-PyPI-Last-Serial": "10"}
+            self.assertIsNone(
+                Pypi("package_name").get_revalidated_cache_data(validators)
+            )
+            mock_response.json.assert_not_called()
+        with self.subTest("Test modified"):
+            mock_response.headers = {"X-PyPI-Last-Serial": "11", "ETag": "new"}
+            self.assertEqual(
+                mock_create_cache_data.return_value,
+                Pypi("package_name").get_revalidated_cache_data(validators),
+            )
+            mock_create_cache_data.assert_called_once_with(
+                mock_response.json.return_value, {"etag": "new", "last_modified": None}
+            )
+
+    @patch("pip_rating.sources.pypi.Pypi.save_to_cache")
+    @patch("pip_rating.sources.pypi.SourceBase.get_from_cache")
+    def test_get_from_cache(
+        self, mock_get_from_cache: MagicMock, mock_save_to_cache: MagicMock
+    ):
+        """Test the get_from_cache method."""
+        with self.subTest("Test summary in cache"):
+            mock_get_from_cache.return_value = {"summary": PYPI_SUMMARY}
+            self.assertEqual(
+                mock_get_from_cache.return_value, Pypi("package_name").get_from_cache()
+            )
+            mock_save_to_cache.assert_not_called()
+        with self.subTest("Test cache without summary"), patch(
+            "pip_rating.sources.pypi.Pypi.create_cache_data"
+        ) as mock_create_cache_data:
+            mock_get_from_cache.return_value = {"package": PYPI_PACKAGE}
+            self.assertEqual(
+                mock_save_to_cache.return_value, Pypi("package_name").get_from_cache()
+            )
+            mock_create_cache_data.assert_called_once_with(PYPI_PACKAGE)
+            mock_save_to_cache.assert_called_once_with(
+                mock_create_cache_data.return_value
+            )
+        mock_save_to_cache.reset_mock()
+        with self.subTest("Test full package not in cache"):
+            mock_get_from_cache.return_value = {"summary": PYPI_SUMMARY}
+            self.assertEqual(
+                mock_save_to_cache.return_value,
+                Pypi("package_name", True).get_from_cache(),
+            )
+            mock_save_to_cache.assert_called_once_with()
+
     @patch(
         "pip_rating.sources.pypi.SourceBase.is_cache_expired", new_callable=PropertyMock
     )
-    def test_package(self, mock_is_cache_expired: MagicMock):
-        """Test the package property."""
+    def test_summary(self, mock_is_cache_expired: MagicMock):
+        """Test the summary property."""
         with self.subTest("Test cache not expired"), patch(
             "pip_rating.sources.pypi.Pypi.get_from_cache"
-        ) as mock_get_package:
+        ) as mock_get_from_cache:
             mock_is_cache_expired.return_value = False
-            mock_get_package.return_value = {"package": "package"}
-            source_base = Pypi("package_name")
-            self.assertEqual("package", source_base.package)
+            mock_get_from_cache.return_value = {"summary": "summary"}
+            self.assertEqual("summary", Pypi("package_name").summary)
         with self.subTest("Test cache expired"), patch(
-            "pip_rating.sources.pypi.Pypi.save_to_cache"
-        ) as mock_save_to_cache:
+            "pip_rating.sources.pypi.Pypi.refresh_cache_once"
+        ) as mock_refresh_cache:
             mock_is_cache_expired.return_value = True
-            mock_save_to_cache.return_value = {"package": "package"}
-            source_base = Pypi("package_name")
-            self.assertEqual("package", source_base.package)
-
-    @patch("pip_rating.sources.pypi.Pypi.package", new_callable=PropertyMock)
-    def test_uploads(self, mock_package: MagicMock):
-        """Test the uploads' property."""
-        release_2 = {"upload_time_iso_8601": "2"}
-        release_1 = {"upload_time_iso_8601": "1"}
-        mock_package.return_value = {
-            "releases": {
-                "1.0.0": [release_2],
-                "0.9.0": [release_1],
-            }
-        }
-        self.assertEqual([release_1, release_2], Pypi("package_name").uploads)
-
-    @patch("pip_rating.sources.pypi.Pypi.uploads", new_callable=PropertyMock)
-    def test_latest_upload(self, mock_uploads: MagicMock):
-        """Test the latest_upload property."""
-        mock_uploads.return_value = ["upload_1", "upload_2"]
-        self.assertEqual("upload_2", Pypi("package_name").latest_upload)
-
-    @patch("pip_rating.sources.pypi.Pypi.uploads", new_callable=PropertyMock)
-    def test_first_upload(self, mock_uploads: MagicMock):
-        """Test the first_upload property."""
-        mock_uploads.return_value = ["upload_1", "upload_2"]
-        self.assertEqual("upload_1", Pypi("package_name").first_upload)
-
-    @patch("pip_rating.sources.pypi.Pypi.latest_upload", new_callable=PropertyMock)
-    def test_latest_upload_iso_dt(self, mock_latest_upload: MagicMock):
-        """Test the latest_upload_iso_dt property."""
-        with self.subTest("Test latest_upload is not None"):
-            mock_latest_upload.return_value = {"upload_time_iso_8601": "iso_dt"}
-            self.assertEqual("iso_dt", Pypi("package_name").latest_upload_iso_dt)
-        with self.subTest("Test latest_upload is None"):
-            mock_latest_upload.return_value = None
-            self.assertIsNone(Pypi("package_name").latest_upload_iso_dt)
-
-    @patch("pip_rating.sources.pypi.Pypi.first_upload", new_callable=PropertyMock)
-    def test_first_upload_iso_dt(self, mock_first_upload: MagicMock):
-        """Test the first_upload_iso_dt property."""
-        with self.subTest("Test first_upload is not None"):
-            mock_first_upload.return_value = {"upload_time_iso_8601": "iso_dt"}
-            self.assertEqual("iso_dt", Pypi("package_name").first_upload_iso_dt)
-        with self.subTest("Test first_upload is None"):
-            mock_first_upload.return_value = None
-            self.assertIsNone(Pypi("package_name").first_upload_iso_dt)
-
-    @patch("pip_rating.sources.pypi.requests")
-    def test_get_package(self, mock_requests: MagicMock):
+            mock_refresh_cache.return_value = {"summary": "summary"}
+            self.assertEqual("summary", Pypi("package_name").summary)
+
+    @patch("pip_rating.sources.pypi.Pypi.set_cache_data")
+    @patch("pip_rating.sources.pypi.Pypi.get_package")
+    @patch("pip_rating.sources.pypi.Pypi.fetch")
+    def test_package(
+        self,
+        mock_fetch: MagicMock,
+        mock_get_package: MagicMock,
+        mock_set_cache_data: MagicMock,
+    ):
+        """Test the package property."""
+        with self.subTest("Test full package fetched"):
+            mock_fetch.return_value = {"package": PYPI_PACKAGE}
+            self.assertEqual(PYPI_PACKAGE, Pypi("package_name").package)
+            mock_get_package.assert_not_called()
+        with self.subTest("Test full package not fetched"):
+            mock_fetch.return_value = {"summary": PYPI_SUMMARY}
+            mock_get_package.return_value = PYPI_PACKAGE
+            pypi = Pypi("package_name")
+            self.assertEqual(PYPI_PACKAGE, pypi.package)
+            self.assertTrue(pypi.full_package)
+            mock_set_cache_data.assert_called_once()
+
+    @patch("pip_rating.sources.pypi.Pypi.summary", new_callable=PropertyMock)
+    def test_upload_iso_dt(self, mock_summary: MagicMock):
+        """Test the latest_upload_iso_dt and first_upload_iso_dt properties."""
+        mock_summary.return_value = PYPI_SUMMARY
+        pypi = Pypi("package_name")
+        self.assertEqual("2023-01-03T00:00:00Z", pypi.latest_upload_iso_dt)
+        self.assertEqual("2022-01-01T00:00:00Z", pypi.first_upload_iso_dt)
+
+    @patch("pip_rating.sources.pypi.Pypi.session_pool")
+    def test_get_response(self, mock_session_pool: MagicMock):
+        """Test the get_response method."""
+        with self.subTest("Test successful response"):
+            self.assertEqual(
+                mock_session_pool.get.return_value,
+                Pypi("package_name").get_response({"If-None-Match": "etag"}),
+            )
+            mock_session_pool.get.assert_called_once_with(
+                "https://pypi.org/pypi/package_name/json",
+                headers={"If-None-Match": "etag"},
+                stream=True,
+            )
+            mock_session_pool.get.return_value.close.assert_not_called()
+        with self.subTest("Test error response"):
+            mock_session_pool.get.return_value.raise_for_status.side_effect = (
+                requests.HTTPError()
+            )
+            with self.assertRaises(requests.HTTPError):
+                Pypi("package_name").get_response()
+            mock_session_pool.get.return_value.close.assert_called_once_with()
+
+    @patch("pip_rating.sources.pypi.Pypi.get_response")
+    def test_get_package(self, mock_get_response: MagicMock):
         """Test the get_package method."""
-        package_name = "package_name"
         self.assertEqual(
-            mock_requests.get.return_value.__enter__.return_value.json.return_value,
-            Pypi(package_name).get_package(),
-        )
-        mock_requests.get.return_value.__enter__.return_value.raise_for_status.assert_called_once()
-        mock_requests.get.assert_called_once_with(
-            f"https://pypi.org/pypi/{package_name}/json"
+            mock_get_response.return_value.__enter__.return_value.json.return_value,
+            Pypi("package_name").get_package(),
         )
+        mock_get_response.assert_called_once_with()
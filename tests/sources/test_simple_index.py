@@ -0,0 +1,201 @@
+import unittest
+from unittest.mock import patch, MagicMock, PropertyMock
+
+from pip_rating.sources.simple_index import (
+    CoreMetadata,
+    SimpleIndex,
+    SIMPLE_JSON_CONTENT_TYPE,
+    get_file_version,
+    parse_requires_dist,
+    parse_simple_html,
+    parse_simple_json,
+)
+
+BASE_URL = "https://pypi.org/simple/package/"
+WHEEL_URL = "https://files.example.com/package-1.0.0-py3-none-any.whl"
+WHEEL_FILE = {
+    "filename": "package-1.0.0-py3-none-any.whl",
+    "url": WHEEL_URL,
+    "version": "1.0.0",
+    "requires_python": ">=3.8",
+    "yanked": False,
+    "metadata": True,
+}
+SDIST_FILE = {
+    "filename": "package-0.9.tar.gz",
+    "url": "https://pypi.org/packages/package-0.9.tar.gz",
+    "version": "0.9",
+    "requires_python": None,
+    "yanked": True,
+    "metadata": False,
+}
+SIMPLE_HTML = f"""<html><body>
+<a href="{WHEEL_URL}#sha256=abc" data-requires-python="&gt;=3.8"
+ data-dist-info-metadata="sha256=def">package-1.0.0-py3-none-any.whl</a>
+<a href="../../packages/package-0.9.tar.gz#sha256=abc" data-yanked="">package-0.9</a>
+<a href="../../packages/package-0.8.exe">package-0.8.exe</a>
+</body></html>"""
+SIMPLE_JSON = {
+    "files": [
+        {
+            "filename": "package-1.0.0-py3-none-any.whl",
+            "url": WHEEL_URL,
+            "requires-python": ">=3.8",
+            "core-metadata": {"sha256": "def"},
+        },
+        {
+            "filename": "package-0.9.tar.gz",
+            "url": "../../packages/package-0.9.tar.gz",
+            "yanked": "Broken",
+        },
+    ]
+}
+METADATA = """Metadata-Version: 2.1
+Name: package
+Version: 1.0.0
+Requires-Dist: requests (>=2.0)
+Requires-Dist: pysocks ; extra == 'socks'
+
+Description
+"""
+
+
+class TestFunctions(unittest.TestCase):
+    """Test the simple index functions."""
+
+    def test_get_file_version(self):
+        """Test the get_file_version function."""
+        with self.subTest("Test wheel"):
+            self.assertEqual("1.0.0", get_file_version(WHEEL_FILE["filename"]))
+        with self.subTest("Test sdist"):
+            self.assertEqual("0.9", get_file_version("Package-0.9.zip"))
+        with self.subTest("Test other format"):
+            self.assertIsNone(get_file_version("package-0.8.exe"))
+
+    def test_parse_simple_html(self):
+        """Test the parse_simple_html function."""
+        self.assertEqual(
+            [WHEEL_FILE, SDIST_FILE], parse_simple_html(SIMPLE_HTML, BASE_URL)
+        )
+
+    def test_parse_simple_json(self):
+        """Test the parse_simple_json function."""
+        self.assertEqual(
+            [WHEEL_FILE, SDIST_FILE], parse_simple_json(SIMPLE_JSON, BASE_URL)
+        )
+
+    def test_parse_requires_dist(self):
+        """Test the parse_requires_dist function."""
+        self.assertEqual(
+            ["requests (>=2.0)", "pysocks ; extra == 'socks'"],
+            parse_requires_dist(METADATA),
+        )
+
+
+class TestSimpleIndex(unittest.TestCase):
+    """Test the SimpleIndex class."""
+
+    def test_cache_key(self):
+        """Test the cache_key property."""
+        with self.subTest("Test default index"):
+            self.assertEqual(
+                ("simple_index", "package-name", ""),
+                SimpleIndex("Package_Name").cache_key,
+            )
+        with self.subTest("Test other index"):
+            self.assertEqual(
+                ("simple_index", "package", "https://example.com/simple"),
+                SimpleIndex("package", "https://example.com/simple/").cache_key,
+            )
+
+    @patch("pip_rating.sources.simple_index.SimpleIndex.session_pool")
+    def test_get_cache_data(self, mock_session_pool: MagicMock):
+        """Test the get_cache_data method."""
+        mock_response = mock_session_pool.get.return_value
+        mock_response.url = BASE_URL
+        mock_response.headers = {"ETag": "etag"}
+        with self.subTest("Test JSON page"):
+            mock_response.headers["Content-Type"] = SIMPLE_JSON_CONTENT_TYPE
+            mock_response.json.return_value = SIMPLE_JSON
+            cache_data = SimpleIndex("package").get_cache_data()
+            self.assertEqual([WHEEL_FILE, SDIST_FILE], cache_data["files"])
+            self.assertEqual("etag", cache_data["validators"]["etag"])
+            mock_session_pool.get.assert_called_once_with(
+                BASE_URL,
+                headers={"Accept": f"{SIMPLE_JSON_CONTENT_TYPE}, text/html;q=0.1"},
+            )
+        with self.subTest("Test HTML page"):
+            mock_response.headers["Content-Type"] = "text/html"
+            mock_response.text = SIMPLE_HTML
+            cache_data = SimpleIndex("package").get_cache_data()
+            self.assertEqual([WHEEL_FILE, SDIST_FILE], cache_data["files"])
+
+    @patch("pip_rating.sources.simple_index.SimpleIndex.session_pool")
+    def test_get_revalidated_cache_data(self, mock_session_pool: MagicMock):
+        """Test the get_revalidated_cache_data method."""
+        mock_session_pool.get.return_value.status_code = 304
+        self.assertIsNone(
+            SimpleIndex("package").get_revalidated_cache_data({"etag": "etag"})
+        )
+        self.assertEqual(
+            "etag", mock_session_pool.get.call_args[1]["headers"]["If-None-Match"]
+        )
+
+
+class TestCoreMetadata(unittest.TestCase):
+    """Test the CoreMetadata class."""
+
+    @patch("pip_rating.sources.simple_index.Pypi")
+    @patch("pip_rating.sources.simple_index.CoreMetadata.session_pool")
+    def test_get_cache_data(self, mock_session_pool: MagicMock, mock_pypi: MagicMock):
+        """Test the get_cache_data method."""
+        with self.subTest("Test metadata file"):
+            mock_session_pool.get.return_value.text = METADATA
+            cache_data = CoreMetadata("package", "1.0.0", [WHEEL_FILE]).get_cache_data()
+            self.assertEqual(2, len(cache_data["requires_dist"]))
+            mock_session_pool.get.assert_called_once_with(f"{WHEEL_URL}.metadata")
+        wheel = {**WHEEL_FILE, "metadata": False}
+        with self.subTest("Test PyPI document"):
+            mock_pypi.return_value.summary = {
+                "version": "1.0",
+                "requires_dist": ["requests"],
+            }
+            cache_data = CoreMetadata("package", "1.0.0", [wheel]).get_cache_data()
+            self.assertEqual(["requests"], cache_data["requires_dist"])
+        with self.subTest("Test PyPI document without requirements"):
+            mock_pypi.return_value.summary = {"version": "1.0.0", "requires_dist": None}
+            cache_data = CoreMetadata("package", "1.0.0", [wheel]).get_cache_data()
+            self.assertIsNone(cache_data["requires_dist"])
+        with self.subTest("Test other version"):
+            cache_data = CoreMetadata("package", "0.9", [wheel]).get_cache_data()
+            self.assertIsNone(cache_data["requires_dist"])
+        with self.subTest("Test without PyPI"):
+            metadata = CoreMetadata("package", "1.0.0", [wheel], "https://example.com")
+            self.assertIsNone(metadata.get_cache_data()["requires_dist"])
+
+    def test_cache_key(self):
+        """Test the cache_key property."""
+        with self.subTest("Test default index"):
+            self.assertEqual(
+                ("core_metadata", "package", "1.0.0"),
+                CoreMetadata("Package", "1.0.0").cache_key,
+            )
+        with self.subTest("Test other index"):
+            self.assertEqual(
+                ("core_metadata", "package", "1.0.0 https://example.com"),
+                CoreMetadata("Package", "1.0.0", [], "https://example.com/").cache_key,
+            )
+
+    @patch(
+        "pip_rating.sources.simple_index.CoreMetadata.cache_backend",
+        new_callable=PropertyMock,
+    )
+    def test_save_to_cache(self, mock_cache_backend: MagicMock):
+        """Test the save_to_cache method."""
+        metadata = CoreMetadata("package", "1.0.0")
+        with self.subTest("Test unknown requirements"):
+            metadata.save_to_cache(metadata.create_cache_data(None))
+            mock_cache_backend.return_value.set.assert_not_called()
+        with self.subTest("Test known requirements"):
+            metadata.save_to_cache(metadata.create_cache_data([]))
+            mock_cache_backend.return_value.set.assert_called_once()
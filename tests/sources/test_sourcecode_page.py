@@ -3,10 +3,15 @@ from unittest.mock import patch, MagicMock, Mock, PropertyMock
 
 from requests import RequestException
 
+from pip_rating.cache import CachePolicy
 from pip_rating.sources.sourcecode_page import (
     get_github_readme,
+    get_github_readmes,
+    get_github_readmes_query,
     search_in_readme,
+    search_install_command,
     SourcecodePage,
+    SourcecodePageBatch,
     replace_chars,
 )
 
@@ -16,16 +21,15 @@ class TestGetGithubReadme(unittest.TestCase):
 
     @patch("pip_rating.sources.sourcecode_page.click.echo")
     @patch("pip_rating.sources.sourcecode_page.github_token", new="token")
-    @patch("pip_rating.sources.sourcecode_page.requests.get")
-    def test_get_github_readme(
-        self, mock_requests_get: MagicMock, mock_echo: MagicMock
-    ):
+    def test_get_github_readme(self, mock_echo: MagicMock):
         """Test the get_github_readme function."""
+        mock_pool = MagicMock()
+        mock_requests_get = mock_pool.get
         with self.subTest("Test with readme"):
             mock_requests_get.return_value.__enter__.return_value.json.return_value = {
                 "content": "Y29udGVudA=="
             }
-            self.assertEqual("content", get_github_readme("owner", "repo"))
+            self.assertEqual("content", get_github_readme("owner", "repo", mock_pool))
             mock_requests_get.return_value.__enter__.return_value.raise_for_status.assert_called_once_with()
             mock_requests_get.assert_called_once_with(
                 "https://api.github.com/repos/owner/repo/readme",
@@ -35,7 +39,7 @@ class TestGetGithubReadme(unittest.TestCase):
             mock_requests_get.return_value.__enter__.return_value.raise_for_status.side_effect = RequestException(
                 response=MagicMock(status_code=403, reason="rate limit exceeded")
             )
-            self.assertEqual("", get_github_readme("owner", "repo"))
+            self.assertEqual("", get_github_readme("owner", "repo", mock_pool))
             mock_echo.assert_called_once_with(
                 "GitHub rate limit exceeded. Check your GITHUB_TOKEN environment variable.",
                 err=True,
@@ -49,13 +53,85 @@ class TestGetGithubReadme(unittest.TestCase):
             mock_requests_get.return_value.__enter__.return_value.raise_for_status.side_effect = RequestException(
                 response=MagicMock(status_code=403, reason="rate limit exceeded")
             )
-            self.assertEqual("", get_github_readme("owner", "repo"))
+            self.assertEqual("", get_github_readme("owner", "repo", mock_pool))
             mock_echo.assert_called_once_with(
                 "GitHub rate limit exceeded. Set GITHUB_TOKEN environment variable to increase the limit.",
                 err=True,
             )
 
 
+class TestGetGithubReadmes(unittest.TestCase):
+    """Test the get_github_readmes function."""
+
+    def test_get_github_readmes_query(self):
+        """Test the get_github_readmes_query function."""
+        query = get_github_readmes_query([("owner", "repo"), ("other", "repo")])
+        self.assertTrue(
+            query.startswith(
+                "query($owner0: String!, $name0: String!, "
+                "$owner1: String!, $name1: String!) {"
+            )
+        )
+        self.assertIn("repository1: repository(owner: $owner1, name: $name1)", query)
+        self.assertIn('readme1: object(expression: "HEAD:README.rst")', query)
+
+    @patch("pip_rating.sources.sourcecode_page.github_token", new="token")
+    def test_get_github_readmes(self):
+        """Test the get_github_readmes function."""
+        mock_pool = MagicMock()
+        mock_response = mock_pool.post.return_value.__enter__.return_value
+        mock_response.json.return_value = {
+            "data": {
+                "repository0": {"readme0": None, "readme1": {"text": "readme"}},
+                "repository1": None,
+            }
+        }
+        self.assertEqual(
+            ["readme", None],
+            get_github_readmes([("owner", "repo"), ("other", "repo")], mock_pool),
+        )
+        mock_pool.post.assert_called_once()
+        self.assertEqual(
+            {"owner0": "owner", "name0": "repo", "owner1": "other", "name1": "repo"},
+            mock_pool.post.call_args.kwargs["json"]["variables"],
+        )
+        self.assertEqual(
+            {"Authorization": "Bearer token"},
+            mock_pool.post.call_args.kwargs["headers"],
+        )
+        mock_response.raise_for_status.assert_called_once_with()
+        with self.subTest("Test readme without the known names"):
+            mock_response.json.return_value = {
+                "data": {"repository0": {"readme0": None}, "repository1": {}}
+            }
+            self.assertEqual(
+                [None, None],
+                get_github_readmes([("owner", "repo"), ("other", "repo")], mock_pool),
+            )
+        with self.subTest("Test empty readme"):
+            mock_response.json.return_value = {
+                "data": {"repository0": {"readme0": {"text": ""}}}
+            }
+            self.assertEqual([""], get_github_readmes([("owner", "repo")], mock_pool))
+        with self.subTest("Test errors with some repositories"):
+            mock_response.json.return_value = {
+                "data": {"repository0": {"readme0": {"text": "readme"}}},
+                "errors": [{"type": "NOT_FOUND", "message": "Not found"}],
+            }
+            self.assertEqual(
+                ["readme", None],
+                get_github_readmes([("owner", "repo"), ("other", "repo")], mock_pool),
+            )
+        with self.subTest("Test errors without repositories"), self.assertRaises(
+            RequestException
+        ):
+            mock_response.json.return_value = {
+                "data": None,
+                "errors": [{"type": "RATE_LIMITED", "message": "Rate limited"}],
+            }
+            get_github_readmes([("owner", "repo")], mock_pool)
+
+
 class TestReplaceChars(unittest.TestCase):
     """Test the replace_chars function."""
 
@@ -92,6 +168,29 @@ class TestSearchInReadme(unittest.TestCase):
             )
 
 
+class TestSearchInstallCommand(unittest.TestCase):
+    """Test the search_install_command function."""
+
+    def test_search_install_command(self):
+        """Test the search_install_command function."""
+        with self.subTest("Test package found"):
+            self.assertEqual(
+                (True, "pip install -U Package_Name"),
+                search_install_command(
+                    "pip install other\npip install -U Package_Name", "package-name"
+                ),
+            )
+        with self.subTest("Test other package"):
+            self.assertEqual(
+                (False, "poetry add other"),
+                search_install_command("poetry add other", "package-name"),
+            )
+        with self.subTest("Test without install command"):
+            self.assertEqual(
+                (None, None), search_install_command("readme", "package-name")
+            )
+
+
 class TestSourcecodePage(unittest.TestCase):
     """Test the SourcecodePage class."""
 
@@ -114,8 +213,8 @@ class TestSourcecodePage(unittest.TestCase):
             mock_get_github_readme.return_value = "pip install repo"
             mock_package = Mock()
             mock_package.name = "repo"
-            mock_package.pypi.package = {
-                "info": {"project_urls": {"Source": "https://github.com/owner/repo"}}
+            mock_package.pypi.summary = {
+                "project_urls": {"Source": "https://github.com/owner/repo"}
             }
             cache_dict = SourcecodePage(mock_package).get_cache_data()
             self.assertEqual(
@@ -125,16 +224,19 @@ class TestSourcecodePage(unittest.TestCase):
                     "source": "github",
                     "sourcecode": {
                         "package_in_readme": True,
-                        "readme_content": mock_get_github_readme.return_value,
+                        "install_command": "pip install repo",
+                        "readme_content": "",
                     },
                 },
                 cache_dict,
             )
-            mock_get_github_readme.assert_called_once_with("owner", "repo")
+            mock_get_github_readme.assert_called_once_with(
+                "owner", "repo", SourcecodePage.session_pool
+            )
         with self.subTest("Test missing project urls in package"):
             mock_package = Mock()
             mock_package.name = "repo"
-            mock_package.pypi.package = {"info": {"project_urls": None}}
+            mock_package.pypi.summary = {"project_urls": None}
             cache_dict = SourcecodePage(mock_package).get_cache_data()
             self.assertEqual(
                 {
@@ -143,12 +245,23 @@ class TestSourcecodePage(unittest.TestCase):
                     "source": "github",
                     "sourcecode": {
                         "package_in_readme": None,
+                        "install_command": None,
                         "readme_content": "",
                     },
                 },
                 cache_dict,
             )
-            mock_get_github_readme.assert_called_once_with("owner", "repo")
+            mock_get_github_readme.assert_called_once_with(
+                "owner", "repo", SourcecodePage.session_pool
+            )
+
+    @patch("pip_rating.sources.sourcecode_page.STORE_READMES", new=True)
+    def test_create_cache_data_store_readmes(self):
+        """Test the create_cache_data method storing the readme."""
+        mock_package = Mock()
+        mock_package.name = "repo"
+        cache_data = SourcecodePage(mock_package).create_cache_data("readme")
+        self.assertEqual("readme", cache_data["sourcecode"]["readme_content"])
 
     @patch(
         "pip_rating.sources.sourcecode_page.SourceBase.is_cache_expired",
@@ -168,12 +281,73 @@ class TestSourcecodePage(unittest.TestCase):
             self.assertTrue(sourcecode_page.package_in_readme)
             mock_get_from_cache.assert_called_once_with()
         with self.subTest("Test cache expired"), patch(
-            "pip_rating.sources.sourcecode_page.SourcecodePage.save_to_cache"
-        ) as mock_save_to_cache:
+            "pip_rating.sources.sourcecode_page.SourcecodePage.refresh_cache_once"
+        ) as mock_refresh_cache:
             mock_is_cache_expired.return_value = True
-            mock_save_to_cache.return_value = {
+            mock_refresh_cache.return_value = {
                 "sourcecode": {"package_in_readme": True}
             }
             sourcecode_page = SourcecodePage(mock_package)
             self.assertTrue(sourcecode_page.package_in_readme)
-            mock_save_to_cache.assert_called_once_with()
+            mock_refresh_cache.assert_called_once_with()
+
+
+class TestSourcecodePageBatch(unittest.TestCase):
+    """Test the SourcecodePageBatch class."""
+
+    @patch("pip_rating.sources.sourcecode_page.GITHUB_BATCH_SIZE", new=2)
+    @patch("pip_rating.sources.sourcecode_page.github_token", new="token")
+    def test_get_chunks(self):
+        """Test the get_chunks method."""
+        pages = [
+            Mock(is_cache_expired=True, github_repository=("owner", "repo"))
+            for _ in range(3)
+        ]
+        pages.insert(1, Mock(is_cache_expired=False))
+        pages.insert(2, Mock(is_cache_expired=True, github_repository=None))
+        self.assertEqual(
+            [[pages[0], pages[3]], [pages[4]]],
+            list(SourcecodePageBatch(pages).get_chunks()),
+        )
+        with self.subTest("Test offline"), patch(
+            "pip_rating.sources.sourcecode_page.get_cache_policy",
+            return_value=CachePolicy(offline=True),
+        ):
+            self.assertEqual([], list(SourcecodePageBatch(pages).get_chunks()))
+        with self.subTest("Test without token"), patch(
+            "pip_rating.sources.sourcecode_page.github_token", new=""
+        ):
+            self.assertEqual([], list(SourcecodePageBatch(pages).get_chunks()))
+
+    @patch("pip_rating.sources.sourcecode_page.run_stats")
+    @patch("pip_rating.sources.sourcecode_page.get_github_readme")
+    @patch("pip_rating.sources.sourcecode_page.get_github_readmes")
+    @patch("pip_rating.sources.sourcecode_page.SourcecodePageBatch.get_chunks")
+    def test_fetch(
+        self,
+        mock_get_chunks: MagicMock,
+        mock_get_github_readmes: MagicMock,
+        mock_get_github_readme: MagicMock,
+        mock_run_stats: MagicMock,
+    ):
+        """Test the fetch method."""
+        mock_page = Mock(github_repository=("owner", "repo"))
+        mock_other_page = Mock(github_repository=("other", "repo"))
+        mock_pool = Mock()
+        mock_get_chunks.return_value = [[mock_page, mock_other_page]]
+        mock_get_github_readmes.return_value = ["pip install repo", None]
+        SourcecodePageBatch([mock_page, mock_other_page], mock_pool).fetch()
+        mock_get_github_readmes.assert_called_once_with(
+            [("owner", "repo"), ("other", "repo")], mock_pool
+        )
+        mock_page.create_cache_data.assert_called_once_with("pip install repo")
+        mock_page.set_cache_data.assert_called_once_with(
+            mock_page.create_cache_data.return_value
+        )
+        # The readme not found by the batch query is requested using the REST API
+        mock_get_github_readme.assert_called_once_with("other", "repo", mock_pool)
+        mock_other_page.create_cache_data.assert_called_once_with(
+            mock_get_github_readme.return_value
+        )
+        mock_run_stats.increment.assert_called_once_with("sourcecode_page", "misses", 2)
+        mock_run_stats.record_latency.assert_called_once()
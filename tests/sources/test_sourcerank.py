@@ -1,10 +1,14 @@
 import unittest
-from unittest import mock
 from unittest.mock import Mock, MagicMock, patch, PropertyMock
 
 import requests
 
-from pip_rating.sources.sourcerank import SourceRank, RETRY_WAIT
+from pip_rating.sources.sourcerank import (
+    SourceRank,
+    BREAKDOWN_MAPPING,
+    BreakdownParser,
+    parse_breakdown,
+)
 
 SOURCERANK_PAGE = """
 <!DOCTYPE html>
@@ -114,25 +118,92 @@ SOURCERANK_PAGE = """
 """
 
 
+class TestParseBreakdown(unittest.TestCase):
+    """Test the parse_breakdown function."""
+
+    def test_parse_breakdown(self):
+        """Test the parse_breakdown function."""
+        expected = parse_breakdown(SOURCERANK_PAGE)
+        with self.subTest("Test all the items"):
+            self.assertEqual(set(BREAKDOWN_MAPPING.values()), set(expected))
+            self.assertEqual(32, expected["total"])
+        with self.subTest("Test bytes"):
+            self.assertEqual(expected, parse_breakdown(SOURCERANK_PAGE.encode()))
+        with self.subTest("Test small chunks"), patch(
+            "pip_rating.sources.sourcerank.PARSER_CHUNK_SIZE", 7
+        ):
+            self.assertEqual(expected, parse_breakdown(SOURCERANK_PAGE))
+        with self.subTest("Test without breakdown"):
+            self.assertEqual({}, parse_breakdown("<html><li>1 Other</li></html>"))
+
+    @patch("pip_rating.sources.sourcerank.PARSER_CHUNK_SIZE", 64)
+    @patch.object(
+        BreakdownParser, "feed", autospec=True, side_effect=BreakdownParser.feed
+    )
+    def test_parse_breakdown_stop(self, mock_feed: MagicMock):
+        """Test the parse_breakdown function stops after the last item."""
+        content = SOURCERANK_PAGE + "<p>footer</p>" * 1000
+        self.assertEqual(32, parse_breakdown(content)["total"])
+        self.assertLess(mock_feed.call_count, len(content) // 64)
+
+
 class TestSourceRank(unittest.TestCase):
     """Test the SourceRank class."""
 
     @patch("pip_rating.sources.sourcerank.SourceRank.get_breakdown")
+    @patch("pip_rating.sources.sourcerank.SourceRank.get_response")
     @patch("pip_rating.sources.sourcerank.datetime")
     def test_get_cache_data(
-        self, mock_datetime: MagicMock, mock_get_breakdown: MagicMock
+        self,
+        mock_datetime: MagicMock,
+        mock_get_response: MagicMock,
+        mock_get_breakdown: MagicMock,
     ):
         """Test the get_cache_data method."""
         mock_package = Mock()
+        mock_get_response.return_value.headers = {"Last-Modified": "last_modified"}
         mock_get_breakdown.return_value = {"breakdown": "breakdown"}
         self.assertEqual(
             {
                 "package_name": mock_package.name,
                 "updated_at": mock_datetime.datetime.now.return_value.isoformat.return_value,
                 "breakdown": mock_get_breakdown.return_value,
+                "validators": {"etag": None, "last_modified": "last_modified"},
             },
             SourceRank(mock_package).get_cache_data(),
         )
+        mock_get_breakdown.assert_called_once_with(
+            mock_get_response.return_value.content
+        )
+
+    def test_get_missing_data(self):
+        """Test the get_missing_data method."""
+        breakdown = SourceRank(Mock()).get_missing_data()["breakdown"]
+        self.assertEqual(set(BREAKDOWN_MAPPING.values()), set(breakdown))
+        self.assertEqual({0}, set(breakdown.values()))
+
+    @patch("pip_rating.sources.sourcerank.SourceRank.create_cache_data")
+    @patch("pip_rating.sources.sourcerank.SourceRank.get_response")
+    def test_get_revalidated_cache_data(
+        self, mock_get_response: MagicMock, mock_create_cache_data: MagicMock
+    ):
+        """Test the get_revalidated_cache_data method."""
+        validators = {"etag": "etag", "last_modified": "last_modified"}
+        with self.subTest("Test not modified"):
+            mock_get_response.return_value.status_code = 304
+            self.assertIsNone(SourceRank(Mock()).get_revalidated_cache_data(validators))
+            mock_get_response.assert_called_once_with(
+                {"If-None-Match": "etag", "If-Modified-Since": "last_modified"}
+            )
+        with self.subTest("Test modified"):
+            mock_get_response.return_value.status_code = 200
+            self.assertEqual(
+                mock_create_cache_data.return_value,
+                SourceRank(Mock()).get_revalidated_cache_data(validators),
+            )
+            mock_create_cache_data.assert_called_once_with(
+                mock_get_response.return_value
+            )
 
     @patch(
         "pip_rating.sources.sourcerank.SourceBase.is_cache_expired",
@@ -153,52 +224,43 @@ class TestSourceRank(unittest.TestCase):
             self.assertEqual(mock_breakdown, sourcerank.breakdown)
             mock_get_from_cache.assert_called_once_with()
         with self.subTest("Test cache expired"), patch(
-            "pip_rating.sources.sourcerank.SourceRank.save_to_cache"
-        ) as mock_save_to_cache:
+            "pip_rating.sources.sourcerank.SourceRank.refresh_cache_once"
+        ) as mock_refresh_cache:
             mock_is_cache_expired.return_value = True
-            mock_save_to_cache.return_value = {
+            mock_refresh_cache.return_value = {
                 "breakdown": mock_breakdown,
             }
             sourcerank = SourceRank(mock_package)
             self.assertEqual(mock_breakdown, sourcerank.breakdown)
-            mock_save_to_cache.assert_called_once_with()
+            mock_refresh_cache.assert_called_once_with()
 
-    @patch("pip_rating.sources.sourcerank.time")
-    @patch("pip_rating.sources.sourcerank.requests")
-    def test_request(self, mock_requests: MagicMock, mock_time: MagicMock):
+    @patch("pip_rating.sources.sourcerank.SourceRank.session_pool")
+    def test_request(self, mock_requests: MagicMock):
         """Test the request method."""
-        with self.subTest("Test successful request without 429 error"):
-            mock_requests.get.return_value.__enter__.return_value.status_code = 200
-            mock_requests.get.return_value.__enter__.return_value.content = (
-                SOURCERANK_PAGE
-            )
+        mock_response = mock_requests.get.return_value.__enter__.return_value
+        with self.subTest("Test successful request"):
+            mock_response.status_code = 200
+            mock_response.content = SOURCERANK_PAGE
             mock_package = Mock()
             sourcerank = SourceRank(mock_package)
             self.assertEqual(SOURCERANK_PAGE, sourcerank.request())
             mock_requests.get.assert_called_once_with(
-                f"https://libraries.io/pypi/{mock_package.real_name}/sourcerank"
+                f"https://libraries.io/pypi/{mock_package.real_name}/sourcerank",
+                headers={},
             )
+            mock_response.raise_for_status.assert_not_called()
         mock_requests.reset_mock()
-        with self.subTest("Test successful request with 429 error"):
-            mock_requests.get.return_value.__enter__.return_value.raise_for_status.side_effect = [
-                requests.HTTPError(response=Mock(status_code=429)),
-                Mock(),
-            ]
-            mock_package = Mock()
-            sourcerank = SourceRank(mock_package)
-            self.assertEqual(SOURCERANK_PAGE, sourcerank.request())
-            mock_requests.get.assert_has_calls(
-                [
-                    mock.call(
-                        f"https://libraries.io/pypi/{mock_package.real_name}/sourcerank"
-                    )
-                ]
-                * 2,
-                any_order=True,
+        with self.subTest("Test request limit still exceeded after the retries"):
+            mock_response.status_code = 429
+            mock_response.raise_for_status.side_effect = requests.HTTPError(
+                response=Mock(status_code=429)
             )
-            mock_time.sleep.assert_called_once_with(RETRY_WAIT)
+            sourcerank = SourceRank(Mock())
+            with self.assertRaises(requests.HTTPError):
+                sourcerank.request()
+            mock_requests.get.assert_called_once()
 
-    @patch("pip_rating.sources.sourcerank.requests")
+    @patch("pip_rating.sources.sourcerank.SourceRank.session_pool")
     def test_get_breakdown(self, mock_requests: MagicMock):
         """Test the get_breakdown method."""
         mock_requests.get.return_value.__enter__.return_value.content = SOURCERANK_PAGE
@@ -223,3 +285,74 @@ class TestSourceRank(unittest.TestCase):
             ],
             list(SourceRank(mock_package).get_breakdown()),
         )
+
+    @patch("pip_rating.sources.sourcerank.SourceRank.get_page_response")
+    @patch("pip_rating.sources.sourcerank.SourceRank.get_api_response")
+    def test_get_response(
+        self, mock_get_api_response: MagicMock, mock_get_page_response: MagicMock
+    ):
+        """Test the get_response method."""
+        sourcerank = SourceRank(Mock())
+        sourcerank.api_key = "api_key"
+        with self.subTest("Test API response"):
+            mock_get_api_response.return_value = Mock(ok=True)
+            self.assertEqual(
+                mock_get_api_response.return_value, sourcerank.get_response()
+            )
+            mock_get_page_response.assert_not_called()
+        with self.subTest("Test page fallback on API error"):
+            mock_get_api_response.return_value = Mock(ok=False, status_code=500)
+            self.assertEqual(
+                mock_get_page_response.return_value, sourcerank.get_response()
+            )
+        mock_get_page_response.reset_mock()
+        with self.subTest("Test page fallback on connection error"):
+            mock_get_api_response.side_effect = requests.ConnectionError
+            self.assertEqual(
+                mock_get_page_response.return_value, sourcerank.get_response()
+            )
+        mock_get_api_response.reset_mock()
+        with self.subTest("Test html backend"):
+            sourcerank = SourceRank(Mock(), "html")
+            sourcerank.api_key = "api_key"
+            self.assertEqual(
+                mock_get_page_response.return_value, sourcerank.get_response()
+            )
+            mock_get_api_response.assert_not_called()
+        with self.subTest("Test without API key"):
+            sourcerank = SourceRank(Mock())
+            sourcerank.api_key = ""
+            sourcerank.get_response()
+            mock_get_api_response.assert_not_called()
+
+    @patch("pip_rating.sources.sourcerank.SourceRank.session_pool")
+    def test_get_api_response(self, mock_session_pool: MagicMock):
+        """Test the get_api_response method."""
+        mock_package = Mock()
+        sourcerank = SourceRank(mock_package)
+        sourcerank.api_key = "api_key"
+        self.assertEqual(
+            mock_session_pool.get.return_value.__enter__.return_value,
+            sourcerank.get_api_response({"If-None-Match": "etag"}),
+        )
+        mock_session_pool.get.assert_called_once_with(
+            f"https://libraries.io/api/pypi/{mock_package.real_name}/sourcerank",
+            params={"api_key": "api_key"},
+            headers={"If-None-Match": "etag"},
+        )
+
+    def test_get_api_breakdown(self):
+        """Test the get_breakdown method with an API response."""
+        content = (
+            b'{"basic_info_present": 1, "repository_present": 1, "readme_present": 1,'
+            b' "license_present": 1, "versions_present": 1, "follows_semver": 0,'
+            b' "recent_release": 1, "not_brand_new": 1, "one_point_oh": 1,'
+            b' "dependent_projects": 10, "dependent_repositories": 5, "stars": 5,'
+            b' "contributors": 2, "subscribers": 2, "is_deprecated": -5}'
+        )
+        breakdown = dict(SourceRank(Mock()).get_breakdown(content))
+        self.assertEqual(set(BREAKDOWN_MAPPING.values()), set(breakdown))
+        self.assertEqual(1, breakdown["source_repository_present"])
+        self.assertEqual(1, breakdown["is_1_or_greater"])
+        self.assertEqual(2, breakdown["librariesio_subscribers"])
+        self.assertEqual(27, breakdown["total"])
@@ -0,0 +1,49 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from click.testing import CliRunner
+
+from _action import action
+
+
+class TestAction(unittest.TestCase):
+    """Test the action command of the GitHub Action."""
+
+    @patch("_action.finish_cache")
+    @patch("_action.configure_cache")
+    @patch("_action.Results")
+    @patch("_action.Dependencies")
+    @patch("_action.get_req_file_cls")
+    def test_action(
+        self,
+        mock_get_req_file_cls: MagicMock,
+        mock_dependencies: MagicMock,
+        mock_results: MagicMock,
+        mock_configure_cache: MagicMock,
+        mock_finish_cache: MagicMock,
+    ):
+        """Test the action command."""
+        result = CliRunner().invoke(
+            action,
+            [
+                "--file",
+                "requirements.txt",
+                "--sourcerank-backend",
+                "html",
+                "--refresh-resolution",
+                "--incremental",
+            ],
+            catch_exceptions=False,
+        )
+        self.assertEqual(0, result.exit_code)
+        mock_configure_cache.assert_called_once()
+        self.assertEqual(
+            "html", mock_dependencies.call_args.kwargs["sourcerank_backend"]
+        )
+        self.assertTrue(mock_dependencies.call_args.kwargs["refresh_resolution"])
+        self.assertTrue(mock_dependencies.call_args.kwargs["incremental"])
+        mock_results.return_value.show_results.assert_called_once_with(
+            mock_dependencies.return_value, "text"
+        )
+        mock_dependencies.return_value.save_previous_resolution.assert_called_once()
+        mock_finish_cache.assert_called_once()
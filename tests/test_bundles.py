@@ -0,0 +1,103 @@
+import datetime
+import tarfile
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from pip_rating.bundles import (
+    ENTRIES_NAME,
+    INDEX_NAME,
+    export_bundle,
+    get_items,
+    import_bundle,
+    read_bundle,
+)
+from pip_rating.cache import CacheItem, SqliteCacheBackend
+from pip_rating.exceptions import RequirementsRatingInvalidBundle
+
+
+class TestBundles(unittest.TestCase):
+    """Test the bundles functions."""
+
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "bundle.tar.gz"
+        self.backend = SqliteCacheBackend(Path(self.temp_dir.name) / "cache")
+        self.updated_at = datetime.datetime(2023, 1, 1)
+        self.backend.set("pypi", "package", "", {"key": "value"}, self.updated_at)
+        self.backend.set("audit", "package", "1.0.0", {"key": "audit"})
+
+    def tearDown(self):
+        self.backend.close()
+        self.temp_dir.cleanup()
+
+    def test_get_items(self):
+        """Test the get_items function."""
+        with self.subTest("Test all the items"):
+            items = get_items(self.backend)
+            self.assertEqual(
+                [("audit", "package", "1.0.0"), ("pypi", "package", "")],
+                sorted(item.key for item in items),
+            )
+        with self.subTest("Test cache keys"):
+            items = get_items(
+                self.backend,
+                [
+                    ("pypi", "package", ""),
+                    ("pypi", "package", ""),
+                    ("pypi", "other", ""),
+                ],
+            )
+            self.assertEqual(
+                [CacheItem(("pypi", "package", ""), self.updated_at, {"key": "value"})],
+                items,
+            )
+
+    def test_export_bundle(self):
+        """Test the export_bundle function."""
+        index = export_bundle(self.path, get_items(self.backend))
+        self.assertEqual(2, index["entries"])
+        self.assertEqual({"audit": 1, "pypi": 1}, index["sources"])
+        with tarfile.open(str(self.path)) as archive:
+            self.assertEqual([INDEX_NAME, ENTRIES_NAME], archive.getnames())
+        self.assertEqual(
+            [self.path.name], [p.name for p in self.path.parent.glob("*.*")]
+        )
+
+    def test_read_bundle(self):
+        """Test the read_bundle function."""
+        items = get_items(self.backend, [("pypi", "package", "")])
+        export_bundle(self.path, items)
+        with self.subTest("Test valid bundle"):
+            index, read_items = read_bundle(self.path)
+            self.assertEqual(1, index["entries"])
+            self.assertEqual(items, read_items)
+        with self.subTest("Test invalid bundle"), self.assertRaises(
+            RequirementsRatingInvalidBundle
+        ):
+            self.path.write_bytes(b"invalid")
+            read_bundle(self.path)
+
+    def test_import_bundle(self):
+        """Test the import_bundle function."""
+        export_bundle(self.path, get_items(self.backend))
+        backend = SqliteCacheBackend(Path(self.temp_dir.name) / "other")
+        try:
+            backend.set("pypi", "package", "", {"key": "newer"})
+            with self.subTest("Test keep newer entries"):
+                items = import_bundle(self.path, backend)
+                self.assertEqual(
+                    [("audit", "package", "1.0.0")], [i.key for i in items]
+                )
+                self.assertEqual({"key": "newer"}, backend.get("pypi", "package"))
+                self.assertEqual(
+                    {"key": "audit"}, backend.get("audit", "package", "1.0.0")
+                )
+            with self.subTest("Test overwrite"):
+                self.assertEqual(2, len(import_bundle(self.path, backend, True)))
+                self.assertEqual({"key": "value"}, backend.get("pypi", "package"))
+                self.assertEqual(
+                    self.updated_at, backend.get_updated_at("pypi", "package")
+                )
+        finally:
+            backend.close()
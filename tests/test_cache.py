@@ -0,0 +1,623 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch, Mock
+
+from pip_rating.sessions import SessionPool
+
+from pip_rating.cache import (
+    BackgroundRefresher,
+    CacheItem,
+    CachePolicy,
+    FileCacheBackend,
+    RemoteCacheBackend,
+    SingleFlight,
+    SqliteCacheBackend,
+    set_cache_backend,
+    get_cache_backend,
+    parse_size,
+    prune_cache,
+)
+
+
+class CacheBackendTestMixin:
+    """Tests shared by all the cache backends."""
+
+    backend_class = None
+
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.backend = self.backend_class(Path(self.temp_dir.name))
+
+    def tearDown(self):
+        self.backend.close()
+        self.temp_dir.cleanup()
+
+    def test_get(self):
+        """Test the get method."""
+        with self.subTest("Test missing entry"):
+            self.assertIsNone(self.backend.get("source", "package", ""))
+        with self.subTest("Test existing entry"):
+            self.backend.set("source", "package", "", {"key": "value"})
+            self.assertEqual({"key": "value"}, self.backend.get("source", "package"))
+        with self.subTest("Test versioned entry"):
+            self.backend.set("source", "package", "1.0.0", {"key": "other"})
+            self.assertEqual(
+                {"key": "other"}, self.backend.get("source", "package", "1.0.0")
+            )
+            self.assertEqual({"key": "value"}, self.backend.get("source", "package"))
+
+    def test_delete(self):
+        """Test the delete method."""
+        self.backend.set("source", "package", "", {"key": "value"})
+        self.backend.delete("source", "package")
+        self.assertIsNone(self.backend.get("source", "package"))
+        self.assertIsNone(self.backend.get_updated_at("source", "package"))
+        self.backend.delete("source", "package")
+
+    def test_touch(self):
+        """Test the touch method."""
+        max_age = datetime.timedelta(hours=1)
+        self.backend.touch("source", "package")
+        self.assertIsNone(self.backend.get_updated_at("source", "package"))
+        self.backend.set("source", "package", "", {"key": "value"})
+        timestamp = (datetime.datetime.now() - 2 * max_age).timestamp()
+        if isinstance(self.backend, FileCacheBackend):
+            os.utime(self.backend.get_path("source", "package"), (timestamp, timestamp))
+        else:
+            self.backend.get_all_updated_at()[("source", "package", "")] = timestamp
+        self.assertTrue(self.backend.is_expired("source", "package", "", max_age))
+        self.backend.touch("source", "package")
+        self.assertFalse(self.backend.is_expired("source", "package", "", max_age))
+        self.assertEqual({"key": "value"}, self.backend.get("source", "package"))
+
+    def test_is_expired(self):
+        """Test the is_expired method."""
+        max_age = datetime.timedelta(days=1)
+        with self.subTest("Test missing entry"):
+            self.assertTrue(self.backend.is_expired("source", "package", "", max_age))
+        self.backend.set("source", "package", "", {"key": "value"})
+        with self.subTest("Test fresh entry"):
+            self.assertFalse(self.backend.is_expired("source", "package", "", max_age))
+        with self.subTest("Test expired entry"):
+            self.assertTrue(
+                self.backend.is_expired(
+                    "source", "package", "", datetime.timedelta(seconds=-1)
+                )
+            )
+
+    def set_accessed_at(self, name: str, accessed_at: datetime.datetime):
+        raise NotImplementedError
+
+    def corrupt(self, name: str):
+        raise NotImplementedError
+
+    def test_get_corrupted(self):
+        """Test the corrupted entries are deleted."""
+        self.backend.set("source", "package", "", {"key": "value"})
+        self.corrupt("package")
+        self.assertIsNone(self.backend.get("source", "package"))
+        self.assertIsNone(self.backend.get_updated_at("source", "package"))
+
+    def test_lock(self):
+        """Test the lock method."""
+        with self.backend.lock("source", "package") as locked:
+            self.assertTrue(locked)
+            other_backend = self.backend_class(Path(self.temp_dir.name))
+            with other_backend.lock("source", "package", timeout=0.1) as other_locked:
+                self.assertFalse(other_locked)
+            with other_backend.lock("source", "other", timeout=0.1) as other_locked:
+                self.assertTrue(other_locked)
+        with other_backend.lock("source", "package", timeout=0.1) as other_locked:
+            self.assertTrue(other_locked)
+        other_backend.close()
+
+    def test_prune_locks(self):
+        """Test the prune_locks method."""
+        with self.backend.lock("source", "package"):
+            pass
+        path = self.backend.get_lock_path("source", "package")
+        self.backend.prune_locks(datetime.timedelta(days=1))
+        self.assertTrue(path.exists())
+        self.backend.prune_locks(datetime.timedelta(seconds=-1))
+        self.assertFalse(path.exists())
+
+    def test_set_updated_at(self):
+        """Test the set method with an update time."""
+        updated_at = datetime.datetime(2023, 1, 1, 12, 30)
+        self.backend.set("source", "package", "1.0.0", {"key": "value"}, updated_at)
+        self.assertEqual(
+            updated_at, self.backend.get_updated_at("source", "package", "1.0.0")
+        )
+
+    def test_items(self):
+        """Test the get_item and set_items methods."""
+        updated_at = datetime.datetime(2023, 1, 1)
+        items = [
+            CacheItem(("source", "package", ""), updated_at, {"key": "value"}),
+            CacheItem(("source", "package", "1.0.0"), updated_at, {"key": "other"}),
+        ]
+        self.backend.set_items(items)
+        self.assertEqual(
+            items,
+            sorted(map(self.backend.get_item, self.backend.get_entries())),
+        )
+
+    def test_get_entries(self):
+        """Test the get_entries method."""
+        self.assertEqual([], self.backend.get_entries())
+        self.backend.set("source", "package", "", {"key": "value"})
+        self.backend.set("other", "package", "1.0.0", {"key": "value"})
+        entries = sorted(self.backend.get_entries())
+        self.assertEqual(["other", "source"], [entry.source for entry in entries])
+        self.assertTrue(all(entry.size >= 16 for entry in entries))
+
+    def test_prune(self):
+        """Test the prune method."""
+        now = datetime.datetime.now()
+        for i in range(3):
+            self.backend.set("source", f"package{i}", "", {"key": "value"})
+            self.set_accessed_at(f"package{i}", now - datetime.timedelta(days=i))
+        with self.subTest("Test without limits"):
+            self.assertEqual([], self.backend.prune())
+        with self.subTest("Test max size"):
+            size = self.backend.get_entries()[0].size
+            deleted = self.backend.prune(max_size=2 * size)
+            self.assertEqual(1, len(deleted))
+            self.assertIsNone(self.backend.get("source", "package2"))
+            self.assertIsNotNone(self.backend.get_updated_at("source", "package0"))
+        with self.subTest("Test older than"):
+            self.set_accessed_at("package1", now - datetime.timedelta(days=2))
+            deleted = self.backend.prune(older_than=datetime.timedelta(days=1))
+            self.assertEqual(1, len(deleted))
+            self.assertIsNone(self.backend.get_updated_at("source", "package1"))
+            self.assertEqual({"key": "value"}, self.backend.get("source", "package0"))
+
+
+class TestFileCacheBackend(CacheBackendTestMixin, unittest.TestCase):
+    """Test the FileCacheBackend class."""
+
+    backend_class = FileCacheBackend
+
+    def test_get_path(self):
+        """Test the get_path method."""
+        cache_dir = Path(self.temp_dir.name)
+        with self.subTest("Test without version"):
+            self.assertEqual(
+                cache_dir / "source" / "package.json",
+                self.backend.get_path("source", "package"),
+            )
+        with self.subTest("Test with version"):
+            self.assertEqual(
+                cache_dir
+                / "source"
+                / "package_91e95be6b6634e3c21072dfcd661146728694326.json",
+                self.backend.get_path("source", "package", "1.0.0"),
+            )
+
+    def set_accessed_at(self, name: str, accessed_at: datetime.datetime):
+        path = self.backend.get_path("source", name)
+        os.utime(path, (accessed_at.timestamp(), path.stat().st_mtime))
+
+    def corrupt(self, name: str):
+        self.backend.get_path("source", name).write_text('{"cache_key": ["sour')
+
+    def test_get_item_legacy(self):
+        """Test the get_item method with the files of older versions."""
+        path = self.backend.get_path("source", "package")
+        path.parent.mkdir()
+        path.write_text('{"key": "value"}')
+        versioned_path = self.backend.get_path("source", "package", "1.0.0")
+        versioned_path.write_text('{"key": "other"}')
+        self.assertEqual({"key": "value"}, self.backend.get("source", "package"))
+        items = list(
+            filter(None, map(self.backend.get_item, self.backend.get_entries()))
+        )
+        self.assertEqual([("source", "package", "")], [item.key for item in items])
+
+    def test_get_access_time(self):
+        """Test the get method updates the access time."""
+        self.backend.set("source", "package", "", {"key": "value"})
+        accessed_at = datetime.datetime.now() - datetime.timedelta(days=1)
+        self.set_accessed_at("package", accessed_at)
+        self.backend.get("source", "package")
+        self.assertGreater(self.backend.get_entries()[0].accessed_at, accessed_at)
+
+
+class TestSqliteCacheBackend(CacheBackendTestMixin, unittest.TestCase):
+    """Test the SqliteCacheBackend class."""
+
+    backend_class = SqliteCacheBackend
+
+    def test_get_all_updated_at(self):
+        """Test the get_all_updated_at method."""
+        self.backend.set("source", "package", "", {"key": "value"})
+        self.backend.close()
+        backend = SqliteCacheBackend(Path(self.temp_dir.name))
+        try:
+            self.assertEqual(
+                [("source", "package", "")], list(backend.get_all_updated_at())
+            )
+        finally:
+            backend.close()
+
+    def test_database_path(self):
+        """Test the database_path property."""
+        self.assertEqual(
+            Path(self.temp_dir.name) / "cache.sqlite3", self.backend.database_path
+        )
+
+    def set_accessed_at(self, name: str, accessed_at: datetime.datetime):
+        with self.backend.connection:
+            self.backend.connection.execute(
+                "UPDATE entries SET accessed_at = ? WHERE name = ?",
+                (accessed_at.timestamp(), name),
+            )
+
+    def corrupt(self, name: str):
+        with self.backend.connection:
+            self.backend.connection.execute(
+                "UPDATE entries SET data = '{\"key' WHERE name = ?", (name,)
+            )
+
+    def test_reload(self):
+        """Test the reload method."""
+        self.backend.get_all_updated_at()
+        other_backend = SqliteCacheBackend(Path(self.temp_dir.name))
+        try:
+            other_backend.set("source", "package", "", {"key": "value"})
+            self.assertIsNone(self.backend.get_updated_at("source", "package"))
+            self.backend.reload("source", "package")
+            self.assertIsNotNone(self.backend.get_updated_at("source", "package"))
+            other_backend.delete("source", "package")
+            self.backend.reload("source", "package")
+            self.assertIsNone(self.backend.get_updated_at("source", "package"))
+        finally:
+            other_backend.close()
+
+    def test_flush_accessed_at(self):
+        """Test the flush_accessed_at method."""
+        self.backend.set("source", "package", "", {"key": "value"})
+        accessed_at = datetime.datetime.now() - datetime.timedelta(days=1)
+        self.set_accessed_at("package", accessed_at)
+        self.backend.get("source", "package")
+        query = "SELECT accessed_at FROM entries"
+        self.assertEqual(
+            accessed_at.timestamp(),
+            self.backend.connection.execute(query).fetchone()[0],
+        )
+        self.backend.flush_accessed_at()
+        self.assertGreater(
+            self.backend.connection.execute(query).fetchone()[0],
+            accessed_at.timestamp(),
+        )
+
+    def test_connection_migration(self):
+        """Test the accessed_at column is added to the old databases."""
+        connection = sqlite3.connect(str(self.backend.database_path))
+        connection.execute(
+            "CREATE TABLE entries (source TEXT NOT NULL, name TEXT NOT NULL, "
+            "version TEXT NOT NULL, updated_at REAL NOT NULL, data TEXT NOT NULL, "
+            "PRIMARY KEY (source, name, version))"
+        )
+        connection.execute(
+            "INSERT INTO entries VALUES ('source', 'package', '', 1000, '{}')"
+        )
+        connection.commit()
+        connection.close()
+        self.assertEqual(
+            datetime.datetime.fromtimestamp(1000),
+            self.backend.get_entries()[0].accessed_at,
+        )
+
+
+class RemoteStoreHandler(BaseHTTPRequestHandler):
+    """Stand-in remote store that keeps the uploaded entries in memory."""
+
+    store = {}
+
+    def do_GET(self):
+        if self.path not in self.store:
+            self.send_response(404)
+            self.end_headers()
+            return
+        content = self.store[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_PUT(self):
+        if self.headers.get("Authorization") != "Bearer token":
+            self.send_response(403)
+        else:
+            length = int(self.headers["Content-Length"])
+            self.store[self.path] = self.rfile.read(length)
+            self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestRemoteCacheBackend(unittest.TestCase):
+    """Test the RemoteCacheBackend class."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), RemoteStoreHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/cache/"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        RemoteStoreHandler.store.clear()
+        self.temp_dir = TemporaryDirectory()
+        self.pool = SessionPool(retries=0)
+        self.backend = self.get_backend("runner1")
+
+    def tearDown(self):
+        self.backend.close()
+        self.pool.close()
+        self.temp_dir.cleanup()
+
+    def get_backend(self, name: str, **kwargs) -> RemoteCacheBackend:
+        local = SqliteCacheBackend(Path(self.temp_dir.name) / name)
+        return RemoteCacheBackend(local, self.url, "token", pool=self.pool, **kwargs)
+
+    def test_get_url(self):
+        """Test the get_url method."""
+        self.assertEqual(
+            f"{self.url}source/package/_.json",
+            self.backend.get_url("source", "package"),
+        )
+        self.assertEqual(
+            f"{self.url}source/package/1.0%2Blocal.json",
+            self.backend.get_url("source", "package", "1.0+local"),
+        )
+
+    def test_set(self):
+        """Test the set method uploads the entry."""
+        self.backend.set("source", "package", "1.0.0", {"key": "value"})
+        self.assertEqual(
+            {"key": "value"}, self.backend.local.get("source", "package", "1.0.0")
+        )
+        content = json.loads(
+            RemoteStoreHandler.store["/cache/source/package/1.0.0.json"]
+        )
+        self.assertEqual({"key": "value"}, content["data"])
+
+    def test_shared_entries(self):
+        """Test the entries of a runner are used by another runner."""
+        self.backend.set("source", "package", "", {"key": "value"})
+        other_backend = self.get_backend("runner2")
+        try:
+            max_age = datetime.timedelta(days=1)
+            self.assertFalse(other_backend.is_expired("source", "package", "", max_age))
+            self.assertEqual({"key": "value"}, other_backend.get("source", "package"))
+            self.assertEqual(
+                self.backend.get_updated_at("source", "package"),
+                other_backend.get_updated_at("source", "package"),
+            )
+        finally:
+            other_backend.close()
+
+    def test_pull(self):
+        """Test the pull method."""
+        with self.subTest("Test missing remote entry"):
+            self.assertIsNone(self.backend.get("source", "package"))
+        with self.subTest("Test local entry is newer"):
+            old_backend = self.get_backend("runner2")
+            old_backend.set(
+                "source", "other", "", {"key": "old"}, datetime.datetime(2023, 1, 1)
+            )
+            old_backend.close()
+            self.backend.local.set("source", "other", "", {"key": "new"})
+            self.backend.pull("source", "other")
+            self.assertEqual({"key": "new"}, self.backend.get("source", "other"))
+        with self.subTest("Test offline"):
+            self.pool.offline = True
+            self.backend.pull("source", "offline")
+            self.assertNotIn(("source", "offline", ""), self.backend._pulled)
+
+    def test_remote_errors(self):
+        """Test the remote errors are ignored."""
+        with self.subTest("Test forbidden upload"):
+            backend = RemoteCacheBackend(
+                self.backend.local, self.url, "invalid", pool=self.pool
+            )
+            backend.set("source", "package", "", {"key": "value"})
+            self.assertEqual({}, RemoteStoreHandler.store)
+        with self.subTest("Test unavailable remote store"):
+            backend = RemoteCacheBackend(
+                self.backend.local, "http://127.0.0.1:1", pool=self.pool
+            )
+            self.assertIsNone(backend.get("source", "missing"))
+
+    def test_read_only(self):
+        """Test the entries are not uploaded in read only mode."""
+        backend = self.get_backend("runner2", read_only=True)
+        try:
+            backend.set("source", "package", "", {"key": "value"})
+            self.assertEqual({}, RemoteStoreHandler.store)
+        finally:
+            backend.close()
+
+    def test_touch(self):
+        """Test the touch method uploads the revalidated entry."""
+        self.backend.local.set(
+            "source", "package", "", {"key": "value"}, datetime.datetime(2023, 1, 1)
+        )
+        self.backend.touch("source", "package")
+        content = json.loads(RemoteStoreHandler.store["/cache/source/package/_.json"])
+        self.assertGreater(
+            content["updated_at"], datetime.datetime(2023, 1, 1).timestamp()
+        )
+
+
+class TestCacheBackend(unittest.TestCase):
+    """Test the cache backend functions."""
+
+    @patch("pip_rating.cache._cache_backend", None)
+    @patch("pip_rating.cache.DEFAULT_CACHE_BACKEND", "file")
+    def test_get_cache_backend(self):
+        """Test the get_cache_backend function."""
+        backend = get_cache_backend()
+        self.assertIsInstance(backend, FileCacheBackend)
+        self.assertIs(backend, get_cache_backend())
+
+    @patch("pip_rating.cache._cache_backend", None)
+    @patch("pip_rating.cache.DEFAULT_CACHE_BACKEND", "file")
+    @patch("pip_rating.cache.REMOTE_CACHE_URL", "http://localhost/cache")
+    def test_get_cache_backend_remote(self):
+        """Test the get_cache_backend function with a remote cache."""
+        backend = get_cache_backend()
+        self.assertIsInstance(backend, RemoteCacheBackend)
+        self.assertIsInstance(backend.local, FileCacheBackend)
+
+    @patch("pip_rating.cache._cache_backend", None)
+    def test_set_cache_backend(self):
+        """Test the set_cache_backend function."""
+        mock_backend = Mock()
+        mock_other_backend = Mock()
+        set_cache_backend(mock_backend)
+        self.assertIs(mock_backend, get_cache_backend())
+        set_cache_backend(mock_other_backend)
+        mock_backend.close.assert_called_once_with()
+        self.assertIs(mock_other_backend, get_cache_backend())
+
+
+class TestPruneCache(unittest.TestCase):
+    """Test the cache pruning functions."""
+
+    def test_parse_size(self):
+        """Test the parse_size function."""
+        for value, expected in [
+            ("1024", 1024),
+            ("500K", 500 * 1024),
+            ("200MB", 200 * 1024**2),
+            ("1.5GiB", int(1.5 * 1024**3)),
+            ("0", 0),
+        ]:
+            with self.subTest(value=value):
+                self.assertEqual(expected, parse_size(value))
+        for value in ["", "MB", "-1", "ten"]:
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_size(value)
+
+    @patch("pip_rating.cache.get_cache_backend")
+    def test_prune_cache(self, mock_get_cache_backend: Mock):
+        """Test the prune_cache function."""
+        with self.subTest("Test with limits"), patch(
+            "pip_rating.cache.MAX_CACHE_SIZE", "1K"
+        ), patch("pip_rating.cache.MAX_CACHE_AGE_DAYS", 10):
+            self.assertEqual(
+                mock_get_cache_backend.return_value.prune.return_value, prune_cache()
+            )
+            mock_get_cache_backend.return_value.prune.assert_called_once_with(
+                1024, datetime.timedelta(days=10)
+            )
+        mock_get_cache_backend.reset_mock()
+        with self.subTest("Test disabled"), patch(
+            "pip_rating.cache.MAX_CACHE_SIZE", "0"
+        ), patch("pip_rating.cache.MAX_CACHE_AGE_DAYS", 0):
+            self.assertEqual([], prune_cache())
+            mock_get_cache_backend.assert_not_called()
+
+
+class TestCachePolicy(unittest.TestCase):
+    """Test the CachePolicy class."""
+
+    def test_init(self):
+        """Test the __init__ method."""
+        with self.subTest("Test valid policy"):
+            cache_policy = CachePolicy(
+                "stale-while-revalidate", datetime.timedelta(days=1)
+            )
+            self.assertTrue(cache_policy.stale_while_revalidate)
+            self.assertEqual(datetime.timedelta(days=1), cache_policy.max_staleness)
+        with self.subTest("Test default policy"):
+            self.assertFalse(CachePolicy("default").stale_while_revalidate)
+        with self.subTest("Test invalid policy"), self.assertRaises(ValueError):
+            CachePolicy("invalid")
+
+
+class TestBackgroundRefresher(unittest.TestCase):
+    """Test the BackgroundRefresher class."""
+
+    def test_submit(self):
+        """Test the submit method."""
+        background_refresher = BackgroundRefresher(max_workers=1)
+        mock_function = Mock()
+        with self.subTest("Test new cache keys"):
+            future = background_refresher.submit(
+                [("source", "package", "")], mock_function
+            )
+            self.assertIsNotNone(future)
+        with self.subTest("Test cache keys already submitted"):
+            self.assertIsNone(
+                background_refresher.submit([("source", "package", "")], Mock())
+            )
+        background_refresher.wait()
+        mock_function.assert_called_once_with()
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test the SingleFlight class."""
+
+    def test_do(self):
+        """Test the do method."""
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def function():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"key": "value"}
+
+        results = []
+        leader = threading.Thread(
+            target=lambda: results.append(single_flight.do("key", function))
+        )
+        leader.start()
+        started.wait(5)
+        # The leader is blocked until the release, so this call waits for it
+        threading.Timer(0.2, release.set).start()
+        results.append(single_flight.do("key", function))
+        leader.join(5)
+        self.assertEqual([{"key": "value"}, {"key": "value"}], results)
+        self.assertEqual(1, len(calls))
+        self.assertEqual({}, single_flight.calls)
+        with self.subTest("Test call after completion"):
+            self.assertEqual({"key": "value"}, single_flight.do("key", function))
+            self.assertEqual(2, len(calls))
+
+    def test_do_exception(self):
+        """Test the exception is raised to the caller."""
+        single_flight = SingleFlight()
+        with self.assertRaises(ValueError):
+            single_flight.do("key", Mock(side_effect=ValueError))
+        self.assertEqual({}, single_flight.calls)
+
+    def test_do_nested(self):
+        """Test the nested calls for the same key do not wait for themselves."""
+        single_flight = SingleFlight()
+        self.assertEqual(
+            "value",
+            single_flight.do("key", lambda: single_flight.do("key", lambda: "value")),
+        )
@@ -1,6 +1,11 @@
 import setuptools  # noqa: F401
+import os
 import unittest
-from unittest.mock import patch, MagicMock, Mock
+from unittest.mock import call, patch, MagicMock, Mock, PropertyMock
+
+from anytree import Node
+from pipgrip.libs.mixology.failure import SolverFailure
+from pipgrip.libs.mixology.result import SolverResult
 
 from pip_rating.dependencies import (
     DependenciesVersionSolver,
@@ -8,6 +13,8 @@ from pip_rating.dependencies import (
     version_resolver_threads,
 )
 from pip_rating.packages import Package
+from pip_rating.req_files.base import LockedPackage
+from pip_rating.resolution import get_previous_resolution_key, tree_to_dict
 
 
 class TestDependenciesVersionSolver(unittest.TestCase):
@@ -63,6 +70,9 @@ class TestDependencies(unittest.TestCase):
             extra_index_url,
             pre,
             ignore_packages,
+            sourcerank_backend="html",
+            refresh_resolution=True,
+            incremental=True,
         )
         self.assertEqual(mock_results, dependencies.results)
         self.assertEqual(mock_req_file, dependencies.req_file)
@@ -71,8 +81,11 @@ class TestDependencies(unittest.TestCase):
         self.assertEqual(extra_index_url, dependencies.extra_index_url)
         self.assertEqual(pre, dependencies.pre)
         self.assertEqual(ignore_packages, dependencies.ignore_packages)
+        self.assertEqual("html", dependencies.sourcerank_backend)
+        self.assertTrue(dependencies.refresh_resolution)
+        self.assertTrue(dependencies.incremental)
 
-    @patch("pip_rating.dependencies.PackageSource")
+    @patch("pip_rating.dependencies.MetadataPackageSource")
     def test_package_source(self, mock_package_source: MagicMock):
         """Test the method package_source."""
         mock_results = Mock()
@@ -99,6 +112,27 @@ class TestDependencies(unittest.TestCase):
             pre=pre,
         )
 
+    @patch.dict(
+        "pip_rating.dependencies.os.environ", {"PIP_FIND_LINKS": "links"}, clear=True
+    )
+    @patch("pip_rating.dependencies.get_cache_policy")
+    def test_configure_pip(self, mock_get_cache_policy: MagicMock):
+        """Test the method configure_pip."""
+        dependencies = Dependencies(Mock(), Mock(), "cache_dir")
+        with self.subTest("Test online"):
+            mock_get_cache_policy.return_value.offline = False
+            with dependencies.configure_pip():
+                self.assertEqual({"PIP_FIND_LINKS": "links"}, dict(os.environ))
+        with self.subTest("Test offline"):
+            mock_get_cache_policy.return_value.offline = True
+            with dependencies.configure_pip():
+                self.assertEqual(
+                    {"PIP_NO_INDEX": "1", "PIP_FIND_LINKS": "cache_dir"},
+                    dict(os.environ),
+                )
+            # The previous environment is restored
+            self.assertEqual({"PIP_FIND_LINKS": "links"}, dict(os.environ))
+
     @patch("pip_rating.dependencies.Dependencies.package_source")
     @patch("pip_rating.dependencies.DependenciesVersionSolver")
     def test_version_solution(
@@ -153,14 +187,22 @@ class TestDependencies(unittest.TestCase):
             with self.assertRaises(RuntimeError):
                 dependencies.version_solution  # noqa
 
+    @patch("pip_rating.dependencies.set_cached_tree")
+    @patch("pip_rating.dependencies.get_cached_tree", return_value=None)
+    @patch("pip_rating.dependencies.get_resolution_key")
     @patch("pip_rating.dependencies.build_tree")
     @patch("pip_rating.dependencies.Dependencies.version_solution")
     def test_dependencies_tree(
-        self, mock_version_solution: MagicMock, mock_build_tree: MagicMock
+        self,
+        mock_version_solution: MagicMock,
+        mock_build_tree: MagicMock,
+        mock_get_resolution_key: MagicMock,
+        mock_get_cached_tree: MagicMock,
+        mock_set_cached_tree: MagicMock,
     ):
         """Test the method dependencies_tree."""
         mock_results = Mock()
-        mock_req_file = Mock()
+        mock_req_file = Mock(**{"get_locked_packages.return_value": None})
         mock_tree_root = Mock()
         mock_packages_tree_dict = Mock()
         mock_packages_flat = Mock()
@@ -181,6 +223,282 @@ class TestDependencies(unittest.TestCase):
             dependencies.package_source,
             {packages_versions[0][0]: packages_versions[0][1]},
         )
+        mock_get_resolution_key.assert_called_once_with(
+            mock_req_file, None, None, False
+        )
+        mock_get_cached_tree.assert_called_once_with(
+            mock_get_resolution_key.return_value
+        )
+        # The partial solutions are not cached
+        mock_set_cached_tree.assert_not_called()
+
+    @patch("pip_rating.dependencies.set_cached_tree")
+    @patch("pip_rating.dependencies.get_cached_tree")
+    @patch("pip_rating.dependencies.get_resolution_key")
+    @patch("pip_rating.dependencies.build_tree")
+    @patch("pip_rating.dependencies.Dependencies.version_solution")
+    def test_get_resolved_tree(
+        self,
+        mock_version_solution: MagicMock,
+        mock_build_tree: MagicMock,
+        mock_get_resolution_key: MagicMock,
+        mock_get_cached_tree: MagicMock,
+        mock_set_cached_tree: MagicMock,
+    ):
+        """Test the method get_resolved_tree."""
+        mock_version_solution.__class__ = SolverResult
+        mock_version_solution.decisions.items.return_value = []
+        mock_tree_root = Mock()
+        mock_build_tree.return_value = [mock_tree_root, Mock(), Mock()]
+        with self.subTest("Test cached resolution"):
+            dependencies = Dependencies(Mock(), ["package"])
+            self.assertEqual(
+                mock_get_cached_tree.return_value, dependencies.get_resolved_tree()
+            )
+            mock_build_tree.assert_not_called()
+        with self.subTest("Test refresh resolution"):
+            dependencies = Dependencies(Mock(), ["package"], refresh_resolution=True)
+            self.assertEqual(mock_tree_root, dependencies.get_resolved_tree())
+            mock_set_cached_tree.assert_called_once_with(
+                mock_get_resolution_key.return_value, mock_tree_root
+            )
+
+    @patch("pip_rating.dependencies.Dependencies.get_solution_tree")
+    @patch("pip_rating.dependencies.Dependencies.solve")
+    @patch("pip_rating.dependencies.Dependencies.create_package_source")
+    def test_get_incremental_tree(
+        self,
+        mock_create_package_source: MagicMock,
+        mock_solve: MagicMock,
+        mock_get_solution_tree: MagicMock,
+    ):
+        """Test the method get_incremental_tree."""
+        previous_tree = Node("__root__")
+        flask = Node("flask", parent=previous_tree, version="3.0.0", pip_string="Flask")
+        Node("click", parent=flask, version="8.1.0", pip_string="click>=8.0")
+        requests = Node(
+            "requests", parent=previous_tree, version="2.0.0", pip_string="requests"
+        )
+        Node("idna", parent=requests, version="3.0", pip_string="idna")
+        for node in previous_tree.descendants:
+            node.extras = frozenset()
+        mock_package_source = mock_create_package_source.return_value
+        mock_solve.return_value = Mock(spec=SolverResult)
+        dependencies = Dependencies(Mock(), ["flask", "requests>=2.30"])
+        dependencies.previous_resolution = {
+            "requirements": ["flask", "requests"],
+            "tree": tree_to_dict(previous_tree),
+            "ratings": {},
+        }
+        with self.subTest("Test incremental tree"):
+            self.assertEqual(
+                mock_get_solution_tree.return_value,
+                dependencies.get_incremental_tree(),
+            )
+            # Only the packages not affected by the changed requirement are seeded
+            self.assertEqual(
+                [
+                    call("flask", frozenset(), "3.0.0", ["click>=8.0"]),
+                    call("click", frozenset(), "8.1.0", []),
+                ],
+                mock_package_source.seed.mock_calls,
+            )
+            self.assertEqual(
+                {
+                    "flask": "3.0.0",
+                    "click": "8.1.0",
+                    "requests": "2.0.0",
+                    "idna": "3.0",
+                },
+                mock_package_source.preferred_versions,
+            )
+            mock_solve.assert_called_once_with(mock_package_source)
+        with self.subTest("Test incompatible changes"):
+            mock_solve.side_effect = SolverFailure(Mock())
+            self.assertIsNone(dependencies.get_incremental_tree())
+
+    @patch("pip_rating.dependencies.set_cached_tree")
+    @patch("pip_rating.dependencies.get_cached_tree", return_value=None)
+    @patch("pip_rating.dependencies.get_resolution_key")
+    @patch("pip_rating.dependencies.Dependencies.get_solution_tree")
+    @patch("pip_rating.dependencies.Dependencies.version_solution")
+    @patch("pip_rating.dependencies.Dependencies.get_incremental_tree")
+    def test_get_resolved_tree_incremental(
+        self,
+        mock_get_incremental_tree: MagicMock,
+        mock_version_solution: MagicMock,
+        mock_get_solution_tree: MagicMock,
+        mock_get_resolution_key: MagicMock,
+        mock_get_cached_tree: MagicMock,
+        mock_set_cached_tree: MagicMock,
+    ):
+        """Test the method get_resolved_tree in incremental mode."""
+        dependencies = Dependencies(Mock(), ["package"])
+        dependencies.previous_resolution = Mock()
+        with self.subTest("Test incremental resolution"):
+            self.assertEqual(
+                mock_get_incremental_tree.return_value,
+                dependencies.get_resolved_tree(),
+            )
+            mock_set_cached_tree.assert_called_once_with(
+                mock_get_resolution_key.return_value,
+                mock_get_incremental_tree.return_value,
+            )
+            mock_get_solution_tree.assert_not_called()
+        with self.subTest("Test full resolution fallback"):
+            mock_get_incremental_tree.return_value = None
+            self.assertEqual(
+                mock_get_solution_tree.return_value, dependencies.get_resolved_tree()
+            )
+
+    @patch("pip_rating.dependencies.get_previous_resolution")
+    def test_previous_resolution(self, mock_get_previous_resolution: MagicMock):
+        """Test the previous_resolution property."""
+        mock_req_file = Mock(path="requirements.txt")
+        with self.subTest("Test not incremental"):
+            dependencies = Dependencies(Mock(), mock_req_file)
+            self.assertIsNone(dependencies.previous_resolution)
+            mock_get_previous_resolution.assert_not_called()
+        with self.subTest("Test incremental"):
+            dependencies = Dependencies(Mock(), mock_req_file, incremental=True)
+            self.assertEqual(
+                mock_get_previous_resolution.return_value,
+                dependencies.previous_resolution,
+            )
+            mock_get_previous_resolution.assert_called_once_with(
+                get_previous_resolution_key("requirements.txt")
+            )
+
+    @patch("pip_rating.dependencies.Dependencies.get_ratings")
+    @patch("pip_rating.dependencies.Dependencies.dependencies_tree")
+    @patch("pip_rating.dependencies.get_resolution_changes")
+    def test_get_changes(
+        self,
+        mock_get_resolution_changes: MagicMock,
+        mock_dependencies_tree: MagicMock,
+        mock_get_ratings: MagicMock,
+    ):
+        """Test the method get_changes."""
+        dependencies = Dependencies(Mock(), ["package"])
+        with self.subTest("Test without previous resolution"):
+            dependencies.previous_resolution = None
+            self.assertEqual([], dependencies.get_changes())
+        with self.subTest("Test with previous resolution"):
+            dependencies.previous_resolution = Mock()
+            self.assertEqual(
+                mock_get_resolution_changes.return_value, dependencies.get_changes()
+            )
+            mock_get_resolution_changes.assert_called_once_with(
+                dependencies.previous_resolution,
+                mock_dependencies_tree,
+                mock_get_ratings.return_value,
+            )
+
+    @patch("pip_rating.dependencies.Dependencies.get_ratings")
+    @patch("pip_rating.dependencies.Dependencies.dependencies_tree")
+    @patch("pip_rating.dependencies.set_previous_resolution")
+    def test_save_previous_resolution(
+        self,
+        mock_set_previous_resolution: MagicMock,
+        mock_dependencies_tree: MagicMock,
+        mock_get_ratings: MagicMock,
+    ):
+        """Test the method save_previous_resolution."""
+        mock_req_file = Mock(path="requirements.txt")
+        with self.subTest("Test not incremental"):
+            Dependencies(Mock(), mock_req_file).save_previous_resolution()
+            mock_set_previous_resolution.assert_not_called()
+        with self.subTest("Test incremental"):
+            Dependencies(
+                Mock(), mock_req_file, incremental=True
+            ).save_previous_resolution()
+            mock_set_previous_resolution.assert_called_once_with(
+                get_previous_resolution_key("requirements.txt"),
+                mock_req_file,
+                mock_dependencies_tree,
+                mock_get_ratings.return_value,
+            )
+
+    @patch("pip_rating.dependencies.discover_dependencies_and_versions")
+    def test_get_locked_packages(self, mock_discover: MagicMock):
+        """Test the method get_locked_packages."""
+        mock_req_file = Mock()
+        dependencies = Dependencies(Mock(), mock_req_file, "cache_dir")
+        with self.subTest("Test without lock data"):
+            mock_req_file.get_locked_packages.return_value = None
+            self.assertIsNone(dependencies.get_locked_packages())
+        with self.subTest("Test with dependencies"):
+            locked_packages = {"package": LockedPackage("package", "1.0.0", [])}
+            mock_req_file.get_locked_packages.return_value = locked_packages
+            self.assertEqual(locked_packages, dependencies.get_locked_packages())
+            mock_discover.assert_not_called()
+        with self.subTest("Test discover dependencies"):
+            mock_req_file.get_locked_packages.return_value = {
+                "package": LockedPackage("Package", "1.0.0", None, frozenset(["b"])),
+                "other-package": LockedPackage("other_package", "2.0.0", None),
+            }
+            mock_discover.side_effect = lambda package, *args: {
+                "requires": ["Other_Package>=1.0"] if package.startswith("P") else []
+            }
+            self.assertEqual(
+                {
+                    "package": LockedPackage(
+                        "Package", "1.0.0", ["other-package"], frozenset(["b"])
+                    ),
+                    "other-package": LockedPackage("other_package", "2.0.0", []),
+                },
+                dependencies.get_locked_packages(),
+            )
+            mock_discover.assert_any_call(
+                "Package[b]==1.0.0", None, None, "cache_dir", False
+            )
+        with self.subTest("Test dependency not locked"):
+            mock_req_file.get_locked_packages.return_value = {
+                "package": LockedPackage("Package", "1.0.0", None),
+            }
+            self.assertIsNone(dependencies.get_locked_packages())
+
+    @patch("pip_rating.dependencies.Dependencies.get_locked_packages")
+    def test_get_locked_tree(self, mock_get_locked_packages: MagicMock):
+        """Test the method get_locked_tree."""
+        mock_get_locked_packages.return_value = {
+            "package": LockedPackage("Package", "1.0.0", ["other"]),
+            "other": LockedPackage("other", "2.0.0", ["package"]),
+        }
+        with self.subTest("Test tree"):
+            dependencies = Dependencies(
+                Mock(),
+                ["Package[extra]==1.0.0", 'other==2.0.0 ; python_version < "3"'],
+            )
+            tree = dependencies.get_locked_tree()
+            self.assertEqual(1, len(tree.children))
+            node = tree.children[0]
+            self.assertEqual("package", node.name)
+            self.assertEqual("1.0.0", node.version)
+            self.assertEqual("Package[extra]==1.0.0", node.pip_string)
+            self.assertEqual("package[extra]", node.extras_name)
+            self.assertEqual({"extra"}, node.extras)
+            self.assertEqual("other==2.0.0", node.children[0].pip_string)
+            self.assertTrue(node.children[0].children[0].cyclic)
+        with self.subTest("Test requirement not locked"):
+            dependencies = Dependencies(Mock(), ["Package==1.0.0", "missing==1.0"])
+            self.assertIsNone(dependencies.get_locked_tree())
+        with self.subTest("Test without lock data"):
+            mock_get_locked_packages.return_value = None
+            dependencies = Dependencies(Mock(), ["Package==1.0.0"])
+            self.assertIsNone(dependencies.get_locked_tree())
+
+    @patch("pip_rating.dependencies.Dependencies.version_solution")
+    @patch("pip_rating.dependencies.Dependencies.get_locked_tree")
+    def test_dependencies_tree_locked(
+        self, mock_get_locked_tree: MagicMock, mock_version_solution: MagicMock
+    ):
+        """Test the method dependencies_tree with lock data."""
+        dependencies = Dependencies(Mock(), Mock())
+        self.assertEqual(
+            mock_get_locked_tree.return_value, dependencies.dependencies_tree
+        )
+        mock_version_solution.decisions.items.assert_not_called()
 
     def test_add_node_package(self):
         """Test the method add_node_package."""
@@ -238,18 +556,73 @@ class TestDependencies(unittest.TestCase):
         dependencies.packages = {"package": mock_package}
         self.assertEqual(3, dependencies.total_size)
 
+    @patch("pip_rating.dependencies.Fetcher")
+    def test_fetch_sources(self, mock_fetcher: MagicMock):
+        """Test the method fetch_sources."""
+        mock_results = Mock()
+        dependencies = Dependencies(mock_results, Mock())
+        dependencies.fetch_sources()
+        mock_fetcher.assert_called_once_with(dependencies)
+        mock_fetcher.return_value.fetch.assert_called_once_with(
+            mock_results.fetched_package
+        )
+
+    @patch("pip_rating.dependencies.Fetcher")
+    @patch("pip_rating.dependencies.Dependencies.fetch_sources")
+    def test_warm_cache(self, mock_fetch_sources: MagicMock, mock_fetcher: MagicMock):
+        """Test the method warm_cache."""
+        mock_package = Mock()
+        mock_failed_package = Mock()
+        error = ValueError("error")
+        type(mock_failed_package).rating = PropertyMock(side_effect=error)
+        mock_fetcher.return_value.get_packages.return_value = [
+            mock_package,
+            mock_failed_package,
+        ]
+        dependencies = Dependencies(Mock(), Mock())
+        self.assertEqual([(mock_failed_package, error)], dependencies.warm_cache())
+        mock_fetch_sources.assert_called_once_with()
+        mock_fetcher.assert_called_once_with(dependencies)
+
+    @patch("pip_rating.dependencies.Fetcher")
+    def test_get_cache_keys(self, mock_fetcher: MagicMock):
+        """Test the method get_cache_keys."""
+        mock_package_1 = Mock()
+        mock_package_1.get_cache_keys.return_value = [("pypi", "package-1", "")]
+        mock_package_2 = Mock()
+        mock_package_2.get_cache_keys.return_value = [("pypi", "package-2", "")]
+        mock_fetcher.return_value.get_packages.return_value = [
+            mock_package_1,
+            mock_package_2,
+        ]
+        dependencies = Dependencies(Mock(), Mock())
+        self.assertEqual(
+            [("pypi", "package-1", ""), ("pypi", "package-2", "")],
+            dependencies.get_cache_keys(),
+        )
+
+    @patch("pip_rating.dependencies.Dependencies.fetch_sources")
     @patch("pip_rating.dependencies.Dependencies.get_packages")
-    def test_get_global_rating_score(self, mock_get_packages: MagicMock):
+    def test_get_global_rating_score(
+        self, mock_get_packages: MagicMock, mock_fetch_sources: MagicMock
+    ):
         """Test the method get_global_rating_score."""
         mock_results = Mock()
         mock_req_file = Mock()
         mock_package_1 = Mock()
         mock_package_1.rating.get_global_rating_score.return_value = 2
+        mock_package_1.rating.is_unknown = False
         mock_package_2 = Mock()
         mock_package_2.rating.get_global_rating_score.return_value = 1
+        mock_package_2.rating.is_unknown = False
+        mock_unknown_package = Mock()
+        mock_unknown_package.rating.get_global_rating_score.return_value = 0
+        mock_unknown_package.rating.is_unknown = True
         mock_get_packages.return_value = {
             "package_1": mock_package_1,
             "package_2": mock_package_2,
+            "unknown_package": mock_unknown_package,
         }
         dependencies = Dependencies(mock_results, mock_req_file)
         self.assertEqual(1, dependencies.get_global_rating_score())
+        mock_fetch_sources.assert_called_once_with()
@@ -0,0 +1,148 @@
+import unittest
+from concurrent.futures import Future
+from unittest.mock import patch, MagicMock, Mock
+
+from pip_rating.fetcher import Fetcher
+from pip_rating.sources.audit import Audit
+from pip_rating.sources.pypi import Pypi
+from pip_rating.sources.sourcecode_page import SourcecodePage
+
+
+class TestFetcher(unittest.TestCase):
+    """Test the Fetcher class."""
+
+    def test_init(self):
+        """Test the __init__ method."""
+        mock_dependencies = Mock()
+        fetcher = Fetcher(mock_dependencies)
+        self.assertEqual(mock_dependencies, fetcher.dependencies)
+        self.assertEqual({}, fetcher.executors)
+
+    @patch("pip_rating.fetcher.ThreadPoolExecutor")
+    def test_get_executor(self, mock_thread_pool_executor: MagicMock):
+        """Test the get_executor method."""
+        fetcher = Fetcher(Mock())
+        executor = fetcher.get_executor(Pypi)
+        self.assertEqual(mock_thread_pool_executor.return_value, executor)
+        self.assertEqual(executor, fetcher.get_executor(Pypi))
+        mock_thread_pool_executor.assert_called_once_with(
+            max_workers=Pypi.fetch_threads, thread_name_prefix="pip-rating-pypi"
+        )
+
+    def test_get_packages(self):
+        """Test the get_packages method."""
+        mock_package = Mock()
+        mock_descendant = Mock()
+        mock_package.get_descendant_packages.return_value = [
+            mock_descendant,
+            mock_package,
+        ]
+        mock_dependencies = Mock()
+        mock_dependencies.get_packages.return_value = {"package": mock_package}
+        fetcher = Fetcher(mock_dependencies)
+        self.assertEqual([mock_package, mock_descendant], fetcher.get_packages())
+
+    @patch("pip_rating.fetcher.background_refresher")
+    @patch("pip_rating.fetcher.SourcecodePageBatch")
+    @patch("pip_rating.fetcher.Fetcher.get_executor")
+    def test_fetch_sourcecode_pages(
+        self,
+        mock_get_executor: MagicMock,
+        mock_sourcecode_page_batch: MagicMock,
+        mock_background_refresher: MagicMock,
+    ):
+        """Test the fetch_sourcecode_pages method."""
+        mock_get_executor.return_value.submit.side_effect = self._submit
+        mock_page = Mock(is_cache_stale=False)
+        mock_stale_page = Mock(is_cache_stale=True)
+        mock_sourcecode_page_batch.return_value.get_sourcecode_pages.return_value = [
+            mock_stale_page
+        ]
+        Fetcher(Mock()).fetch_sourcecode_pages([mock_page, mock_stale_page])
+        mock_sourcecode_page_batch.assert_any_call(
+            [mock_stale_page], SourcecodePage.session_pool
+        )
+        mock_sourcecode_page_batch.assert_any_call(
+            [mock_page], SourcecodePage.session_pool
+        )
+        mock_background_refresher.submit.assert_called_once_with(
+            [mock_stale_page.cache_key], mock_sourcecode_page_batch.return_value.fetch
+        )
+        mock_sourcecode_page_batch.return_value.fetch.assert_called_once_with()
+
+    @patch("pip_rating.fetcher.Fetcher.fetch_sourcecode_pages")
+    @patch("pip_rating.fetcher.AuditBatch")
+    @patch("pip_rating.fetcher.Fetcher.get_packages")
+    def test_fetch(
+        self,
+        mock_get_packages: MagicMock,
+        mock_audit_batch: MagicMock,
+        mock_fetch_sourcecode_pages: MagicMock,
+    ):
+        """Test the fetch method."""
+        mock_node_1 = Mock(version="1.0.0")
+        mock_node_2 = Mock(version="1.0.0")
+        mock_package = Mock()
+        mock_package.pypi = Pypi("package")
+        mock_package.pypi.fetch = Mock()
+        mock_package.nodes = {mock_node_1, mock_node_2}
+        mock_package.get_audit.return_value.is_cache_stale = False
+        mock_failed_package = Mock()
+        mock_failed_package.pypi = Pypi("failed")
+        mock_failed_package.pypi.fetch = Mock(side_effect=ValueError)
+        mock_failed_package.nodes = set()
+        mock_get_packages.return_value = [mock_package, mock_failed_package]
+        with self.subTest("Test batch audit"), patch(
+            "pip_rating.fetcher.Fetcher.get_executor"
+        ) as mock_get_executor:
+            mock_on_fetched = Mock()
+            mock_get_executor.return_value.submit.side_effect = self._submit
+            Fetcher(Mock()).fetch(mock_on_fetched)
+            mock_package.pypi.fetch.assert_called_once_with()
+            mock_package.get_audit.assert_called_once()
+            mock_audit_batch.assert_called_once_with(
+                [mock_package.get_audit.return_value], Audit.session_pool
+            )
+            mock_audit_batch.return_value.fetch.assert_called_once_with()
+            mock_package.get_audit.return_value.fetch.assert_not_called()
+            mock_package.sourcerank.fetch.assert_called_once_with()
+            mock_package.sourcecode_page.fetch.assert_called_once_with()
+            mock_failed_package.sourcerank.fetch.assert_not_called()
+            mock_failed_package.sourcecode_page.fetch.assert_not_called()
+            mock_fetch_sourcecode_pages.assert_called_once_with(
+                [mock_package.sourcecode_page]
+            )
+            self.assertEqual(2, mock_on_fetched.call_count)
+        with self.subTest("Test batch audit failed"), patch(
+            "pip_rating.fetcher.Fetcher.get_executor"
+        ) as mock_get_executor:
+            mock_audit_batch.return_value.fetch.side_effect = ValueError
+            mock_get_executor.return_value.submit.side_effect = self._submit
+            Fetcher(Mock()).fetch()
+            mock_package.get_audit.return_value.fetch.assert_called_once_with()
+        mock_audit_batch.reset_mock()
+        mock_audit_batch.return_value.fetch.side_effect = None
+        with self.subTest("Test stale audit"), patch(
+            "pip_rating.fetcher.Fetcher.get_executor"
+        ) as mock_get_executor, patch(
+            "pip_rating.fetcher.background_refresher"
+        ) as mock_background_refresher:
+            mock_audit = mock_package.get_audit.return_value
+            mock_audit.is_cache_stale = True
+            mock_get_executor.return_value.submit.side_effect = self._submit
+            Fetcher(Mock()).fetch()
+            mock_audit_batch.assert_any_call([mock_audit], Audit.session_pool)
+            mock_audit_batch.assert_any_call([], Audit.session_pool)
+            mock_background_refresher.submit.assert_called_once_with(
+                [mock_audit.cache_key], mock_audit_batch.return_value.fetch
+            )
+
+    @staticmethod
+    def _submit(fn):
+        """Run the function synchronously returning a done future."""
+        future = Future()
+        try:
+            future.set_result(fn())
+        except Exception as e:
+            future.set_exception(e)
+        return future
@@ -0,0 +1,36 @@
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+
+from pip_rating.management import is_last_version, is_offline
+
+
+class TestIsOffline(unittest.TestCase):
+    """Test the is_offline function."""
+
+    def test_is_offline(self):
+        """Test the is_offline function."""
+        for value, expected in [("1", True), ("true", True), ("0", False), ("", False)]:
+            with self.subTest(value=value), patch.dict(
+                os.environ, {"PIP_RATING_OFFLINE": value}
+            ):
+                self.assertEqual(expected, is_offline())
+
+
+class TestIsLastVersion(unittest.TestCase):
+    """Test the is_last_version function."""
+
+    @patch("pip_rating.management.session_pool")
+    def test_is_last_version(self, mock_session_pool: MagicMock):
+        """Test the is_last_version function."""
+        mock_session_pool.offline = False
+        response = mock_session_pool.get.return_value.__enter__.return_value
+        response.json.return_value = {"info": {"version": "0.0.1"}}
+        with self.subTest("Test online"), patch.dict(os.environ, {}, clear=True):
+            self.assertTrue(is_last_version())
+        with self.subTest("Test offline environment"), patch.dict(
+            os.environ, {"PIP_RATING_OFFLINE": "1"}
+        ):
+            mock_session_pool.get.reset_mock()
+            self.assertIsNone(is_last_version())
+            mock_session_pool.get.assert_not_called()
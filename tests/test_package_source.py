@@ -0,0 +1,204 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+import requests
+from packaging.specifiers import SpecifierSet
+from packaging.version import Version
+from pipgrip.libs.mixology.package import Package
+from pipgrip.pipper import parse_req
+
+from pip_rating.package_source import (
+    MetadataPackageSource,
+    discover_dependencies_and_versions,
+    discover_from_metadata,
+    is_compatible,
+    select_version,
+)
+
+
+def get_index_file(filename: str, **kwargs) -> dict:
+    return {
+        "filename": filename,
+        "url": f"https://example.com/{filename}",
+        "version": filename.split("-")[1].replace(".tar.gz", ""),
+        "requires_python": None,
+        "yanked": False,
+        "metadata": False,
+        **kwargs,
+    }
+
+
+class TestFunctions(unittest.TestCase):
+    """Test the package source functions."""
+
+    def test_is_compatible(self):
+        """Test the is_compatible function."""
+        with self.subTest("Test pure wheel"):
+            self.assertTrue(is_compatible(get_index_file("pkg-1.0-py3-none-any.whl")))
+        with self.subTest("Test sdist"):
+            self.assertTrue(is_compatible(get_index_file("pkg-1.0.tar.gz")))
+        with self.subTest("Test other platform"):
+            self.assertFalse(
+                is_compatible(get_index_file("pkg-1.0-py3-none-invalid_platform.whl"))
+            )
+        with self.subTest("Test Requires-Python"):
+            self.assertFalse(
+                is_compatible(get_index_file("pkg-1.0.tar.gz", requires_python="<3.0"))
+            )
+
+    def test_select_version(self):
+        """Test the select_version function."""
+        versions = {
+            Version("1.0"): [get_index_file("pkg-1.0.tar.gz")],
+            Version("1.1"): [get_index_file("pkg-1.1.tar.gz", yanked=True)],
+            Version("2.0b1"): [get_index_file("pkg-2.0b1.tar.gz")],
+        }
+        with self.subTest("Test latest version"):
+            self.assertEqual(
+                Version("1.0"), select_version(versions, SpecifierSet(""), False)
+            )
+        with self.subTest("Test pre-releases"):
+            self.assertEqual(
+                Version("2.0b1"), select_version(versions, SpecifierSet(""), True)
+            )
+        with self.subTest("Test yanked version"):
+            self.assertEqual(
+                Version("1.1"), select_version(versions, SpecifierSet("==1.1"), False)
+            )
+        with self.subTest("Test without version"):
+            self.assertIsNone(select_version(versions, SpecifierSet(">3"), False))
+
+    @patch("pip_rating.package_source.CoreMetadata")
+    @patch("pip_rating.package_source.SimpleIndex")
+    def test_discover_from_metadata(
+        self, mock_simple_index: MagicMock, mock_core_metadata: MagicMock
+    ):
+        """Test the discover_from_metadata function."""
+        files = [get_index_file("pkg-1.0.tar.gz"), get_index_file("pkg-2.0.tar.gz")]
+        mock_simple_index.return_value.files = files
+        mock_core_metadata.return_value.requires_dist = [
+            "requests>=2.0",
+            "pysocks ; extra == 'socks'",
+            "pywin32 ; sys_platform == 'invalid'",
+        ]
+        with self.subTest("Test metadata"):
+            self.assertEqual(
+                {
+                    "name": "pkg",
+                    "version": "1.0",
+                    "available": ["1.0", "2.0"],
+                    "requires": ["pysocks", "requests>=2.0"],
+                },
+                discover_from_metadata("pkg[socks]<2", None, None, False),
+            )
+            mock_simple_index.assert_called_once_with("pkg", None)
+            mock_core_metadata.assert_called_once_with("pkg", "1.0", files[:1], None)
+        with self.subTest("Test other index"):
+            mock_simple_index.reset_mock()
+            mock_core_metadata.reset_mock()
+            discover_from_metadata("pkg", "https://example.com", "https://other", False)
+            self.assertEqual(2, mock_simple_index.call_count)
+            self.assertEqual("https://example.com", mock_core_metadata.call_args[0][3])
+        with self.subTest("Test without metadata"):
+            mock_core_metadata.return_value.requires_dist = None
+            self.assertIsNone(discover_from_metadata("pkg", None, None, False))
+        with self.subTest("Test URL"):
+            self.assertIsNone(
+                discover_from_metadata(
+                    "pkg @ https://example.com/pkg.zip", None, None, False
+                )
+            )
+
+    @patch("pip_rating.package_source.pipper.discover_dependencies_and_versions")
+    @patch("pip_rating.package_source.discover_from_metadata")
+    def test_discover_dependencies_and_versions(
+        self, mock_discover_from_metadata: MagicMock, mock_pipper_discover: MagicMock
+    ):
+        """Test the discover_dependencies_and_versions function."""
+        with self.subTest("Test metadata"):
+            self.assertEqual(
+                mock_discover_from_metadata.return_value,
+                discover_dependencies_and_versions("pkg", None, None, "cache", False),
+            )
+            mock_pipper_discover.assert_not_called()
+        for side_effect in (None, requests.ConnectionError()):
+            with self.subTest("Test fallback", side_effect=side_effect):
+                mock_discover_from_metadata.return_value = None
+                mock_discover_from_metadata.side_effect = side_effect
+                self.assertEqual(
+                    mock_pipper_discover.return_value,
+                    discover_dependencies_and_versions(
+                        "pkg", None, None, "cache", False
+                    ),
+                )
+                mock_pipper_discover.assert_called_with(
+                    "pkg", None, None, "cache", False
+                )
+
+
+class TestMetadataPackageSource(unittest.TestCase):
+    """Test the MetadataPackageSource class."""
+
+    @patch("pip_rating.package_source.discover_dependencies_and_versions")
+    def test_discover_and_add(self, mock_discover: MagicMock):
+        """Test the discover_and_add method."""
+        mock_discover.return_value = {
+            "name": "pkg",
+            "version": "2.0",
+            "available": ["1.0", "2.0"],
+            "requires": ["requests>=2.0"],
+        }
+        package_source = MetadataPackageSource("cache", None, None, False)
+        package_source.discover_and_add("pkg")
+        mock_discover.assert_called_once_with("pkg", None, None, "cache", False)
+        versions = {
+            str(version): dependencies
+            for version, dependencies in package_source._packages["pkg"][
+                parse_req("pkg").extras
+            ].items()
+        }
+        self.assertEqual(["1.0", "2.0"], sorted(versions))
+        self.assertIsNone(versions["1.0"])
+        self.assertEqual(
+            ["requests"], [dependency.name for dependency in versions["2.0"]]
+        )
+
+    def test_seed(self):
+        """Test the seed method."""
+        package_source = MetadataPackageSource("cache", None, None, False)
+        package_source.seed("pkg", frozenset(), "1.0", ["requests>=2.0"])
+        versions = {
+            str(version): dependencies
+            for version, dependencies in package_source._packages["pkg"][
+                parse_req("pkg").extras
+            ].items()
+        }
+        self.assertEqual(["1.0"], list(versions))
+        self.assertEqual(
+            ["requests"], [dependency.name for dependency in versions["1.0"]]
+        )
+
+    def test_versions_for(self):
+        """Test the _versions_for method."""
+        package_source = MetadataPackageSource(
+            "cache", None, None, False, preferred_versions={"pkg": "1.0"}
+        )
+        for version in ("1.0", "2.0", "3.0"):
+            package_source.add("pkg", parse_req("pkg").extras, version)
+        package_source.add("other", parse_req("other").extras, "1.0")
+        with self.subTest("Test preferred version"):
+            self.assertEqual(
+                ["1.0", "3.0", "2.0"],
+                [
+                    str(version)
+                    for version in package_source._versions_for(Package("pkg"))
+                ],
+            )
+        with self.subTest("Test without preferred version"):
+            self.assertEqual(
+                ["1.0"],
+                [
+                    str(version)
+                    for version in package_source._versions_for(Package("other"))
+                ],
+            )
@@ -43,7 +43,9 @@ class TestPackage(unittest.TestCase):
         name = "name"
         package = Package(mock_dependencies, name)
         sourcerank = package.sourcerank
-        mock_source_rank.assert_called_once_with(package)
+        mock_source_rank.assert_called_once_with(
+            package, mock_dependencies.sourcerank_backend
+        )
         self.assertEqual(mock_source_rank.return_value, sourcerank)
 
     @patch("pip_rating.packages.Pypi")
@@ -53,7 +55,7 @@ class TestPackage(unittest.TestCase):
         name = "name"
         package = Package(mock_dependencies, name)
         pypi = package.pypi
-        mock_pypi.assert_called_once_with(name)
+        mock_pypi.assert_called_once_with(name, mock_dependencies.full_pypi_package)
         self.assertEqual(mock_pypi.return_value, pypi)
 
     @patch("pip_rating.packages.SourcecodePage")
@@ -66,6 +68,32 @@ class TestPackage(unittest.TestCase):
         mock_sourcecode_page.assert_called_once_with(package)
         self.assertEqual(mock_sourcecode_page.return_value, sourcecode_page)
 
+    @patch("pip_rating.packages.Package.get_audit")
+    @patch("pip_rating.packages.Package.first_node")
+    @patch("pip_rating.packages.Package.sourcecode_page")
+    @patch("pip_rating.packages.Package.sourcerank")
+    @patch("pip_rating.packages.Package.pypi")
+    def test_is_missing_data(
+        self,
+        mock_pypi: Mock,
+        mock_sourcerank: Mock,
+        mock_sourcecode_page: Mock,
+        mock_first_node: Mock,
+        mock_get_audit: Mock,
+    ):
+        """Test the is_missing_data property of Package."""
+        package = Package(Mock(), "name")
+        mock_pypi.is_missing = False
+        mock_sourcerank.is_missing = False
+        mock_sourcecode_page.is_missing = False
+        mock_get_audit.return_value.is_missing = False
+        with self.subTest("Test all data available"):
+            self.assertFalse(package.is_missing_data)
+            mock_get_audit.assert_called_once_with(mock_first_node)
+        with self.subTest("Test missing data"):
+            mock_sourcerank.is_missing = True
+            self.assertTrue(package.is_missing_data)
+
     @patch("pip_rating.packages.Audit")
     def test_get_audit(self, mock_audit: Mock):
         """Test the get_audit method of Package."""
@@ -78,6 +106,9 @@ class TestPackage(unittest.TestCase):
         audit = package.get_audit(node)
         mock_audit.assert_called_once_with(name, version)
         self.assertEqual(mock_audit.return_value, audit)
+        with self.subTest("Test the audit is reused for the same version"):
+            self.assertEqual(audit, package.get_audit(node))
+            mock_audit.assert_called_once_with(name, version)
 
     @patch("pip_rating.packages.PackageRating")
     def test_rating(self, mock_package_rating: Mock):
@@ -88,6 +119,26 @@ class TestPackage(unittest.TestCase):
         mock_package_rating.assert_called_once_with(package)
         self.assertEqual(mock_package_rating.return_value, rating)
 
+    def test_get_cache_keys(self):
+        """Test the get_cache_keys method of Package."""
+        package = Package(Mock(), "Package_Name")
+        package.pypi = Mock(cache_key=("pypi", "package-name", ""))
+        package.sourcerank = Mock(cache_key=("sourcerank", "package-name", ""))
+        package.sourcecode_page = Mock(
+            cache_key=("sourcecode_page", "package-name", "")
+        )
+        package.add_node(Mock(version="1.0.0"))
+        self.assertEqual(
+            [
+                ("pypi", "package-name", ""),
+                ("sourcerank", "package-name", ""),
+                ("sourcecode_page", "package-name", ""),
+                ("audit", "package-name", "1.0.0"),
+                ("rating", "package-name", ""),
+            ],
+            package.get_cache_keys(),
+        )
+
     def test_get_node_from_parent(self):
         """Test the get_node_from_parent method of Package."""
         mock_dependencies = Mock()
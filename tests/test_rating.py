@@ -1,16 +1,15 @@
 import datetime
-import json
-import time
 import unittest
-from unittest.mock import patch, MagicMock, Mock, PropertyMock, mock_open
+from unittest.mock import patch, MagicMock, Mock, PropertyMock
 
 from pip_rating import __version__
+from pip_rating.cache import CachePolicy
 from pip_rating.rating import (
+    MAX_CACHE_AGE,
     ScoreBase,
     ScoreValue,
     Max,
     PackageRating,
-    RATING_CACHE_DIR,
     BreakdownBase,
     PackageBreakdown,
     DateBreakdown,
@@ -295,73 +294,122 @@ class TestPackageRating(unittest.TestCase):
             self.assertEqual(
                 mock_get_params_from_cache.return_value, package_rating.params
             )
+        with self.subTest("No params & offline"), patch(
+            "pip_rating.rating.get_cache_policy",
+            return_value=CachePolicy(offline=True),
+        ), patch(
+            "pip_rating.rating.PackageRating.get_params_offline"
+        ) as mock_get_params_offline:
+            package_rating = PackageRating(mock_package)
+            self.assertEqual(
+                mock_get_params_offline.return_value, package_rating.params
+            )
 
-    @patch("pip_rating.rating.PackageRating.cache_path", new_callable=PropertyMock)
+    @patch("pip_rating.rating.PackageRating.save_to_cache")
+    @patch("pip_rating.rating.PackageRating.get_params_from_package")
+    @patch("pip_rating.rating.get_cache_backend")
     @patch("pip_rating.rating.PackageRating.__init__")
-    def test_is_cache_expired(self, mock_init: MagicMock, mock_cache_path: MagicMock):
-        """Test the is_cache_expired property of PackageRating."""
+    def test_get_params_offline(
+        self,
+        mock_init: MagicMock,
+        mock_get_cache_backend: MagicMock,
+        mock_get_params_from_package: MagicMock,
+        mock_save_to_cache: MagicMock,
+    ):
+        """Test the get_params_offline method of PackageRating."""
         mock_init.return_value = None
         mock_package = Mock()
-        with self.subTest("Cache path not exists"):
-            mock_cache_path.return_value.exists.return_value = False
-            package_rating = PackageRating(mock_package)
-            self.assertTrue(package_rating.is_cache_expired)
-        with self.subTest("Cache path exists & cache expired"):
-            mock_cache_path.return_value.exists.return_value = True
-            mock_cache_path.return_value.stat.return_value.st_mtime = 0
-            package_rating = PackageRating(mock_package)
-            self.assertTrue(package_rating.is_cache_expired)
-        with self.subTest("Cache path exists & cache not expired"):
-            mock_cache_path.return_value.exists.return_value = True
-            mock_cache_path.return_value.stat.return_value.st_mtime = time.time()
+        mock_package.name = "name"
+        mock_get = mock_get_cache_backend.return_value.get
+        with self.subTest("Test params in cache"):
             package_rating = PackageRating(mock_package)
-            self.assertFalse(package_rating.is_cache_expired)
+            package_rating.package = mock_package
+            package_rating.is_unknown = False
+            mock_get.return_value = {"schema_version": __version__, "params": "params"}
+            self.assertEqual("params", package_rating.get_params_offline())
+            self.assertFalse(package_rating.is_unknown)
+        mock_get.return_value = None
+        with self.subTest("Test params from cached sources"):
+            mock_package.is_missing_data = False
+            self.assertEqual(
+                mock_save_to_cache.return_value["params"],
+                package_rating.get_params_offline(),
+            )
+            self.assertFalse(package_rating.is_unknown)
+        with self.subTest("Test missing sources data"):
+            mock_package.is_missing_data = True
+            self.assertEqual(
+                mock_get_params_from_package.return_value,
+                package_rating.get_params_offline(),
+            )
+            self.assertTrue(package_rating.is_unknown)
+            mock_save_to_cache.assert_called_once_with()
 
+    @patch("pip_rating.rating.get_cache_backend")
     @patch("pip_rating.rating.PackageRating.__init__")
-    def test_cache_path(self, mock_init: MagicMock):
-        """Test the cache_path property of PackageRating."""
+    def test_is_cache_expired(
+        self, mock_init: MagicMock, mock_get_cache_backend: MagicMock
+    ):
+        """Test the is_cache_expired property of PackageRating."""
         mock_init.return_value = None
         mock_package = Mock()
-        mock_package.name = "name"
+        mock_package.name = "Name"
+        package_rating = PackageRating(mock_package)
+        package_rating.package = mock_package
+        self.assertEqual(
+            mock_get_cache_backend.return_value.is_expired.return_value,
+            package_rating.is_cache_expired,
+        )
+        mock_get_cache_backend.return_value.is_expired.assert_called_once_with(
+            "rating", "name", "", MAX_CACHE_AGE
+        )
+
+    @patch("pip_rating.rating.PackageRating.__init__")
+    def test_cache_key(self, mock_init: MagicMock):
+        """Test the cache_key property of PackageRating."""
+        mock_init.return_value = None
+        mock_package = Mock()
+        mock_package.name = "Name_1"
         package_rating = PackageRating(mock_package)
         package_rating.package = mock_package
-        self.assertEqual(RATING_CACHE_DIR / "name.json", package_rating.cache_path)
+        self.assertEqual(("rating", "name-1", ""), package_rating.cache_key)
 
+    @patch("pip_rating.rating.get_cache_backend")
     @patch("pip_rating.rating.PackageRating.__init__")
-    def test_get_from_cache(self, mock_init: MagicMock):
+    def test_get_from_cache(
+        self, mock_init: MagicMock, mock_get_cache_backend: MagicMock
+    ):
         """Test the get_from_cache method of PackageRating."""
-        json_data = {"schema_version": "other"}
         mock_init.return_value = None
         mock_package = Mock()
-        with self.subTest("Unsupported schema_version"), patch(
-            "builtins.open", mock_open(read_data=json.dumps(json_data))
-        ):
+        mock_package.name = "name"
+        mock_get = mock_get_cache_backend.return_value.get
+        with self.subTest("Missing cache"):
+            mock_get.return_value = None
+            package_rating = PackageRating(mock_package)
+            package_rating.package = mock_package
+            self.assertIsNone(package_rating.get_from_cache())
+        with self.subTest("Unsupported schema_version"):
+            mock_get.return_value = {"schema_version": "other"}
             package_rating = PackageRating(mock_package)
             package_rating.package = mock_package
             self.assertIsNone(package_rating.get_from_cache())
-        json_data = {"schema_version": __version__}
-        with self.subTest("Supported schema_version"), patch(
-            "builtins.open", mock_open(read_data=json.dumps(json_data))
-        ):
+        with self.subTest("Supported schema_version"):
+            mock_get.return_value = {"schema_version": __version__}
             package_rating = PackageRating(mock_package)
             package_rating.package = mock_package
-            self.assertEqual(json_data, package_rating.get_from_cache())
+            self.assertEqual(mock_get.return_value, package_rating.get_from_cache())
+            mock_get.assert_called_with("rating", "name", "")
 
     @patch("pip_rating.rating.datetime")
-    @patch("pip_rating.rating.json")
-    @patch("builtins.open")
-    @patch("pip_rating.rating.os")
-    @patch("pip_rating.rating.PackageRating.cache_path", new_callable=PropertyMock)
+    @patch("pip_rating.rating.get_cache_backend")
     @patch("pip_rating.rating.PackageRating.get_params_from_package")
     @patch("pip_rating.rating.PackageRating.__init__")
     def test_save_to_cache(
         self,
         mock_init: MagicMock,
         mock_get_params_from_package: MagicMock,
-        mock_cache_path: MagicMock,
-        mock_os: MagicMock,
-        mock_open_: MagicMock,
-        mock_json: MagicMock,
+        mock_get_cache_backend: MagicMock,
         mock_datetime: MagicMock,
     ):
         """Test the save_to_cache method of PackageRating."""
@@ -369,31 +417,23 @@ class TestPackageRating(unittest.TestCase):
         mock_package = Mock()
         mock_package.name = "name"
         mock_get_params_from_package.return_value = {"test": "test"}
-        mock_cache_path.return_value.parent = "parent"
-        mock_cache_path.return_value.__str__.return_value = "cache_path"
-        mock_os.makedirs.return_value = None
-        mock_open_.return_value = MagicMock()
         mock_datetime.datetime.now.return_value.isoformat.return_value = "now"
         package_rating = PackageRating(mock_package)
         package_rating.package = mock_package
-        package_rating.save_to_cache()
-        mock_os.makedirs.assert_called_once_with(
-            mock_cache_path.return_value.parent, exist_ok=True
-        )
-        mock_open_.assert_called_once_with("cache_path", "w")
-        mock_json.dump.assert_called_once_with(
-            {
-                "package_name": mock_package.name,
-                "updated_at": "now",
-                "schema_version": __version__,
-                "params": mock_get_params_from_package.return_value,
-            },
-            mock_open_.return_value.__enter__.return_value,
+        cache = {
+            "package_name": mock_package.name,
+            "updated_at": "now",
+            "schema_version": __version__,
+            "params": mock_get_params_from_package.return_value,
+        }
+        self.assertEqual(cache, package_rating.save_to_cache())
+        mock_get_cache_backend.return_value.set.assert_called_once_with(
+            "rating", "name", "", cache
         )
 
     @patch("pip_rating.rating.PackageRating.save_to_cache")
     @patch("pip_rating.rating.PackageRating.get_from_cache")
-    @patch("pip_rating.rating.PackageRating.get_from_cache")
+    @patch("pip_rating.rating.PackageRating.__init__")
     def test_get_params_from_cache(
         self,
         mock_init: MagicMock,
@@ -457,7 +497,13 @@ class TestPackageRating(unittest.TestCase):
         mock_init.return_value = None
         mock_package = Mock()
         mock_descendant = MagicMock()
-        mock_package.get_descendant_packages.return_value = [mock_descendant]
+        mock_descendant.rating.is_unknown = False
+        mock_unknown_descendant = MagicMock()
+        mock_unknown_descendant.rating.is_unknown = True
+        mock_package.get_descendant_packages.return_value = [
+            mock_descendant,
+            mock_unknown_descendant,
+        ]
         package_rating = PackageRating(mock_package)
         package_rating.package = mock_package
         descendant_rating_scores = package_rating.descendant_rating_scores
@@ -609,9 +655,11 @@ class TestPackageRating(unittest.TestCase):
         package_rating = PackageRating(mock_package)
         package_rating.package = mock_package
         package_rating.params = Mock()
+        package_rating.is_unknown = False
         package_rating_json = package_rating.as_json(mock_from_package)
         self.assertEqual(
             {
+                "unknown": False,
                 "rating_score": mock_get_rating_score.return_value,
                 "global_rating_score": mock_get_global_rating_score.return_value,
                 "vulnerabilities": mock_get_vulnerabilities.return_value,
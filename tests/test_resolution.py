@@ -0,0 +1,167 @@
+import datetime
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch, MagicMock
+
+from anytree import Node
+
+from pip_rating.cache import CachePolicy, SqliteCacheBackend
+from pip_rating.resolution import (
+    PREVIOUS_RESOLUTION_CACHE_SOURCE,
+    RESOLUTION_CACHE_SOURCE,
+    ResolutionChange,
+    get_cached_tree,
+    get_previous_resolution,
+    get_previous_resolution_key,
+    get_resolution_changes,
+    get_resolution_key,
+    get_tree_versions,
+    set_cached_tree,
+    set_previous_resolution,
+    tree_from_dict,
+    tree_to_dict,
+)
+
+
+def get_tree() -> Node:
+    root = Node("__root__")
+    package = Node(
+        "package",
+        parent=root,
+        version="1.0.0",
+        pip_string="package[extra]>=1.0",
+        extras_name="package[extra]",
+        extras={"extra"},
+    )
+    Node(
+        "package",
+        parent=package,
+        version="1.0.0",
+        pip_string="package",
+        extras_name="package",
+        extras=set(),
+        cyclic=True,
+    )
+    return root
+
+
+class TestResolution(unittest.TestCase):
+    """Test the resolution cache functions."""
+
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.backend = SqliteCacheBackend(Path(self.temp_dir.name))
+        patcher = patch(
+            "pip_rating.resolution.get_cache_backend", return_value=self.backend
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.backend.close()
+        self.temp_dir.cleanup()
+
+    def test_get_resolution_key(self):
+        """Test the get_resolution_key function."""
+        key = get_resolution_key(["Package>=1.0", "other"])
+        self.assertEqual(RESOLUTION_CACHE_SOURCE, key[0])
+        with self.subTest("Test normalized requirements"):
+            self.assertEqual(key, get_resolution_key(["package >= 1.0", "other"]))
+        with self.subTest("Test requirements order"):
+            self.assertEqual(key, get_resolution_key(["other", "Package>=1.0"]))
+        with self.subTest("Test other options"):
+            self.assertNotEqual(key, get_resolution_key(["Package>=1.0"]))
+            self.assertNotEqual(
+                key, get_resolution_key(["Package>=1.0", "other"], pre=True)
+            )
+            self.assertNotEqual(
+                key,
+                get_resolution_key(["Package>=1.0", "other"], "https://example.com"),
+            )
+
+    def test_tree_to_dict(self):
+        """Test the tree_to_dict and tree_from_dict functions."""
+        data = tree_to_dict(get_tree())
+        self.assertEqual(["extra"], data["children"][0]["extras"])
+        self.assertTrue(data["children"][0]["children"][0]["cyclic"])
+        tree = tree_from_dict(data)
+        package = tree.children[0]
+        self.assertEqual("1.0.0", package.version)
+        self.assertEqual({"extra"}, package.extras)
+        self.assertEqual("package[extra]>=1.0", package.pip_string)
+        self.assertTrue(package.children[0].cyclic)
+        self.assertFalse(hasattr(package, "cyclic"))
+        self.assertEqual(data, tree_to_dict(tree))
+
+    @patch("pip_rating.resolution.get_cache_policy")
+    def test_get_cached_tree(self, mock_get_cache_policy: MagicMock):
+        """Test the get_cached_tree and set_cached_tree functions."""
+        mock_get_cache_policy.return_value = CachePolicy()
+        key = get_resolution_key(["package"])
+        with self.subTest("Test not cached"):
+            self.assertIsNone(get_cached_tree(key))
+        with self.subTest("Test cached"):
+            set_cached_tree(key, get_tree())
+            self.assertEqual(
+                tree_to_dict(get_tree()), tree_to_dict(get_cached_tree(key))
+            )
+        updated_at = datetime.datetime.now() - datetime.timedelta(days=30)
+        self.backend.set(*key, self.backend.get(*key), updated_at)
+        with self.subTest("Test expired"):
+            self.assertIsNone(get_cached_tree(key))
+        with self.subTest("Test expired in offline mode"):
+            mock_get_cache_policy.return_value = CachePolicy(offline=True)
+            self.assertIsNotNone(get_cached_tree(key))
+
+    def test_get_previous_resolution_key(self):
+        """Test the get_previous_resolution_key function."""
+        key = get_previous_resolution_key("requirements.txt")
+        self.assertEqual(PREVIOUS_RESOLUTION_CACHE_SOURCE, key[0])
+        self.assertEqual(key, get_previous_resolution_key(Path("requirements.txt")))
+        self.assertNotEqual(key, get_previous_resolution_key("other.txt"))
+
+    def test_previous_resolution(self):
+        """Test the set_previous_resolution and get_previous_resolution functions."""
+        key = get_previous_resolution_key("requirements.txt")
+        self.assertIsNone(get_previous_resolution(key))
+        set_previous_resolution(key, ["Package>=1.0"], get_tree(), {"package": 50})
+        self.assertEqual(
+            {
+                "requirements": ["package>=1.0"],
+                "tree": tree_to_dict(get_tree()),
+                "ratings": {"package": 50},
+            },
+            get_previous_resolution(key),
+        )
+
+    def test_get_resolution_changes(self):
+        """Test the get_resolution_changes function."""
+        tree = get_tree()
+        Node("other", parent=tree, version="2.0.0")
+        previous_resolution = {
+            "requirements": [],
+            "tree": tree_to_dict(tree),
+            "ratings": {"package": 50, "other": 30},
+        }
+        tree.children[0].version = "1.1.0"
+        tree.children[1].parent = None
+        Node("new", parent=tree, version="1.0.0")
+        self.assertEqual({"package": "1.1.0", "new": "1.0.0"}, get_tree_versions(tree))
+        self.assertEqual(
+            [
+                ResolutionChange("new", None, "1.0.0", None, None),
+                ResolutionChange("other", "2.0.0", None, 30, None),
+                ResolutionChange("package", "1.0.0", "1.1.0", 50, 50),
+            ],
+            get_resolution_changes(previous_resolution, tree, {"package": 50}),
+        )
+        with self.subTest("Test rating changed"):
+            self.assertEqual(
+                [ResolutionChange("package", "1.0.0", "1.0.0", 50, 40)],
+                get_resolution_changes(
+                    {**previous_resolution, "tree": tree_to_dict(get_tree())},
+                    get_tree(),
+                    {"package": 40},
+                ),
+            )
@@ -4,7 +4,7 @@ Tests for the results module.
 This tests can be improved. These tests do not verify the returned outputs.
 """
 import unittest
-from io import TextIOWrapper
+from io import StringIO, TextIOWrapper
 from unittest import mock
 from unittest.mock import patch, MagicMock, Mock
 
@@ -14,6 +14,7 @@ from rich.tree import Tree
 
 from pip_rating import __version__
 from pip_rating.rating import ScoreValue
+from pip_rating.resolution import ResolutionChange
 from pip_rating.results import (
     colorize_score,
     colorize_rating,
@@ -21,6 +22,7 @@ from pip_rating.results import (
     add_tree_node,
     RatingLetter,
     Results,
+    UNKNOWN_RATING,
 )
 
 
@@ -46,6 +48,8 @@ class TestColorizeRating(unittest.TestCase):
             self.assertEqual("F", colorize_rating(ScoreValue(-1)).letter)
         with self.subTest("Test above 0"):
             self.assertIn("E", colorize_rating(ScoreValue(5)).letter)
+        with self.subTest("Test unknown"):
+            self.assertEqual("?", colorize_rating(None).letter)
 
 
 class TestColorizeRatingPackage(unittest.TestCase):
@@ -55,6 +59,7 @@ class TestColorizeRatingPackage(unittest.TestCase):
     def test_colorize_rating_package(self, mock_colorize_rating: MagicMock):
         """Test the colorize_rating_package function."""
         mock_package = Mock()
+        mock_package.rating.is_unknown = False
         mock_parent_package = Mock()
         with self.subTest("Test with different rating"):
             mock_letter = MagicMock()
@@ -69,6 +74,12 @@ class TestColorizeRatingPackage(unittest.TestCase):
             self.assertIn(
                 "E", colorize_rating_package(mock_package, mock_parent_package)
             )
+        with self.subTest("Test with unknown rating"):
+            mock_package.rating.is_unknown = True
+            self.assertEqual(
+                UNKNOWN_RATING,
+                colorize_rating_package(mock_package, mock_parent_package),
+            )
 
 
 class TestAddTreeNode(unittest.TestCase):
@@ -220,7 +231,7 @@ class TestResults(unittest.TestCase):
 
     def test_show_results(self):
         """Test the show_results method of Results."""
-        mock_dependencies = Mock()
+        mock_dependencies = Mock(**{"get_changes.return_value": []})
         test_results = Results()
         with self.subTest("Invalid format_name"), self.assertRaises(ValueError):
             test_results.show_results(mock_dependencies, "invalid")
@@ -250,6 +261,26 @@ class TestResults(unittest.TestCase):
             test_results.show_results(mock_dependencies, "badge")
             mock_show_show_badge_results.assert_called_once_with(mock_dependencies)
 
+    def test_show_resolution_changes(self):
+        """Test the show_resolution_changes method of Results."""
+        mock_dependencies = Mock()
+        test_results = Results()
+        test_results.progress_console = Console(file=StringIO(), width=200)
+        with self.subTest("Test without changes"):
+            mock_dependencies.get_changes.return_value = []
+            test_results.show_resolution_changes(mock_dependencies)
+            self.assertEqual("", test_results.progress_console.file.getvalue())
+        with self.subTest("Test with changes"):
+            mock_dependencies.get_changes.return_value = [
+                ResolutionChange("package", "1.0.0", "1.1.0", 25, 15),
+                ResolutionChange("new", None, "2.0.0", None, None),
+            ]
+            test_results.show_resolution_changes(mock_dependencies)
+            output = test_results.progress_console.file.getvalue()
+            self.assertIn("1.0.0 -> 1.1.0", output)
+            self.assertIn("A -> C", output)
+            self.assertIn("- -> 2.0.0", output)
+
     def test_show_packages_results(self):
         """Test the show_packages_results method of Results."""
         mock_dependencies = MagicMock()
@@ -258,13 +289,21 @@ class TestResults(unittest.TestCase):
         mock_package.rating.rating_score = 15
         mock_package.rating.breakdown_scores = [("key", 5)]
         mock_package.rating.get_vulnerabilities.return_value = [{"id": "CVE-2020-0001"}]
+        mock_package.rating.is_unknown = False
         mock_package.name = "name"
         mock_dependencies.packages = {"name": mock_package}
         mock_dependencies.req_file = ["name"]
-        test_results = Results()
-        test_results.results_console = Mock()
-        test_results.show_packages_results(mock_dependencies)
-        self.assertEqual(7, test_results.results_console.print.call_count)
+        with self.subTest("Test known package"):
+            test_results = Results()
+            test_results.results_console = Mock()
+            test_results.show_packages_results(mock_dependencies)
+            self.assertEqual(7, test_results.results_console.print.call_count)
+        with self.subTest("Test unknown package"):
+            mock_package.rating.is_unknown = True
+            test_results = Results()
+            test_results.results_console = Mock()
+            test_results.show_packages_results(mock_dependencies)
+            self.assertEqual(4, test_results.results_console.print.call_count)
 
     def test_show_tree_results(self):
         """Test the show_tree_results method of Results."""
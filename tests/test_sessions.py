@@ -0,0 +1,235 @@
+import datetime
+import unittest
+from email.utils import format_datetime
+from unittest.mock import patch, MagicMock, Mock
+
+from pip_rating.sessions import (
+    SessionPool,
+    TimeoutHTTPAdapter,
+    TokenBucket,
+    OfflineError,
+    get_response_size,
+    get_retry_after,
+    parse_rate_limits,
+)
+
+
+class TestGetResponseSize(unittest.TestCase):
+    """Test the get_response_size function."""
+
+    def test_get_response_size(self):
+        """Test the get_response_size function."""
+        with self.subTest("Test Content-Length"):
+            response = Mock(headers={"Content-Length": "10"}, content=b"")
+            self.assertEqual(10, get_response_size(response))
+        with self.subTest("Test content"):
+            response = Mock(headers={}, content=b"content")
+            self.assertEqual(7, get_response_size(response))
+        with self.subTest("Test streamed without Content-Length"):
+            response = Mock(headers={"Content-Length": "invalid"})
+            self.assertEqual(0, get_response_size(response, stream=True))
+
+
+class TestRateLimits(unittest.TestCase):
+    """Test the rate limits functions."""
+
+    def test_parse_rate_limits(self):
+        """Test the parse_rate_limits function."""
+        self.assertEqual(
+            {"libraries.io": 30.0, "api.github.com": 0.0},
+            parse_rate_limits(" libraries.io=30, api.github.com=0,"),
+        )
+        self.assertEqual({}, parse_rate_limits(""))
+
+    def test_get_retry_after(self):
+        """Test the get_retry_after function."""
+        with self.subTest("Test seconds"):
+            self.assertEqual(12.0, get_retry_after(Mock(headers={"Retry-After": "12"})))
+        with self.subTest("Test date"):
+            retry_at = datetime.datetime.now(datetime.timezone.utc) + (
+                datetime.timedelta(seconds=60)
+            )
+            wait = get_retry_after(
+                Mock(headers={"Retry-After": format_datetime(retry_at)})
+            )
+            self.assertTrue(50 < wait <= 60)
+        with self.subTest("Test past date"):
+            self.assertEqual(
+                0.0,
+                get_retry_after(
+                    Mock(headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+                ),
+            )
+        with self.subTest("Test missing or invalid"):
+            self.assertIsNone(get_retry_after(Mock(headers={})))
+            self.assertIsNone(get_retry_after(Mock(headers={"Retry-After": "x"})))
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test the TokenBucket class."""
+
+    @patch("pip_rating.sessions.time")
+    def test_get_wait(self, mock_time: MagicMock):
+        """Test the get_wait method."""
+        mock_time.monotonic.return_value = 100.0
+        bucket = TokenBucket(60)
+        with self.subTest("Test token available"):
+            self.assertEqual(0.0, bucket.get_wait())
+        with self.subTest("Test wait for the next token"):
+            mock_time.monotonic.return_value = 100.25
+            self.assertEqual(0.75, bucket.get_wait())
+        with self.subTest("Test token refilled"):
+            mock_time.monotonic.return_value = 101.0
+            self.assertEqual(0.0, bucket.get_wait())
+        with self.subTest("Test without rate"):
+            self.assertEqual(0.0, TokenBucket().get_wait())
+            self.assertEqual(0.0, TokenBucket().get_wait())
+
+    @patch("pip_rating.sessions.time")
+    def test_acquire(self, mock_time: MagicMock):
+        """Test the acquire method."""
+        mock_time.monotonic.return_value = 100.0
+        mock_time.sleep.side_effect = lambda seconds: setattr(
+            mock_time.monotonic, "return_value", 100.0 + seconds
+        )
+        bucket = TokenBucket(60)
+        self.assertEqual(0.0, bucket.acquire())
+        self.assertEqual(1.0, bucket.acquire())
+        mock_time.sleep.assert_called_once_with(1.0)
+
+    @patch("pip_rating.sessions.time")
+    def test_pause(self, mock_time: MagicMock):
+        """Test the pause method."""
+        mock_time.monotonic.return_value = 100.0
+        bucket = TokenBucket()
+        bucket.pause(10)
+        self.assertEqual(10.0, bucket.get_wait())
+        bucket.pause(5)
+        self.assertEqual(10.0, bucket.get_wait())
+        mock_time.monotonic.return_value = 110.0
+        self.assertEqual(0.0, bucket.get_wait())
+
+
+class TestTimeoutHTTPAdapter(unittest.TestCase):
+    """Test the TimeoutHTTPAdapter class."""
+
+    @patch("pip_rating.sessions.HTTPAdapter.send")
+    def test_send(self, mock_send: MagicMock):
+        """Test the send method."""
+        adapter = TimeoutHTTPAdapter(timeout=10)
+        mock_request = Mock()
+        with self.subTest("Test default timeout"):
+            adapter.send(mock_request, timeout=None)
+            mock_send.assert_called_once_with(mock_request, timeout=10)
+        mock_send.reset_mock()
+        with self.subTest("Test custom timeout"):
+            adapter.send(mock_request, timeout=5)
+            mock_send.assert_called_once_with(mock_request, timeout=5)
+
+
+class TestSessionPool(unittest.TestCase):
+    """Test the SessionPool class."""
+
+    def test_create_session(self):
+        """Test the create_session method."""
+        session_pool = SessionPool(pool_size=4, retries=2, timeout=5)
+        session = session_pool.create_session()
+        adapter = session.get_adapter("https://pypi.org")
+        self.assertIsInstance(adapter, TimeoutHTTPAdapter)
+        self.assertEqual(5, adapter.timeout)
+        self.assertEqual(4, adapter._pool_maxsize)
+        self.assertEqual(2, adapter.max_retries.total)
+
+    @patch("pip_rating.sessions.SessionPool.create_session")
+    def test_get_session(self, mock_create_session: MagicMock):
+        """Test the get_session method."""
+        mock_create_session.side_effect = lambda: Mock()
+        session_pool = SessionPool()
+        session = session_pool.get_session("https://pypi.org/pypi/foo/json")
+        self.assertEqual(
+            session, session_pool.get_session("https://pypi.org/pypi/bar/json")
+        )
+        self.assertNotEqual(
+            session, session_pool.get_session("https://api.github.com/repos")
+        )
+        self.assertEqual(2, mock_create_session.call_count)
+
+    @patch("pip_rating.sessions.SessionPool.get_session")
+    def test_get(self, mock_get_session: MagicMock):
+        """Test the get method."""
+        url = "https://pypi.org/pypi/foo/json"
+        response = SessionPool().get(url, headers={"key": "value"})
+        mock_get_session.assert_called_once_with(url)
+        mock_get_session.return_value.request.assert_called_once_with(
+            "GET", url, headers={"key": "value"}
+        )
+        self.assertEqual(mock_get_session.return_value.request.return_value, response)
+
+    @patch("pip_rating.sessions.run_stats")
+    @patch("pip_rating.sessions.SessionPool.get_session")
+    def test_request_stats(
+        self, mock_get_session: MagicMock, mock_run_stats: MagicMock
+    ):
+        """Test the request method records the downloaded bytes."""
+        mock_get_session.return_value.request.return_value = Mock(
+            headers={"Content-Length": "10"}
+        )
+        SessionPool().get("https://pypi.org/pypi/foo/json", stream=True)
+        mock_run_stats.record_download.assert_called_once_with("pypi.org", 10)
+
+    @patch("pip_rating.sessions.run_stats")
+    @patch("pip_rating.sessions.SessionPool.get_session")
+    def test_request_rate_limit(
+        self, mock_get_session: MagicMock, mock_run_stats: MagicMock
+    ):
+        """Test the request method retries the rate limit responses."""
+        url = "https://libraries.io/pypi/foo/sourcerank"
+        rate_limited = Mock(status_code=429, headers={"Retry-After": "7"}, content=b"")
+        success = Mock(status_code=200, headers={}, content=b"")
+        session_pool = SessionPool(rate_limits={}, rate_limit_retries=1)
+        mock_bucket = Mock(**{"acquire.return_value": 0.0})
+        session_pool.buckets = {"libraries.io": mock_bucket}
+        with self.subTest("Test retry after the rate limit"):
+            mock_get_session.return_value.request.side_effect = [
+                rate_limited,
+                success,
+            ]
+            self.assertEqual(success, session_pool.get(url))
+            rate_limited.close.assert_called_once_with()
+            mock_bucket.pause.assert_called_once_with(7.0)
+            self.assertEqual(2, mock_bucket.acquire.call_count)
+            mock_run_stats.record_wait.assert_called_with("libraries.io", 0.0)
+        mock_bucket.reset_mock()
+        with self.subTest("Test retries exhausted"):
+            mock_get_session.return_value.request.side_effect = [
+                rate_limited,
+                rate_limited,
+            ]
+            self.assertEqual(rate_limited, session_pool.get(url))
+            mock_bucket.pause.assert_called_once_with(7.0)
+
+    def test_get_bucket(self):
+        """Test the get_bucket method."""
+        session_pool = SessionPool(rate_limits={"libraries.io": 30})
+        bucket = session_pool.get_bucket("https://libraries.io/pypi/foo")
+        self.assertEqual(bucket, session_pool.get_bucket("https://libraries.io/x"))
+        self.assertEqual(0.5, bucket.rate)
+        self.assertIsNone(session_pool.get_bucket("https://pypi.org/simple").rate)
+
+    @patch("pip_rating.sessions.SessionPool.get_session")
+    def test_request_offline(self, mock_get_session: MagicMock):
+        """Test the request method in offline mode."""
+        session_pool = SessionPool()
+        session_pool.offline = True
+        with self.assertRaises(OfflineError):
+            session_pool.get("https://pypi.org/pypi/foo/json")
+        mock_get_session.assert_not_called()
+
+    def test_close(self):
+        """Test the close method."""
+        mock_session = Mock()
+        session_pool = SessionPool()
+        session_pool.sessions = {"pypi.org": mock_session}
+        session_pool.close()
+        mock_session.close.assert_called_once_with()
+        self.assertEqual({}, session_pool.sessions)
@@ -0,0 +1,98 @@
+import datetime
+import io
+import unittest
+
+from rich.console import Console
+
+from pip_rating.cache import CacheEntry
+from pip_rating.stats import (
+    RunStats,
+    get_cache_stats,
+    percentile,
+    print_cache_stats,
+)
+
+
+class TestCacheStats(unittest.TestCase):
+    """Test the cache stats functions."""
+
+    def test_percentile(self):
+        """Test the percentile function."""
+        values = [0.4, 0.1, 0.3, 0.2]
+        with self.subTest("Test without values"):
+            self.assertEqual(0.0, percentile([], 50))
+        with self.subTest("Test median"):
+            self.assertEqual(0.2, percentile(values, 50))
+        with self.subTest("Test maximum"):
+            self.assertEqual(0.4, percentile(values, 99))
+
+    def test_get_cache_stats(self):
+        """Test the get_cache_stats function."""
+        now = datetime.datetime.now()
+        entries = [
+            CacheEntry("pypi", "a", 10, now, now),
+            CacheEntry("pypi", "b", 20, now - datetime.timedelta(days=10), now),
+            CacheEntry("audit", "c", 5, now - datetime.timedelta(days=100), now),
+        ]
+        stats = get_cache_stats(entries)
+        self.assertEqual(["audit", "pypi"], list(stats))
+        self.assertEqual(2, stats["pypi"]["entries"])
+        self.assertEqual(30, stats["pypi"]["bytes"])
+        self.assertEqual(
+            {"<1d": 1, "<7d": 0, "<30d": 1, "<90d": 0, ">=90d": 0},
+            stats["pypi"]["ages"],
+        )
+        self.assertEqual(1, stats["audit"]["ages"][">=90d"])
+
+    def test_print_cache_stats(self):
+        """Test the print_cache_stats function."""
+        file = io.StringIO()
+        now = datetime.datetime.now()
+        print_cache_stats(
+            get_cache_stats([CacheEntry("pypi", "a", 10, now, now)]),
+            Console(file=file, width=200),
+        )
+        self.assertIn("pypi", file.getvalue())
+
+
+class TestRunStats(unittest.TestCase):
+    """Test the RunStats class."""
+
+    def setUp(self):
+        self.run_stats = RunStats()
+        self.run_stats.increment("pypi", "hits")
+        self.run_stats.increment("audit", "misses", 3)
+        self.run_stats.record_latency("audit", 0.5)
+        self.run_stats.record_download("api.osv.dev", 100)
+        self.run_stats.record_download("api.osv.dev", 50)
+        self.run_stats.record_wait("libraries.io", 1.5)
+        self.run_stats.record_wait("libraries.io", 0.0)
+
+    def test_as_dict(self):
+        """Test the as_dict method."""
+        data = self.run_stats.as_dict()
+        self.assertEqual(["audit", "pypi"], list(data["sources"]))
+        self.assertEqual(1, data["sources"]["pypi"]["hits"])
+        self.assertEqual(0, data["sources"]["pypi"]["misses"])
+        self.assertEqual(3, data["sources"]["audit"]["misses"])
+        self.assertEqual(
+            {"p50": 0.5, "p90": 0.5, "p99": 0.5}, data["sources"]["audit"]["latency"]
+        )
+        self.assertEqual({"api.osv.dev": 150}, data["bytes_downloaded"])
+        self.assertEqual({"libraries.io": 1.5}, data["rate_limit_wait"])
+
+    def test_reset(self):
+        """Test the reset method."""
+        self.run_stats.reset()
+        self.assertEqual(
+            {"sources": {}, "bytes_downloaded": {}, "rate_limit_wait": {}},
+            self.run_stats.as_dict(),
+        )
+
+    def test_print(self):
+        """Test the print method."""
+        file = io.StringIO()
+        self.run_stats.print(Console(file=file, width=200))
+        self.assertIn("audit", file.getvalue())
+        self.assertIn("api.osv.dev", file.getvalue())
+        self.assertIn("1.50s", file.getvalue())